@@ -0,0 +1,72 @@
+# benchmarks/dsp_bench.py
+# Microbenchmarks for the dsp.py kernel and the reverb convolver (equivalence checks live in tests/test_dsp_equivalence.py).
+# Run from the repository root: python -m benchmarks.dsp_bench [--reverb-only | --kernel-only]
+
+import argparse
+import sys
+import time
+from typing import List, Dict, Any
+
+try: import numpy as np
+except ImportError: np = None
+
+from grove.audio.dsp import OscillatorBank, OSCILLATOR_MODES
+from grove.audio.reverb import REVERB_SPACES, PartitionedConvolver, generate_impulse_response
+from grove.audio.engine import DEFAULT_SAMPLE_RATE
+
+BLOCK_SIZES = (256, 1024, 3528)
+BENCH_OSCILLATOR_COUNTS = (1, 2, 4, 8, 16)
+BENCH_SECONDS = 0.25 # Wall time spent per benchmark case
+REVERB_BLOCK_SIZES = (882, 1764, 3528, 7056) # 20 / 40 / 80 / 160 ms at 44.1 kHz
+
+def benchmark_reverb(sample_rate: int = DEFAULT_SAMPLE_RATE) -> List[Dict[str, Any]]:
+    """Times one stereo convolver block per space and block size, against that block's budget."""
+    results = []
+    print(f"  {'space':10} {'frames':>6} {'parts':>5} {'us/block':>9} {'budget':>7}")
+    for space in REVERB_SPACES:
+        ir = generate_impulse_response(space, sample_rate)
+        for block_size in REVERB_BLOCK_SIZES:
+            convolver = PartitionedConvolver(ir, block_size); block = np.zeros((block_size, 2), dtype=np.float32); out = np.zeros_like(block)
+            convolver.process(block, out)
+            blocks = 0; start = time.perf_counter(); deadline = start + BENCH_SECONDS
+            while time.perf_counter() < deadline: convolver.process(block, out); blocks += 1
+            seconds_per_block = (time.perf_counter() - start) / blocks; budget = seconds_per_block / (block_size / sample_rate)
+            results.append({'space': space, 'frames': block_size, 'partitions': convolver.partitions, 'us_per_block': seconds_per_block * 1e6, 'budget_ratio': budget})
+            print(f"  {space:10} {block_size:6} {convolver.partitions:5} {seconds_per_block * 1e6:9.1f} {budget:7.1%}")
+    return results
+
+def benchmark(sample_rate: int = DEFAULT_SAMPLE_RATE) -> List[Dict[str, Any]]:
+    """Times bank.render_into per block across oscillator counts, block sizes, modes and LFO settings."""
+    results = []
+    print(f"  {'mode':9} {'lfo':5} {'osc':>3} {'frames':>6} {'us/block':>9} {'x realtime':>11}")
+    for mode in OSCILLATOR_MODES:
+        for enable_lfos in (False, True):
+            for count in BENCH_OSCILLATOR_COUNTS:
+                preset = [(1.0 + 0.37 * i, 0.5 / count, 0.1 + 0.03 * i, 0.1) for i in range(count)]
+                for block_size in BLOCK_SIZES:
+                    bank = OscillatorBank(preset, sample_rate, mode=mode); out = np.zeros(block_size, dtype=np.float32)
+                    bank.render_into(65.41, block_size, out, enable_lfos) # Warm-up (allocates scratch)
+                    blocks = 0; start = time.perf_counter(); deadline = start + BENCH_SECONDS
+                    while time.perf_counter() < deadline:
+                        for _ in range(20): bank.render_into(65.41, block_size, out, enable_lfos)
+                        blocks += 20
+                    seconds_per_block = (time.perf_counter() - start) / blocks
+                    realtime = (block_size / sample_rate) / seconds_per_block
+                    results.append({'mode': mode, 'lfo': enable_lfos, 'oscillators': count, 'frames': block_size, 'us_per_block': seconds_per_block * 1e6, 'realtime_multiple': realtime})
+                    print(f"  {mode:9} {str(enable_lfos):5} {count:3} {block_size:6} {seconds_per_block * 1e6:9.1f} {realtime:11.0f}")
+    return results
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the DSP kernel and the reverb convolver.")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--kernel-only", action="store_true", help="Only time OscillatorBank.render_into.")
+    group.add_argument("--reverb-only", action="store_true", help="Only time PartitionedConvolver.process.")
+    args = parser.parse_args(argv)
+    if not np: print("numpy missing: nothing to benchmark."); return 1
+    if not args.reverb_only: print("Microbenchmarks (OscillatorBank.render_into):"); benchmark()
+    if not args.kernel_only: print("Microbenchmarks (PartitionedConvolver.process, stereo):"); benchmark_reverb()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+# grove/audio/ambience.py
+# Recorded ambience beds: PCM WAV files memory-mapped with np.memmap, streamed in slices with looping, crossfades and page prefetch.
+
+import os
+import struct
+import threading
+from typing import Optional, Dict, Any, List, Tuple
+
+try: import numpy as np
+except ImportError: np = None
+
+from .fadedloop import LoopRead, FadedLoopPlayer
+
+try: from .. import config
+except ImportError: config = type('config', (), {'DEBUG': False})
+
+# Default folder for '<audio_mood>.wav' ambiences (config.AMBIENCE_DIR / --ambience-dir override it)
+DEFAULT_AMBIENCE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'ambience')
+AMBIENCE_LEVEL = 0.5 # Gain applied to recordings before master volume
+AMBIENCE_FADE_SECONDS = 2.0 # Equal-power fade between moods
+LOOP_CROSSFADE_SECONDS = 3.0 # The end of a file overlaps its restart by this much, so recordings need not loop seamlessly
+PREFETCH_SECONDS = 4.0 # Audio ahead of each read head kept paged in
+PREFETCH_INTERVAL = 0.25 # Seconds between prefetch passes
+PAGE_BYTES = 4096
+MAX_AMBIENCE_READS = 3 # Reads mixed at once: the current one plus those fading out (mood change or loop restart)
+
+# (format tag, bits) -> (numpy dtype, scale to -1..1). 24-bit PCM cannot be memory-mapped as an array: convert such files to 16-bit
+_SAMPLE_FORMATS: Dict[Tuple[int, int], Tuple[str, float]] = {(1, 16): ('<i2', 1.0 / 32768), (1, 32): ('<i4', 1.0 / 2147483648), (3, 32): ('<f4', 1.0)}
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+def read_wav_layout(path: str) -> Dict[str, int]:
+    """
+    Parses a RIFF/WAVE header without reading the samples.
+
+    Returns:
+        Dict with format tag, channels, sample_rate, bits, block_align, and the
+        data chunk's byte offset and size.
+
+    Raises:
+        ValueError: Not a WAV file, or no fmt / data chunk.
+    """
+    layout: Dict[str, int] = {}
+    with open(path, 'rb') as wav_file:
+        riff, _, wave_id = struct.unpack('<4sI4s', wav_file.read(12))
+        if riff != b'RIFF' or wave_id != b'WAVE': raise ValueError("not a RIFF/WAVE file")
+        while 'data_offset' not in layout:
+            header = wav_file.read(8)
+            if len(header) < 8: break
+            chunk_id, size = struct.unpack('<4sI', header)
+            if chunk_id == b'fmt ':
+                fmt = wav_file.read(size)
+                tag, channels, sample_rate, _, block_align, bits = struct.unpack('<HHIIHH', fmt[:16])
+                if tag == _WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26: tag = struct.unpack('<H', fmt[24:26])[0] # Sub-format GUID starts with the real tag
+                layout.update(format=tag, channels=channels, sample_rate=sample_rate, bits=bits, block_align=block_align)
+                if size % 2: wav_file.seek(1, os.SEEK_CUR)
+            elif chunk_id == b'data': layout.update(data_offset=wav_file.tell(), data_size=min(size, os.path.getsize(path) - wav_file.tell()))
+            else: wav_file.seek(size + size % 2, os.SEEK_CUR) # Chunks are word-aligned
+    if 'format' not in layout or 'data_offset' not in layout: raise ValueError("missing fmt or data chunk")
+    return layout
+
+
+class AmbienceSource:
+    """
+    One WAV file as a read-only (frames, channels) np.memmap.
+
+    Nothing is read up front; `read_into()` converts a slice of the map into
+    the caller's float32 buffer, so only the pages actually played (or
+    prefetched) are ever loaded, and the OS may drop them again under pressure.
+    """
+
+    def __init__(self, path: str):
+        layout = read_wav_layout(path)
+        sample_format = _SAMPLE_FORMATS.get((layout['format'], layout['bits']))
+        if sample_format is None: raise ValueError(f"unsupported sample format (tag {layout['format']}, {layout['bits']} bit); use 16-bit PCM, 32-bit PCM or 32-bit float")
+        self.path = path; self.channels = layout['channels']; self.sample_rate = layout['sample_rate']
+        self.frames = layout['data_size'] // layout['block_align']
+        if self.frames == 0 or self.channels == 0: raise ValueError("no audio data")
+        self.data = np.memmap(path, dtype=sample_format[0], mode='r', offset=layout['data_offset'], shape=(self.frames, self.channels))
+        self.scale = np.float32(sample_format[1])
+        self.page_stride = max(1, PAGE_BYTES // layout['block_align']) # Frames per page, for prefetch touches
+
+    def read_into(self, position: int, frames: int, out: 'np.ndarray') -> int:
+        """Writes frames [position, position + frames) as float32 stereo into `out`, zero past the end. Returns the frames read."""
+        count = max(0, min(frames, self.frames - position))
+        if count:
+            chunk = self.data[position:position + count] # View onto the map
+            if self.channels >= 2: np.copyto(out[:count], chunk[:, :2], casting='unsafe') # Converting copy: no cast buffer, unlike a mixed-type multiply
+            else: np.copyto(out[:count, 0], chunk[:, 0], casting='unsafe'); np.copyto(out[:count, 1], out[:count, 0])
+            if self.scale != 1.0: np.multiply(out[:count], self.scale, out=out[:count])
+        if count < frames: out[count:].fill(0)
+        return count
+
+    def prefetch(self, position: int, frames: int):
+        """Faults in the pages for frames [position, position + frames), wrapping at the end. Not for the audio thread."""
+        for start, end in ((position, min(self.frames, position + frames)), (0, max(0, position + frames - self.frames))):
+            if end > start: int(np.add.reduce(self.data[start:end:self.page_stride, 0], dtype=np.int64 if self.data.dtype.kind == 'i' else np.float64)) # One touch per page
+
+
+class AmbiencePlayer(FadedLoopPlayer):
+    """
+    Streams the current mood's ambience from its AmbienceSource into the stereo output (see FadedLoopPlayer).
+
+    `set_target()` takes a source from AmbienceLibrary.peek; reads start at the
+    top of the file. Near the end of a file a second read restarts it from the
+    top and the two crossfade over LOOP_CROSSFADE_SECONDS. Per read and block:
+    one converting copy out of the map, one gain ramp, one add.
+    """
+    fade_seconds = AMBIENCE_FADE_SECONDS
+
+    def __init__(self, sample_rate: int, max_reads: int = MAX_AMBIENCE_READS):
+        super().__init__(sample_rate, max_reads); self.loops = 0
+
+    def heads(self) -> List[Tuple[AmbienceSource, int]]:
+        """(source, position) of every sounding read; safe to call from the prefetch thread."""
+        heads = []
+        for read in self.reads:
+            source = read.source
+            if source is not None: heads.append((source, read.position % source.frames))
+        return heads
+
+    def _before_block(self, frames: int):
+        current = self.current
+        if current is None: return
+        loop_frames = min(int(LOOP_CROSSFADE_SECONDS * self.sample_rate), current.source.frames // 2)
+        if current.position + loop_frames >= current.source.frames: # Overlap the tail with a restart
+            current.target = 0.0; current.step = self._fade_step(loop_frames / self.sample_rate)
+            self.current = self._start(current.name, current.source, 0, loop_frames / self.sample_rate); self.loops += 1
+
+    def _block_gains(self, read: LoopRead, level: float, new_level: float, frames: int) -> Tuple[float, float]:
+        return AMBIENCE_LEVEL * level ** 0.5, AMBIENCE_LEVEL * new_level ** 0.5
+
+    def _read_into(self, read: LoopRead, frames: int, out: 'np.ndarray') -> bool:
+        read.source.read_into(read.position, frames, out); read.position += frames
+        return read.position >= read.source.frames
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(super().stats(), loops=self.loops)
+
+
+class AmbienceLibrary:
+    """
+    AmbienceSources by name ('<name>.<rate>.wav' or '<name>.wav' in the ambience folder), and the prefetch thread for the players using them.
+
+    `get()` opens a file on first use (control threads only: it parses the
+    header and maps the file); `peek()` never touches the disk, for the audio
+    thread. A recording made at the engine's rate ('forest.48000.wav') wins over
+    the plain name, so one folder can serve devices at different rates. Missing
+    files and files at another sample rate are remembered as None, so they are
+    checked once.
+    """
+
+    def __init__(self, directory: Optional[str], sample_rate: int):
+        self.directory = directory or DEFAULT_AMBIENCE_DIR; self.sample_rate = sample_rate
+        self._sources: Dict[str, Optional[AmbienceSource]] = {}
+        self._open_lock = threading.Lock()
+        self._players: List[AmbiencePlayer] = []
+        self._prefetch_thread: Optional[threading.Thread] = None; self._stop_prefetch = threading.Event()
+        self.prefetch_passes = 0
+
+    def __len__(self) -> int:
+        return sum(source is not None for source in self._sources.values())
+
+    def peek(self, name: Optional[str]) -> Optional[AmbienceSource]:
+        return self._sources.get(name) if name else None
+
+    def get(self, name: Optional[str]) -> Optional[AmbienceSource]:
+        if not name or not np: return None
+        if name in self._sources: return self._sources[name]
+        with self._open_lock:
+            if name not in self._sources:
+                path = os.path.join(self.directory, f"{name}.{self.sample_rate}.wav"); source = None
+                if not os.path.isfile(path): path = os.path.join(self.directory, f"{name}.wav")
+                if os.path.isfile(path):
+                    try: source = AmbienceSource(path)
+                    except (OSError, ValueError, struct.error) as e: print(f"[WARN] Ambience '{path}' unusable: {e}")
+                    if source is not None and source.sample_rate != self.sample_rate:
+                        print(f"[WARN] Ambience '{path}' is {source.sample_rate} Hz, engine runs at {self.sample_rate} Hz; skipped (add '{name}.{self.sample_rate}.wav')."); source = None
+                    if source is not None and config.DEBUG: print(f"[DEBUG] Ambience '{name}' mapped: {source.frames / source.sample_rate:.1f}s, {source.channels}ch.")
+                self._sources = {**self._sources, name: source} # Copy-on-write: peek() may be reading
+                if source is not None: self._ensure_prefetch()
+            return self._sources[name]
+
+    def watch(self, player: AmbiencePlayer):
+        """Keeps `player`'s read heads prefetched (restarts the prefetch thread after close())."""
+        if player not in self._players: self._players.append(player)
+        if len(self): self._ensure_prefetch()
+
+    def _ensure_prefetch(self):
+        if self._prefetch_thread is not None and self._prefetch_thread.is_alive(): return
+        self._stop_prefetch.clear()
+        self._prefetch_thread = threading.Thread(target=self._prefetch_loop, daemon=True, name="AmbiencePrefetchThread")
+        self._prefetch_thread.start()
+
+    def _prefetch_loop(self):
+        while not self._stop_prefetch.wait(PREFETCH_INTERVAL):
+            for player in list(self._players):
+                for source, position in player.heads():
+                    try: source.prefetch(position, int(PREFETCH_SECONDS * source.sample_rate))
+                    except (OSError, ValueError) as e: print(f"[WARN] Ambience prefetch failed: {e}")
+            self.prefetch_passes += 1
+
+    def close(self):
+        """Stops the prefetch thread (mapped files stay open; a later get() restarts it)."""
+        self._stop_prefetch.set()
+        if self._prefetch_thread is not None: self._prefetch_thread.join(timeout=1.0); self._prefetch_thread = None
+
+
+print("[ambience.py] Loaded.")
@@ -0,0 +1,85 @@
+# grove/audio/automation.py
+# Block-rate parameter automation: linear glides for numeric engine parameters, applied as per-block ramps.
+
+from typing import Optional, Dict, Any, Tuple, Union
+
+# Engine parameters that glide; update_parameters() accepts a number (jump) or (target, seconds) for these
+AUTOMATED_PARAMS = ('base_freq', 'master_volume', 'reverb_wet')
+MAX_GLIDE_SECONDS = 600.0
+
+GlideRequest = Union[float, Tuple[float, float]]
+
+def parse_glide(value: Any) -> Optional[Tuple[float, float]]:
+    """(target, seconds) from a number (seconds 0) or a (target, seconds) pair (a list after JSON); None if it is neither."""
+    if isinstance(value, (tuple, list)) and len(value) == 2: target, seconds = value
+    else: target, seconds = value, 0.0
+    try: target = float(target); seconds = float(seconds)
+    except (TypeError, ValueError): return None
+    if target != target or seconds != seconds or not 0.0 <= seconds <= MAX_GLIDE_SECONDS: return None # NaN or out of range
+    return target, seconds
+
+def glide_target(value: Any) -> Any:
+    """The value a parameter ends up at: the target of a (target, seconds) request, else the value itself."""
+    return value[0] if isinstance(value, (tuple, list)) else value
+
+
+class ParameterAutomation:
+    """
+    Current value and glide of each automated parameter, advanced once per block (audio thread).
+
+    `set()` turns a request into a segment: target plus a per-frame step,
+    computed once. `advance()` moves every parameter by one block, after which
+    `span()` gives its (start, end) values across that block; the engine turns
+    those into a ramp with one vectorized multiply-add against its unit ramp
+    (or a frequency sweep, or a reverb level ramp), so there is no per-sample
+    Python. A None value means "unset" (e.g. reverb_wet: the space's default)
+    and never glides. Re-sending the request that is already in effect is a
+    no-op, since parameter snapshots repeat unchanged keys.
+    """
+
+    def __init__(self, sample_rate: int, initial: Dict[str, Any]):
+        self.sample_rate = sample_rate
+        self._state: Dict[str, list] = {} # name -> [start, end, target, step per frame, frames left] for the current block
+        self._requests: Dict[str, Any] = {}
+        self.reset(initial)
+
+    def reset(self, initial: Dict[str, Any]):
+        """Jumps every parameter to its (target) value, with no glide."""
+        self._requests = dict(initial)
+        self._state = {name: [value, value, value, 0.0, 0] for name, value in ((name, glide_target(request)) for name, request in initial.items())}
+
+    def set(self, name: str, request: Optional[GlideRequest]):
+        """Audio thread: applies a request from the block after the current one (number: jump; (target, seconds): glide)."""
+        if request == self._requests.get(name): return
+        self._requests[name] = request
+        state = self._state.setdefault(name, [None, None, None, 0.0, 0])
+        if request is None: state[1] = state[2] = None; state[4] = 0; return
+        target, seconds = request if isinstance(request, (tuple, list)) else (request, 0.0)
+        current = state[1]; frames = int(round(seconds * self.sample_rate))
+        if current is None or frames <= 0: state[1] = state[2] = target; state[4] = 0 # Jump at the next block
+        else: state[2] = target; state[3] = (target - current) / frames; state[4] = frames
+
+    def advance(self, frames: int):
+        """Audio thread: moves every parameter on by one block of `frames`."""
+        for state in self._state.values():
+            state[0] = state[1]
+            if state[4] <= 0: continue
+            if state[4] <= frames: state[1] = state[2]; state[4] = 0 # Lands exactly on the target
+            else: state[1] += state[3] * frames; state[4] -= frames
+
+    def span(self, name: str) -> Tuple[Any, Any]:
+        """(start, end) value across the block last advanced."""
+        state = self._state.get(name)
+        return (state[0], state[1]) if state is not None else (None, None)
+
+    def value(self, name: str) -> Any:
+        """Value at the end of the block last advanced (where the next block starts)."""
+        state = self._state.get(name)
+        return state[1] if state is not None else None
+
+    def stats(self) -> Dict[str, Any]:
+        """Glides in progress: {name: {'value', 'target', 'seconds_left'}}."""
+        return {name: {'value': state[1], 'target': state[2], 'seconds_left': state[4] / self.sample_rate} for name, state in self._state.items() if state[4] > 0}
+
+
+print("[automation.py] Loaded.")
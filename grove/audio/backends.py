@@ -0,0 +1,170 @@
+# grove/audio/backends.py
+# Output backends for AudioEngine: a real sounddevice stream, or clocked fake devices
+# (null sink / in-memory capture) that drive the callback without a sound card.
+
+import time
+from typing import Optional, Callable, Any
+
+try: import sounddevice as sd
+except (ImportError, OSError): sd = None # OSError: PortAudio library absent
+try: import numpy as np
+except ImportError: np = None
+
+try: from .. import config
+except ImportError: config = type('config', (), {'DEBUG': False})
+
+# callback(outdata, frames, time_info, status) -- same signature sounddevice uses
+AudioCallback = Callable[[Any, int, Any, Any], None]
+
+# A device's native rate is used only inside these bounds; outside them the host resampling is cheaper than synthesizing at that rate
+MIN_NATIVE_SAMPLE_RATE = 22050; MAX_NATIVE_SAMPLE_RATE = 96000
+
+
+class AudioBackendError(RuntimeError):
+    """Raised when a backend cannot open or keep running its output."""
+
+
+class AudioBackend:
+    """
+    Interface for an audio output. `run()` blocks on the audio thread, calling
+    `callback` once per block until `keep_running()` returns False; `on_idle`
+    (if given) is called between blocks from a non-real-time context.
+    `latency` is a device latency hint ('low' / 'high' / seconds) that
+    backends without a real device ignore.
+    """
+    name = 'base'
+
+    def check(self, sample_rate: int, channels: int):
+        """Raises AudioBackendError if the output cannot be opened with these settings."""
+
+    def native_sample_rate(self) -> Optional[int]:
+        """The output's native rate in Hz (running at it avoids resampling in the host audio stack), or None if it has no preference."""
+        return None
+
+    def run(self, callback: AudioCallback, sample_rate: int, blocksize: int, channels: int,
+            keep_running: Callable[[], bool], on_idle: Optional[Callable[[], None]] = None, latency: Any = None):
+        raise NotImplementedError
+
+
+class SoundDeviceBackend(AudioBackend):
+    """Real output through a PortAudio stream."""
+    name = 'sounddevice'
+
+    def __init__(self, latency: str = 'low'):
+        self.latency = latency
+
+    def check(self, sample_rate: int, channels: int):
+        if not sd: raise AudioBackendError("sounddevice unavailable")
+        try: sd.check_output_settings(samplerate=sample_rate, channels=channels, dtype='float32')
+        except Exception as e: raise AudioBackendError(f"Audio settings check FAIL: {e}. Check device.") from e
+
+    def native_sample_rate(self) -> Optional[int]:
+        if not sd: return None
+        try: return int(round(sd.query_devices(kind='output')['default_samplerate']))
+        except Exception as e: # No default output device, or PortAudio refuses to enumerate
+            if config.DEBUG: print(f"[DEBUG] Output device rate query failed: {e}")
+            return None
+
+    def run(self, callback, sample_rate, blocksize, channels, keep_running, on_idle=None, latency=None):
+        if not sd: raise AudioBackendError("sounddevice unavailable")
+        try:
+            with sd.OutputStream(samplerate=sample_rate, blocksize=blocksize, channels=channels, dtype='float32', callback=callback, latency=latency or self.latency) as stream:
+                if config.DEBUG: print(f"Audio stream active ({channels}ch, {sample_rate} Hz, {blocksize} frames, {stream.latency:.4f}s latency)")
+                else: print("Audio stream active.")
+                while keep_running():
+                    time.sleep(blocksize / sample_rate)
+                    if on_idle: on_idle()
+        except sd.PortAudioError as pae: raise AudioBackendError(f"PortAudio Error: {pae}") from pae
+        except ValueError as ve: raise AudioBackendError(f"Stream Setup ValueError: {ve} (Check Stereo?)") from ve
+
+
+class _ClockedBackend(AudioBackend):
+    """
+    Fake device: drives the callback from its own loop at `clock_rate` times real time
+    (1.0 = real time, 0 = as fast as possible). Subclasses consume each rendered block.
+    Counters and captured audio accumulate across `run()` calls, like one device
+    reopened with a new block size. `native_rate` is the rate it reports as native
+    (None: no preference), to exercise rate negotiation without a sound card.
+    """
+
+    def __init__(self, clock_rate: float = 1.0, max_blocks: Optional[int] = None, native_rate: Optional[int] = None):
+        self.clock_rate = clock_rate; self.max_blocks = max_blocks; self.native_rate = native_rate
+        self.blocks_rendered = 0; self.late_blocks = 0 # Late: callback finished after the block's deadline
+
+    def check(self, sample_rate: int, channels: int):
+        if not np: raise AudioBackendError("numpy unavailable")
+
+    def native_sample_rate(self) -> Optional[int]:
+        return self.native_rate
+
+    def _open(self, sample_rate: int, blocksize: int, channels: int): pass
+
+    def _consume(self, outdata, frames: int): pass
+
+    def run(self, callback, sample_rate, blocksize, channels, keep_running, on_idle=None, latency=None):
+        self._open(sample_rate, blocksize, channels)
+        outdata = np.zeros((blocksize, channels), dtype=np.float32)
+        block_seconds = blocksize / sample_rate; next_deadline = time.perf_counter()
+        while keep_running() and (self.max_blocks is None or self.blocks_rendered < self.max_blocks):
+            callback(outdata, blocksize, None, None)
+            self._consume(outdata, blocksize); self.blocks_rendered += 1
+            if on_idle: on_idle()
+            if self.clock_rate > 0:
+                next_deadline += block_seconds / self.clock_rate
+                delay = next_deadline - time.perf_counter()
+                if delay > 0: time.sleep(delay)
+                else: self.late_blocks += 1; next_deadline = time.perf_counter() # Resync instead of bursting
+
+
+class NullBackend(_ClockedBackend):
+    """Discards the output; for headless runs and benchmarks."""
+    name = 'null'
+
+
+class CaptureBackend(_ClockedBackend):
+    """Keeps the first `max_seconds` of output in memory; see `captured`."""
+    name = 'capture'
+
+    def __init__(self, clock_rate: float = 1.0, max_blocks: Optional[int] = None, max_seconds: float = 60.0, native_rate: Optional[int] = None):
+        super().__init__(clock_rate, max_blocks, native_rate)
+        self.max_seconds = max_seconds
+        self.buffer = None; self.frames_captured = 0; self.frames_dropped = 0
+
+    def _open(self, sample_rate, blocksize, channels):
+        if self.buffer is not None and self.buffer.shape[1] == channels: return # Reopened: keep appending
+        self.buffer = np.zeros((int(self.max_seconds * sample_rate), channels), dtype=np.float32)
+        self.frames_captured = 0; self.frames_dropped = 0
+
+    def _consume(self, outdata, frames):
+        count = min(frames, self.buffer.shape[0] - self.frames_captured)
+        if count > 0: self.buffer[self.frames_captured:self.frames_captured + count] = outdata[:count]; self.frames_captured += count
+        self.frames_dropped += frames - max(count, 0)
+
+    @property
+    def captured(self):
+        """The captured audio so far as a (frames, channels) view."""
+        return self.buffer[:self.frames_captured] if self.buffer is not None else None
+
+
+def negotiate_sample_rate(backend: Optional[AudioBackend], requested: Optional[int], fallback: int) -> int:
+    """`requested` if given, else the backend's native rate when it reports a usable one, else `fallback`."""
+    if requested: return int(requested)
+    native = backend.native_sample_rate() if backend is not None else None
+    if native is None: return fallback
+    if not MIN_NATIVE_SAMPLE_RATE <= native <= MAX_NATIVE_SAMPLE_RATE:
+        print(f"[WARN] Output device runs at {native} Hz; synthesizing at {fallback} Hz instead (the host resamples)."); return fallback
+    return native
+
+
+BACKENDS = {'sounddevice': SoundDeviceBackend, 'null': NullBackend, 'capture': CaptureBackend}
+
+def create_backend(name: str = 'sounddevice', **kwargs) -> Optional[AudioBackend]:
+    """Builds a backend by name; returns None (audio disabled) if it cannot work here."""
+    backend_class = BACKENDS.get(name)
+    if backend_class is None: print(f"Unknown audio backend '{name}'."); return None
+    if backend_class is SoundDeviceBackend and not sd: return None
+    if backend_class is not SoundDeviceBackend and not np: return None
+    return backend_class(**kwargs)
+
+
+print("[backends.py] Loaded.")
@@ -0,0 +1,364 @@
+# grove/audio/dsp.py
+# The one synthesis kernel: phase-continuous oscillator banks shared by the engine, offline tools and checks.
+# generate_sine_wave / generate_lfo in synth.py remain as simple allocating reference generators.
+
+from typing import Optional, Union, List, Tuple
+
+try: import numpy as np
+except ImportError: np = None
+
+# Type hint for numpy array robust against np possibly being None during import errors
+NpArray = Optional['np.ndarray']
+
+# --- Wavetable Oscillator ---
+# Phase accumulators are 32-bit fixed point: one full cycle == 2**32, so they wrap
+# exactly and never lose precision however long the session runs. They are held
+# as integer-valued float64 (exact below 2**53) so the render path stays in one dtype.
+PHASE_BITS = 32
+SINE_TABLE_BITS = 12 # 4096-entry table, linearly interpolated
+SINE_TABLE_SIZE = 1 << SINE_TABLE_BITS
+_PHASE_CYCLE = float(1 << PHASE_BITS)
+_TABLE_SCALE = SINE_TABLE_SIZE / _PHASE_CYCLE # Power of two: phase -> table position is exact
+_TWO_PI = 2 * 3.141592653589793
+
+if np:
+    _SINE_TABLE = np.sin(2 * np.pi * np.arange(SINE_TABLE_SIZE + 1) / SINE_TABLE_SIZE) # +1 guard point
+    _SINE_DELTA = np.append(np.diff(_SINE_TABLE), 0.0) # Slope per table step for interpolation
+else:
+    _SINE_TABLE = None; _SINE_DELTA = None
+
+def phase_increment(frequency: Union[float, NpArray], sample_rate: int) -> NpArray:
+    """Converts frequency in Hz to a fixed-point phase increment per sample (integer-valued float64)."""
+    cycles_per_sample = np.maximum(np.asarray(frequency, dtype=np.float64), 0.0) / sample_rate
+    return np.remainder(np.rint(cycles_per_sample * _PHASE_CYCLE), _PHASE_CYCLE)
+
+def wavetable_sine(phase_acc: NpArray) -> NpArray:
+    """Interpolated sine lookup for fixed-point phases in [0, 2**32) (any array shape)."""
+    position = np.asarray(phase_acc, dtype=np.float64) * _TABLE_SCALE
+    table_index = np.floor(position).astype(np.intp)
+    return _SINE_TABLE[table_index] + (position - table_index) * _SINE_DELTA[table_index]
+
+# --- Oscillator Bank ---
+# Scales preset LFO depth so modulated amplitude never fully reaches zero.
+MAX_LFO_DEPTH_SCALE = 0.90
+# LFOs (0.1-0.4 Hz) are evaluated this many times per second and linearly interpolated to audio rate.
+LFO_CONTROL_RATE = 100.0
+# 'sine': float phase in cycles + np.sin. 'wavetable': fixed-point accumulator + table lookup.
+OSCILLATOR_MODES = ('sine', 'wavetable')
+# Largest render-rate divisor set_quality() accepts (drone partials sit far below a quarter of the rate)
+MAX_DECIMATION = 4
+
+def _block_view(scratch: NpArray, rows: int, points: int) -> NpArray:
+    """A contiguous (rows x points) view onto the start of a contiguous scratch matrix."""
+    return scratch.reshape(-1)[:rows * points].reshape(rows, points)
+
+class OscillatorBank:
+    """
+    Renders every partial of a mood preset with a single broadcast operation.
+
+    The preset tuples (freq_mult, base_amp, lfo_rate, lfo_depth) are validated
+    once and stored as per-oscillator arrays. Oscillator and LFO phases wrap
+    every cycle, so consecutive chunks join seamlessly and the output does not
+    degrade over long sessions.
+
+    Work matrices are oscillator-major (oscillators x frames) and preallocated
+    by `prepare()`. The whole phase matrix comes from one (n x 2) @ (2 x frames)
+    product of [increment, phase] against [sample_index; 1]; every later step is
+    an in-place ufunc on same-shaped arrays, so the `*_into` methods render
+    without allocating array memory (numpy buffers broadcast operands, so the
+    kernels deliberately avoid them).
+
+    Amplitude LFOs run at control rate: each LFO is evaluated only at
+    LFO_CONTROL_RATE points per second (same matmul trick, on a tiny matrix)
+    and interpolated to audio rate by a single product with a precomputed
+    linear-interpolation basis. LFO phases are kept in cycles in both modes.
+
+    Oscillators are stored loudest first (`order` maps them back to the
+    preset), so `set_quality()` can render only the loud ones as a row prefix
+    of the same matrices, and/or only every `decimation`-th sample, linearly
+    interpolated back up to the output rate.
+    """
+
+    def __init__(self, preset_data: List[Tuple[float, ...]], sample_rate: int, mode: str = 'sine'):
+        """
+        Args:
+            preset_data: The mood parameters [(freq_mult, base_amp, lfo_rate, lfo_depth), ...].
+            sample_rate: The audio sample rate in Hz.
+            mode: One of OSCILLATOR_MODES.
+
+        Raises:
+            ValueError: If the preset tuples are malformed or the mode is unknown.
+        """
+        if mode not in OSCILLATOR_MODES: raise ValueError(f"Unknown oscillator mode '{mode}'")
+        params = np.asarray(preset_data, dtype=np.float64).reshape(-1, 4)
+        self.order = np.argsort(-params[:, 1], kind='stable') # Loudest first; ties keep preset order
+        params = params[self.order]
+        num_oscillators = params.shape[0]
+        self.sample_rate = sample_rate
+        self.mode = mode
+        self.freq_mults = np.maximum(params[:, 0], 0.0)
+        self.amplitudes = np.maximum(params[:, 1], 0.0)
+        self.lfo_rates = np.maximum(params[:, 2], 0.0)
+        self.lfo_depths = np.clip(params[:, 3] * MAX_LFO_DEPTH_SCALE, 0.0, 1.0)
+        self._lfo_gain_depth = self.amplitudes * self.lfo_depths # Gain = offset + depth * lfo
+        self._lfo_gain_offset = self.amplitudes * (1.0 - self.lfo_depths)
+        self.phases = np.zeros(num_oscillators, dtype=np.float64) # Cycles ('sine') or fixed-point ('wavetable')
+        self._phase_cycles_scratch = np.zeros(num_oscillators, dtype=np.float64)
+        self.lfo_phases = np.zeros(num_oscillators, dtype=np.float64) # Cycles in both modes
+        self._coefficients = np.zeros((num_oscillators, 3), dtype=np.float64) # [increment, start phase, sweep] per oscillator
+        self._coeff_increments = self._coefficients[:, 0]; self._coeff_phases = self._coefficients[:, 1]; self._coeff_sweeps = self._coefficients[:, 2]
+        self._lfo_coefficients = np.zeros((num_oscillators, 2), dtype=np.float64) # [increment, start phase] in cycles
+        self._lfo_increments = self._lfo_coefficients[:, 0]; self._lfo_start_phases = self._lfo_coefficients[:, 1]
+        self._rows = num_oscillators; self._target_rows = num_oscillators; self.decimation = 1 # See set_quality()
+        self._frames = 0
+
+    @property
+    def num_oscillators(self) -> int:
+        return self.phases.shape[0]
+
+    @property
+    def active_partials(self) -> int:
+        """Partials rendered (once a pending quality change has faded through)."""
+        return self._target_rows
+
+    def set_quality(self, min_amplitude_ratio: float = 0.0, decimation: int = 1):
+        """
+        Renders only the partials at least `min_amplitude_ratio` times as loud as the loudest (which always stays),
+        at 1/`decimation` of the sample rate (1: full rate).
+
+        Takes effect at the next block; partials dropped or restored fade out / in across it. Phases of
+        dropped partials keep advancing, so restoring one is seamless. Cached-loop playback
+        (`mix_partials_buffer_into`) honours the partial count only; `render_partials_into` is always full quality.
+        """
+        loudest = self.amplitudes[0] if self.num_oscillators else 0.0
+        self._target_rows = min(self.num_oscillators, max(1, int(np.count_nonzero(self.amplitudes >= min_amplitude_ratio * loudest))))
+        self.decimation = max(1, min(MAX_DECIMATION, int(decimation)))
+
+    def reset(self):
+        """Restarts all oscillators and LFOs at phase zero."""
+        self.phases.fill(0.0); self.lfo_phases.fill(0.0)
+        self._rows = self._target_rows # No partial fade: a restarted bank fades in as a whole
+
+    def load_phase_cycles(self, phase_cycles: NpArray):
+        """Sets oscillator phases from cycles in [0, 1) (one per oscillator), e.g. to continue a cached loop."""
+        if self.mode == 'wavetable':
+            np.multiply(phase_cycles, _PHASE_CYCLE, out=self.phases); np.rint(self.phases, out=self.phases); np.remainder(self.phases, _PHASE_CYCLE, out=self.phases)
+        else: np.copyto(self.phases, phase_cycles)
+
+    def phase_cycles(self) -> NpArray:
+        """Oscillator phases in cycles [0, 1), in a scratch array (the inverse of load_phase_cycles), e.g. to line a cached loop up with the bank."""
+        cycles = self._phase_cycles_scratch
+        if self.mode == 'wavetable': np.multiply(self.phases, 1.0 / _PHASE_CYCLE, out=cycles)
+        else: np.remainder(self.phases, 1.0, out=cycles)
+        return cycles
+
+    def rewind_lfos(self):
+        """Puts the LFOs back where the last block started, so mixing that block again (from a cached loop) gets the same gains."""
+        np.copyto(self.lfo_phases, self._lfo_start_phases)
+
+    def prepare(self, frames: int):
+        """Preallocates the work matrices for chunks of exactly `frames` samples."""
+        if frames == self._frames: return
+        shape = (self.num_oscillators, frames)
+        index = np.arange(frames, dtype=np.float64); self._index_rows = np.vstack([index, np.ones(frames), 0.5 * index * index]) # [n; 1; n^2/2]
+        self._unit_scratch = np.empty(shape, dtype=np.float64) # Unit sines (oscillators)
+        self._aux_scratch = np.empty(shape, dtype=np.float64) # LFO sines
+        self._lookup_scratch = np.empty(shape, dtype=np.float64) # Floor / table values
+        self._table_index_scratch = np.empty(shape, dtype=np.intp)
+        self._mix_scratch = np.empty(frames, dtype=np.float64); self._mix_aux_scratch = np.empty(frames, dtype=np.float64)
+        # Control-rate LFO points at sample offsets t_k spanning the chunk (both ends included, so chunks join)
+        self._segments = segments = max(1, int(np.ceil(frames * LFO_CONTROL_RATE / self.sample_rate)))
+        self._control_times = control_times = np.linspace(0.0, frames, segments + 1)
+        self._control_rows = np.vstack([control_times, np.ones(segments + 1)]) # [t_k; 1]
+        self._control_scratch = np.empty((self.num_oscillators, segments + 1), dtype=np.float64)
+        self._interp_basis = self._lfo_basis(np.arange(frames, dtype=np.float64), frames) # (points x frames) hat functions
+        unit = np.arange(frames, dtype=np.float64) / frames; self._fade_ramps = (unit, 1.0 - unit) # (in, out) for partials changing this block
+        self._grids = {decimation: self._build_grid(frames, decimation) for decimation in range(2, MAX_DECIMATION + 1)} # Every step a tier can ask for: none built in the callback
+        self._frames = frames
+
+    def _lfo_basis(self, sample_times: NpArray, frames: int) -> NpArray:
+        """Hat functions interpolating the control points linearly to `sample_times` (offsets within the chunk)."""
+        distance = np.abs(sample_times[np.newaxis, :] - self._control_times[:, np.newaxis])
+        return np.maximum(0.0, 1.0 - distance * (self._segments / frames))
+
+    def _build_grid(self, frames: int, decimation: int) -> Optional[tuple]:
+        """
+        (points, LFO basis, fade ramps, upsampling scratch, step) for rendering every `step`-th sample of a chunk,
+        `step` being the largest one up to `decimation` that divides it (an 882-frame block at 4 renders at 3),
+        or None when no step above 1 does. Points run from the chunk start to the next chunk's start
+        inclusive, so interpolation never needs a sample from another block.
+        """
+        step = next((step for step in range(decimation, 1, -1) if frames % step == 0 and frames >= 2 * step), None)
+        if step is None: return None
+        steps = frames // step; sample_times = np.arange(steps + 1, dtype=np.float64) * step
+        unit = sample_times / frames
+        return (steps + 1, self._lfo_basis(sample_times, frames), (unit, 1.0 - unit), np.empty((steps, step), dtype=np.float64), step)
+
+    def _grid(self, frames: int, decimation: int) -> Optional[tuple]:
+        """The grid prepare() built for `decimation` (None: render at full rate)."""
+        return self._grids.get(decimation)
+
+    def _unit_sines(self, phases: NpArray, rates: NpArray, rate_scale: float, frames: int, out: NpArray, decimation: int = 1, end_rate_scale: Optional[float] = None):
+        """
+        Writes unit-amplitude sines for frequencies `rates * rate_scale` into `out`, advancing `phases` in place by `frames` samples.
+
+        `out` is (rows x points): the first `rows` oscillators, at every `decimation`-th sample from the chunk start.
+        Every oscillator's phase advances, rendered or not. With `end_rate_scale` the frequencies sweep linearly
+        to `rates * end_rate_scale` across the chunk: a quadratic phase term, still one product for all oscillators.
+        """
+        increments = self._coeff_increments; sweeps = self._coeff_sweeps; rows, points = out.shape; steps = frames // decimation
+        coefficients = self._coefficients[:rows]; index_rows = self._index_rows[:, :points]
+        sweeping = end_rate_scale is not None and end_rate_scale != rate_scale
+        if self.mode == 'wavetable':
+            scale = decimation * _PHASE_CYCLE / self.sample_rate
+            np.multiply(rates, rate_scale * scale, out=increments); np.rint(increments, out=increments)
+            if sweeping: np.multiply(rates, end_rate_scale * scale, out=sweeps); np.rint(sweeps, out=sweeps); np.subtract(sweeps, increments, out=sweeps); np.multiply(sweeps, 1.0 / steps, out=sweeps)
+            else: sweeps.fill(0.0)
+            np.copyto(self._coeff_phases, phases)
+            np.matmul(coefficients, index_rows, out=out) # Exact integer phases when steady
+            np.remainder(out, _PHASE_CYCLE, out=out); np.multiply(out, _TABLE_SCALE, out=out) # -> table position
+            lookup = _block_view(self._lookup_scratch, rows, points); table_index = _block_view(self._table_index_scratch, rows, points)
+            np.floor(out, out=lookup); np.copyto(table_index, lookup, casting='unsafe'); np.subtract(out, lookup, out=out) # out = frac
+            _SINE_DELTA.take(table_index, out=lookup, mode='clip'); np.multiply(out, lookup, out=out)
+            _SINE_TABLE.take(table_index, out=lookup, mode='clip'); np.add(out, lookup, out=out)
+            if sweeping: np.multiply(sweeps, 0.5 * steps, out=sweeps); np.add(increments, sweeps, out=increments) # Mean increment over the chunk
+            np.multiply(increments, steps, out=increments); np.add(phases, increments, out=phases); np.rint(phases, out=phases); np.remainder(phases, _PHASE_CYCLE, out=phases)
+        else:
+            scale = decimation / self.sample_rate
+            np.multiply(rates, rate_scale * scale, out=increments) # Cycles per rendered sample
+            if sweeping: np.multiply(rates, (end_rate_scale - rate_scale) * scale / steps, out=sweeps)
+            else: sweeps.fill(0.0)
+            np.copyto(self._coeff_phases, phases)
+            np.matmul(coefficients, index_rows, out=out)
+            np.multiply(out, _TWO_PI, out=out); np.sin(out, out=out)
+            if sweeping: np.multiply(sweeps, 0.5 * steps, out=sweeps); np.add(increments, sweeps, out=increments)
+            np.multiply(increments, steps, out=increments); np.add(phases, increments, out=phases); np.remainder(phases, 1.0, out=phases)
+
+    def _control_rate_lfos(self, frames: int, out: NpArray, basis: NpArray):
+        """Writes unit LFO sines for the first rows of `out`, evaluated at the control points and interpolated through `basis`; advances lfo_phases."""
+        control = self._control_scratch
+        np.multiply(self.lfo_rates, 1.0 / self.sample_rate, out=self._lfo_increments) # Cycles per sample
+        np.copyto(self._lfo_start_phases, self.lfo_phases)
+        np.matmul(self._lfo_coefficients, self._control_rows, out=control) # LFO phase at each control point
+        np.multiply(control, _TWO_PI, out=control); np.sin(control, out=control)
+        np.matmul(control[:out.shape[0]], basis, out=out) # Linear interpolation to the rendered samples in one product
+        np.multiply(self._lfo_increments, frames, out=self._lfo_increments); np.add(self.lfo_phases, self._lfo_increments, out=self.lfo_phases); np.remainder(self.lfo_phases, 1.0, out=self.lfo_phases)
+
+    def _render_unit_partials(self, base_freq: float, frames: int, enable_lfos: bool) -> Tuple[NpArray, Optional[NpArray]]:
+        """Returns the scratch (oscillators x frames) unit sines, plus the LFO sines if enabled."""
+        self.prepare(frames)
+        self._unit_sines(self.phases, self.freq_mults, max(0.0, base_freq), frames, self._unit_scratch)
+        if not enable_lfos: return self._unit_scratch, None
+        self._control_rate_lfos(frames, self._aux_scratch, self._interp_basis)
+        return self._unit_scratch, self._aux_scratch
+
+    def _block_rows(self) -> int:
+        return max(self._rows, self._target_rows) # Partials leaving or joining still render for one more block
+
+    def _fade_changed_rows(self, partials: NpArray, ramps: Tuple[NpArray, NpArray]):
+        """Fades partials being restored (in) or dropped (out) across this block, then settles the row count."""
+        rows, target = self._rows, self._target_rows
+        if rows == target: return
+        ramp = ramps[0] if target > rows else ramps[1]
+        for i in range(min(rows, target), max(rows, target)): np.multiply(partials[i], ramp, out=partials[i]) # Per row: a broadcast would be buffered
+        self._rows = target
+
+    def partials_buffer(self, frames: int) -> NpArray:
+        """The (rows x frames) scratch that `mix_partials_buffer_into` reads; fill it with the first rows' unit-amplitude partials."""
+        self.prepare(frames)
+        return self._unit_scratch[:self._block_rows()]
+
+    def mix_partials_buffer_into(self, frames: int, out: NpArray, enable_lfos: bool = False):
+        """
+        Mixes unit partials written into `partials_buffer()` (e.g. copied from a cached loop) into `out`.
+
+        Only the LFOs advance; oscillator phases are left alone, since the caller supplied the partials.
+        """
+        self.prepare(frames)
+        partials = self._unit_scratch[:self._block_rows()]; lfo = None
+        if enable_lfos: lfo = self._aux_scratch[:partials.shape[0]]; self._control_rate_lfos(frames, lfo, self._interp_basis)
+        self._fade_changed_rows(partials, self._fade_ramps)
+        np.copyto(out, self._mix(partials, lfo), casting='same_kind')
+
+    def _mix(self, partials: NpArray, lfo: Optional[NpArray]) -> NpArray:
+        """The partial rows weighted by their amplitudes (or LFO gain envelopes) and summed, in the mix scratch. Overwrites `lfo`."""
+        rows, points = partials.shape; mix = self._mix_scratch[:points]
+        if lfo is not None: # sum_i sin_i * (offset_i + depth_i * lfo_i) as two dot products
+            aux = self._mix_aux_scratch[:points]; np.multiply(partials, lfo, out=lfo)
+            np.dot(self._lfo_gain_depth[:rows], lfo, out=mix); np.dot(self._lfo_gain_offset[:rows], partials, out=aux); np.add(mix, aux, out=mix)
+        else: np.dot(self.amplitudes[:rows], partials, out=mix)
+        return mix
+
+    def _upsample(self, samples: NpArray, upsampled: NpArray) -> NpArray:
+        """Linearly interpolates `samples` (every d-th sample, chunk start to next chunk start) to every sample of the chunk."""
+        steps, decimation = upsampled.shape; start = samples[:steps]; end = samples[1:]
+        for offset in range(decimation): # Column k lies k/d of the way from each sample to the next
+            column = upsampled[:, offset]
+            np.subtract(end, start, out=column); np.multiply(column, offset / decimation, out=column); np.add(column, start, out=column)
+        return upsampled.reshape(-1)
+
+    def render_partials_into(self, base_freq: float, frames: int, out: NpArray, enable_lfos: bool = False):
+        """
+        Renders each partial into its own row of `out` and advances phase state.
+
+        Args:
+            base_freq: Fundamental frequency in Hz; each partial plays at base_freq * freq_mult.
+            frames: Number of samples to generate.
+            out: An (oscillators x frames) array to write the amplitude-scaled partials into.
+            enable_lfos: Apply per-oscillator amplitude LFOs.
+        """
+        partials, lfo = self._render_unit_partials(base_freq, frames, enable_lfos)
+        for i in range(self.num_oscillators): # Per-row scaling: a broadcast here would be buffered
+            if lfo is not None:
+                np.multiply(lfo[i], self._lfo_gain_depth[i], out=lfo[i]); np.add(lfo[i], self._lfo_gain_offset[i], out=lfo[i])
+                np.multiply(partials[i], lfo[i], out=partials[i])
+            else: np.multiply(partials[i], self.amplitudes[i], out=partials[i])
+            np.copyto(out[i], partials[i], casting='same_kind')
+
+    def render_into(self, base_freq: float, frames: int, out: NpArray, enable_lfos: bool = False, end_base_freq: Optional[float] = None):
+        """
+        Renders the summed partials into `out` (length `frames`) at the set_quality() level and advances phase state.
+
+        Args:
+            base_freq: Fundamental frequency in Hz; each partial plays at base_freq * freq_mult.
+            frames: Number of samples to generate.
+            out: A 1-D array (usually float32) to write the mono mix into.
+            enable_lfos: Apply per-oscillator amplitude LFOs.
+            end_base_freq: Fundamental at the end of the chunk; partials glide linearly from base_freq to it (None: steady).
+        """
+        if self.num_oscillators == 0: out.fill(0.0); return
+        self.prepare(frames)
+        grid = self._grid(frames, self.decimation) if self.decimation > 1 else None # None: full rate (also when no step divides the block)
+        if grid is None: points, basis, ramps, decimation = frames, self._interp_basis, self._fade_ramps, 1
+        else: points, basis, ramps, upsampled, decimation = grid
+        rows = self._block_rows(); partials = _block_view(self._unit_scratch, rows, points); lfo = None
+        self._unit_sines(self.phases, self.freq_mults, max(0.0, base_freq), frames, partials, decimation, None if end_base_freq is None else max(0.0, end_base_freq))
+        if enable_lfos: lfo = _block_view(self._aux_scratch, rows, points); self._control_rate_lfos(frames, lfo, basis)
+        self._fade_changed_rows(partials, ramps)
+        mix = self._mix(partials, lfo)
+        np.copyto(out, mix if grid is None else self._upsample(mix, upsampled), casting='same_kind')
+
+    def render_partials(self, base_freq: float, frames: int, enable_lfos: bool = False) -> NpArray:
+        """Allocating variant of render_partials_into; returns a float64 (oscillators x frames) array."""
+        out = np.empty((self.num_oscillators, frames), dtype=np.float64)
+        if frames > 0: self.render_partials_into(base_freq, frames, out, enable_lfos)
+        return out
+
+    def render(self, base_freq: float, frames: int, enable_lfos: bool = False) -> NpArray:
+        """
+        Renders the summed partials for the next chunk and advances phase state.
+
+        Args:
+            base_freq: Fundamental frequency in Hz; each partial plays at base_freq * freq_mult.
+            frames: Number of samples to generate.
+            enable_lfos: Apply per-oscillator amplitude LFOs.
+
+        Returns:
+            The mono mix as a float32 array of length `frames`.
+        """
+        out = np.zeros(max(0, frames), dtype=np.float32)
+        if frames > 0: self.render_into(base_freq, frames, out, enable_lfos)
+        return out
+
+
+print("[dsp.py] Loaded.")
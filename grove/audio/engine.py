@@ -1,283 +1,614 @@
 # grove/audio/engine.py
-# v40: Fix IndentationError, fix NameError in _generate_binaural_beats (AGAIN).
+# v64: Runs at the output device's native sample rate; everything derived from the rate is built per rate, on first use (_RateContext).
 
-try: import sounddevice as sd
-except ImportError: print("\nERROR: SD Missing\n"); sd = None
 try: import numpy as np
 except ImportError: print("\nERROR: NP Missing\n"); np = None
 
 import threading
 import time
-import random
-import sys
 import traceback
-from queue import Queue, Empty
-from typing import Optional, Dict, List, Any, Tuple, Union
+from typing import Optional, Dict, Any, Tuple
 
 # Local imports
 try: from .synth import generate_sine_wave, generate_lfo
 except ImportError as e: print(f"Synth import Err: {e}"); generate_sine_wave = None; generate_lfo = None
+try: from .dsp import OscillatorBank
+except ImportError as e: print(f"DSP import Err: {e}"); OscillatorBank = None
+from .backends import AudioBackend, AudioBackendError, create_backend, negotiate_sample_rate
+from .params import ParameterMailbox
+from .loopcache import LoopCache, LoopBuffer
+from .stats import CallbackStats, format_stats
+from .ring import BlockRing
+from .mixer import DroneLayer, LayerMixer, MAX_DRONE_LAYERS
+from .voices import CueCache, VoicePool, MAX_VOICES
+from .reverb import ReverbStage
+from .noisebed import NoiseBedCache, NoiseBedPlayer
+from .ambience import AmbienceLibrary, AmbiencePlayer
+from .recorder import SessionRecorder
+# Mood table and compiled location profiles; the MOOD_* views are re-exported here for older callers
+from .profiles import MOOD_PRESETS, MOOD_BASE_FREQS, MOOD_REVERB_SPACES, MOOD_NOISE_BEDS, DEFAULT_BASE_FREQ, PROFILES, AudioProfile
+from .latency import LATENCY_PROFILES, DEFAULT_LATENCY_PROFILE, AdaptiveBlockSizer, resolve_profile
+from .quality import QUALITY_TIERS, DEFAULT_QUALITY, QualityGovernor, tier_index
+from .automation import AUTOMATED_PARAMS, ParameterAutomation, parse_glide, glide_target
+from .rtlog import AudioLog, EVENT_CALLBACK_ERROR, EVENT_GENERATE_ERROR, EVENT_BINAURAL_ERROR, EVENT_STREAM_STATUS, EVENT_CROSSFADE_START, EVENT_CROSSFADE_DONE, EVENT_INITIAL_RAMP_DONE
 try: from .. import config
 except ImportError: config = type('config', (), {'DEBUG': False}) # Correct dummy
 
 # --- Debugging Toggles ---
-ENABLE_LFOS = False # Keep OFF
+ENABLE_LFOS = True # Control-rate amplitude LFOs (see synth.LFO_CONTROL_RATE)
 ENABLE_BINAURAL = True # Keep ON
+OSCILLATOR_MODE = 'wavetable' # 'wavetable' (drift-free phase accumulator) or 'sine'
+ENABLE_LOOP_CACHE = True # Layers at a fixed base_freq play from pre-rendered loops (mixed, or per-partial when LFOs are on)
 
 # --- Constants ---
-DEFAULT_SAMPLE_RATE = 44100; BUFFER_DURATION = 0.08; MIN_BASE_FREQ = 50; MAX_BASE_FREQ = 120
+DEFAULT_SAMPLE_RATE = 44100; BUFFER_DURATION = LATENCY_PROFILES[DEFAULT_LATENCY_PROFILE]['block_seconds']
 CROSSFADE_DURATION = 0.7; INITIAL_RAMP_DURATION = 0.2
+STATS_DUMP_INTERVAL = 10.0 # Seconds between [AUDIO STATS] lines with --debug
+# >0: a producer thread keeps this many blocks rendered ahead and the device callback only copies them out.
+# Adds up to RENDER_AHEAD_BLOCKS * BUFFER_DURATION of latency to parameter changes in exchange for GIL/jitter headroom.
+# The latency profile's value applies unless the engine is given one explicitly.
+RENDER_AHEAD_BLOCKS = 0
 BINAURAL_CARRIER_HZ = 120.0; BINAURAL_DIFFERENCE_HZ = 7.0; BINAURAL_AMPLITUDE = 0.15
+# Parameters that pick the compiled AudioProfile the callback reads (mood layers, reverb space, noise bed, ambience)
+PROFILE_PARAMS = ('profile', 'mood', 'noise_bed', 'ambience')
 # No DCB / Declick constants
 
-# --- Mood Definitions ---
-# Unchanged
-MOOD_PRESETS: Dict[str, List[Tuple[float, float, float, float]]] = {
-    "clearing_calm": [(1.0, 0.4, 0.1, 0.15), (1.5, 0.2, 0.15, 0.1), (2.0, 0.15, 0.08, 0.1), (3.0, 0.05, 0.3, 0.04)],
-    "forest_neutral": [(1.0, 0.35, 0.12, 0.1), (1.498, 0.18, 0.2, 0.1), (2.5, 0.1, 0.25, 0.08)],
-    "forest_mysterious": [(1.0, 0.3, 0.1, 0.1), (1.333, 0.2, 0.18, 0.1), (1.78, 0.15, 0.22, 0.08), (4.0, 0.04, 0.4, 0.03)],
-    "woods_deep": [(1.0, 0.4, 0.08, 0.05), (1.189, 0.2, 0.15, 0.1), (1.682, 0.1, 0.2, 0.08)],
-    "stream": [(1.0, 0.25, 0.2, 0.15), (2.0, 0.20, 0.25, 0.15), (2.5, 0.15, 0.3, 0.1), (3.5, 0.10, 0.4, 0.08)],
-    "default": [(1.0, 0.3, 0.1, 0.1), (1.5, 0.15, 0.15, 0.08)]
-}
-
-# --- Helper Function for Ramps ---
-def _calculate_equal_power_ramps(prog_start_norm: float, prog_end_norm: float, frames: int) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+# --- Helper Functions for Ramps ---
+def _calculate_equal_power_ramps(prog_start_norm: float, prog_end_norm: float, frames: int, unit_ramp: Optional[np.ndarray] = None, fade_in: Optional[np.ndarray] = None, fade_out: Optional[np.ndarray] = None) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    """Equal-power fade in/out ramps for progress start->end. Pass preallocated buffers to fill them in place."""
     if not np: return (None, None)
-    lin_prog_ramp = np.linspace(prog_start_norm, prog_end_norm, frames, dtype=np.float32); lin_prog_ramp = np.clip(lin_prog_ramp, 0.0, 1.0)
-    fade_in_ramp_eqp = np.sqrt(lin_prog_ramp); fade_out_ramp_eqp = np.sqrt(np.clip(1.0 - lin_prog_ramp, 0.0, 1.0))
-    return fade_in_ramp_eqp, fade_out_ramp_eqp
+    if unit_ramp is None: unit_ramp = np.arange(frames, dtype=np.float32) / frames
+    if fade_in is None: fade_in = np.empty(frames, dtype=np.float32)
+    if fade_out is None: fade_out = np.empty(frames, dtype=np.float32)
+    _fill_linear_ramp(fade_in, prog_start_norm, prog_end_norm, unit_ramp); np.minimum(fade_in, 1.0, out=fade_in); np.maximum(fade_in, 0.0, out=fade_in)
+    np.subtract(1.0, fade_in, out=fade_out); np.sqrt(fade_out, out=fade_out); np.sqrt(fade_in, out=fade_in)
+    return fade_in, fade_out
+
+def _fill_linear_ramp(out: np.ndarray, start: float, end: float, unit_ramp: np.ndarray):
+    """out = start + (end - start) * unit_ramp, where unit_ramp[n] = n / frames (end value lands on the next block)."""
+    np.multiply(unit_ramp, end - start, out=out); np.add(out, start, out=out)
+
+class _RenderArena:
+    """Scratch buffers for one callback block, allocated once so the steady-state callback never allocates."""
+    def __init__(self, frames: int):
+        self.frames = frames
+        self.unit_ramp = np.arange(frames, dtype=np.float32) / frames
+        self.mono = np.zeros(frames, dtype=np.float32); self.mono_column = self.mono[:, np.newaxis] # (frames, 1) view broadcasts to stereo
+        self.layers = np.zeros((MAX_DRONE_LAYERS, frames), dtype=np.float32) # One row per fading layer
+        self.layer_gains = np.zeros((MAX_DRONE_LAYERS, frames), dtype=np.float32) # Matching gain envelopes
+        self.layer_weights = np.ones(MAX_DRONE_LAYERS, dtype=np.float32) # Sums the gained rows in one dot product
+        self.gain = np.zeros(frames, dtype=np.float32)
+        self.handoff = np.zeros(frames, dtype=np.float32) # A layer's loop, crossfaded in over its bank (_return_to_loop)
+        self.binaural = np.zeros((2, frames), dtype=np.float32) # Planar L/R rows
+        self.binaural_left = self.binaural[0]; self.binaural_right = self.binaural[1]
+        self.binaural_gain = np.zeros(frames, dtype=np.float32) # Fade when a quality tier turns the pair on or off
+
+class _RateContext:
+    """
+    Everything the engine derives from one sample rate: frame counts for the fixed-length
+    ramps, oscillator banks, reverb (IRs and convolvers), bed and ambience players.
+    Built on the first switch to the rate and kept, so a device going back to a rate it
+    had rebuilds nothing. Loops, cues and noise beds live in the engine-wide caches,
+    which key them by rate themselves.
+    """
+    def __init__(self, sample_rate: int, ambience_dir: Optional[str]):
+        self.sample_rate = sample_rate
+        self.crossfade_frames = int(CROSSFADE_DURATION * sample_rate); self.initial_ramp_frames = max(1, int(INITIAL_RAMP_DURATION * sample_rate))
+        self.mixer = LayerMixer(self.crossfade_frames, MAX_DRONE_LAYERS)
+        self.mood_banks: Dict[str, OscillatorBank] = {}; self.binaural_bank: Optional[OscillatorBank] = None # Filled by the engine, lazily
+        self.reverb = ReverbStage(sample_rate); self.beds = NoiseBedPlayer(sample_rate)
+        self.ambience_library = AmbienceLibrary(ambience_dir, sample_rate); self.ambience = AmbiencePlayer(sample_rate)
 
 class AudioEngine:
     """Audio engine with corrected scope/indentation."""
 
-    def __init__(self, sample_rate: int = DEFAULT_SAMPLE_RATE):
-        self._is_disabled = not (sd and np and generate_sine_wave and _calculate_equal_power_ramps)
+    def __init__(self, sample_rate: Optional[int] = None, oscillator_mode: str = OSCILLATOR_MODE, backend: Optional[AudioBackend] = None, render_ahead_blocks: Optional[int] = None, latency_profile: Optional[str] = None, adaptive_latency: Optional[bool] = None, quality: Optional[str] = None, quality_governor: Optional[bool] = None):
+        # backend=None: default sounddevice output (engine is disabled if it is unavailable)
+        # sample_rate=None: config.AUDIO_SAMPLE_RATE, else the output's native rate (asked again at every start())
+        # latency_profile / adaptive_latency=None: config.AUDIO_LATENCY_PROFILE / config.AUDIO_ADAPTIVE_LATENCY
+        # quality / quality_governor=None: config.AUDIO_QUALITY (best tier) / config.AUDIO_QUALITY_GOVERNOR
+        if backend is None: backend = create_backend('sounddevice')
+        self._backend = backend
+        self._is_disabled = not (backend and np and generate_sine_wave and OscillatorBank and _calculate_equal_power_ramps)
         if ENABLE_LFOS and 'generate_lfo' not in globals(): self._is_disabled = True
         if self._is_disabled: print("AudioEngine disabled."); return
-        self.sample_rate = sample_rate; self.buffer_size = int(BUFFER_DURATION * self.sample_rate)
-        self._stream: Optional[sd.OutputStream] = None; self._thread: Optional[threading.Thread] = None; self._running: bool = False
-        self._parameter_queue: Queue = Queue(maxsize=5)
-        self._target_params: Dict[str, Any] = { 'base_freq': 65.41, 'mood': 'default', 'master_volume': 0.6 }
+        self.latency_profile = resolve_profile(latency_profile or getattr(config, 'AUDIO_LATENCY_PROFILE', DEFAULT_LATENCY_PROFILE))
+        self.adaptive_latency = getattr(config, 'AUDIO_ADAPTIVE_LATENCY', False) if adaptive_latency is None else adaptive_latency
+        self.oscillator_mode = oscillator_mode; self.fixed_sample_rate: Optional[int] = sample_rate or getattr(config, 'AUDIO_SAMPLE_RATE', None)
+        sample_rate = negotiate_sample_rate(backend, self.fixed_sample_rate, DEFAULT_SAMPLE_RATE)
+        self._thread: Optional[threading.Thread] = None; self._running: bool = False
+        if render_ahead_blocks is None: render_ahead_blocks = max(RENDER_AHEAD_BLOCKS, self.latency_profile['render_ahead_blocks'])
+        self.render_ahead_blocks = max(0, int(render_ahead_blocks)); self._ring: Optional[BlockRing] = None; self._producer: Optional[threading.Thread] = None
+        self._block_sizer: Optional[AdaptiveBlockSizer] = None; self._pending_block_size: Optional[int] = None # Set by the sizer; _run reopens the stream
+        self.best_quality = tier_index(quality or getattr(config, 'AUDIO_QUALITY', DEFAULT_QUALITY))
+        self.quality_governor = getattr(config, 'AUDIO_QUALITY_GOVERNOR', True) if quality_governor is None else quality_governor
+        self.quality_tier = self.best_quality; self._applied_quality = self.best_quality # Control side sets the former; the callback applies it
+        self._governor: Optional[QualityGovernor] = None; self._binaural_on = True; self._binaural_level = 1.0
+        self._target_params: Dict[str, Any] = { 'base_freq': DEFAULT_BASE_FREQ, 'mood': 'default', 'master_volume': 0.6, 'reverb_wet': None, 'noise_bed': None, 'ambience': None, 'profile': PROFILES.compile('default') }
+        self._parameters = ParameterMailbox(self._target_params); self._applied_sequence = 0 # Game thread publishes, callback reads
         self._current_params: Dict[str, Any] = self._target_params.copy()
-        self._current_osc_times: List[float] = []; self._current_lfo_times: List[float] = []
-        self._previous_osc_times: List[float] = []; self._previous_lfo_times: List[float] = []
-        self._binaural_time_l: float = 0.0; self._binaural_time_r: float = 0.0
-        self._crossfade_state: Dict[str, Any] = { 'active': False, 'progress_samples': 0, 'total_samples': int(CROSSFADE_DURATION * self.sample_rate), 'completion_logged': False} # Include flag
-        self._previous_mood_key: Optional[str] = None
-        self._initial_ramp_samples_done = 0; self._initial_ramp_total_samples = max(1, int(INITIAL_RAMP_DURATION * self.sample_rate)); self._is_initial_ramp = True
+        self._automation = ParameterAutomation(sample_rate, {key: self._target_params[key] for key in AUTOMATED_PARAMS}) # Callback-owned glides
+        self._arena: Optional[_RenderArena] = None # Built by _prepare_render_state()
+        self._loop_cache = LoopCache(); self._binaural_loop: Optional[LoopBuffer] = None; self._binaural_position = 0
+        self._initial_ramp_samples_done = 0; self._is_initial_ramp = True
+        self._cue_cache = CueCache(); self._voices = VoicePool(MAX_VOICES) # Cues render on first use (game thread); the callback only mixes
+        self._bed_cache = NoiseBedCache() # Beds render off the audio thread; the callback only peeks
+        # Per-rate parts: the mixer (last layer is the current mood), banks, reverb (IRs and convolvers built off the audio thread),
+        # bed and ambience players (files mapped off the audio thread); see _use_sample_rate()
+        self._rates: Dict[int, _RateContext] = {}; self._use_sample_rate(sample_rate)
+        self._stats = CallbackStats(); self._last_stats_dump = time.perf_counter() # Written by the callback, read via get_stats()
+        self._log = AudioLog() # The callback never prints: it queues events here and AudioLogThread prints them
+        self._recorder: Optional[SessionRecorder] = None; self._stream_callback = self._audio_callback # _device_callback wraps the latter
         # No DCBlock/Declick
 
-    def _initialize_time_list_pair(self, num_oscillators: int, osc_times_list: List, lfo_times_list: List):
-        num_oscillators = max(0, num_oscillators)
-        if num_oscillators != len(osc_times_list): osc_times_list[:] = [0.0] * num_oscillators
-        current_lfo_len = len(lfo_times_list)
-        if num_oscillators > current_lfo_len: lfo_times_list.extend([0.0] * (num_oscillators - current_lfo_len))
-        elif num_oscillators < current_lfo_len: lfo_times_list[:] = lfo_times_list[:num_oscillators]
+    def _use_sample_rate(self, sample_rate: int):
+        """Switches every rate-dependent part to `sample_rate`, building its _RateContext on first use. Only while the stream is stopped."""
+        context = self._rates.get(sample_rate)
+        if context is None: context = self._rates[sample_rate] = _RateContext(sample_rate, getattr(config, 'AMBIENCE_DIR', None))
+        self.sample_rate = sample_rate; self.buffer_size = int(self.latency_profile['block_seconds'] * sample_rate)
+        self._automation.sample_rate = sample_rate; self._initial_ramp_total_samples = context.initial_ramp_frames
+        self._mixer = context.mixer; self._mood_banks = context.mood_banks; self._arena = None
+        if context.binaural_bank is None: context.binaural_bank = self._build_binaural_bank()
+        self._binaural_bank = context.binaural_bank; self._binaural_loop = None
+        self._reverb = context.reverb; self._beds = context.beds; self._ambience_library = context.ambience_library; self._ambience = context.ambience
+
+    def _build_bank(self, profile: AudioProfile) -> Optional[OscillatorBank]:
+        """Creates a fresh (phase zero) oscillator bank from the profile's compiled layers, or None if they are malformed."""
+        try: bank = OscillatorBank(profile.layers, self.sample_rate, mode=self.oscillator_mode)
+        except (ValueError, TypeError) as e: print(f"[WARN] Bad preset for mood '{profile.mood}': {e}"); return None
+        tier = QUALITY_TIERS[self._applied_quality]; bank.set_quality(tier['partial_ratio'], tier['decimation'])
+        return bank
+
+    def _apply_quality(self, index: int):
+        """Puts every drone bank and the binaural pair on a quality tier. Audio thread (or before it runs); banks fade partials over one block."""
+        tier = QUALITY_TIERS[index]
+        for bank in self._mood_banks.values(): bank.set_quality(tier['partial_ratio'], tier['decimation'])
+        self._binaural_on = tier['binaural']; self._applied_quality = index
+
+    def _resolve_mood(self, mood_key: Optional[str]) -> str:
+        return mood_key if mood_key in MOOD_PRESETS else 'default'
+
+    def _profile_for(self, params: Dict[str, Any], current: Dict[str, Any]) -> AudioProfile:
+        """
+        The compiled profile an update leaves the engine on (control thread): the handle it carries, else one compiled from its
+        mood / noise_bed / ambience over the current ones (plain dicts, e.g. `profile.params` after crossing to the synthesis process).
+        """
+        profile = params.get('profile')
+        if isinstance(profile, AudioProfile): return profile
+        if not any(key in params for key in PROFILE_PARAMS): return current['profile']
+        merged = {key: params.get(key, current.get(key)) for key in PROFILE_PARAMS[1:]}; mood = self._resolve_mood(merged['mood'])
+        try: return PROFILES.compile(mood, noise_bed=merged['noise_bed'], ambience=merged['ambience'])
+        except (ValueError, TypeError) as e: print(f"[WARN] Audio settings {merged}: {e}; using mood '{mood}' as is."); return PROFILES.compile(mood)
+
+    def _activate_bank(self, profile: AudioProfile) -> Optional[OscillatorBank]:
+        """Returns the (prebuilt) bank for a profile's mood, restarted at phase zero."""
+        bank = self._mood_banks.get(profile.mood)
+        if bank is None: # Not prebuilt (e.g. preset added at runtime): allocate once and keep it
+            bank = self._build_bank(profile)
+            if bank is None: return None
+            bank.prepare(self.buffer_size); self._mood_banks[profile.mood] = bank
+        bank.reset(); return bank
+
+    def _loop_name(self, mood_key: str):
+        # LFO-modulated drones are not periodic over a short loop, so they cache unit partials instead of the mix
+        return (mood_key, 'partials') if ENABLE_LFOS else mood_key
+
+    def _prewarm_loop(self, profile: AudioProfile, base_freq: float):
+        """Renders the profile's drone loop at this base_freq into the cache. Runs on the calling (non-audio) thread."""
+        if not ENABLE_LOOP_CACHE: return
+        bank = self._mood_banks.get(profile.mood) or self._build_bank(profile)
+        if bank is None: return
+        amplitudes = np.ones_like(bank.amplitudes) if ENABLE_LFOS else bank.amplitudes
+        self._loop_cache.ensure(self._loop_name(profile.mood), base_freq, self.sample_rate, bank.freq_mults * base_freq, amplitudes, mix=not ENABLE_LFOS)
+
+    def prewarm_moods(self):
+        """Renders every mood's loop at the base_freq the game sends with it, so later mood changes hit the cache."""
+        if self._is_disabled: return
+        for profile in [PROFILES.compile(mood_key) for mood_key in MOOD_PRESETS]:
+            self._prewarm_loop(profile, profile.base_freq); self._reverb.ensure(profile.reverb_space)
+            self._bed_cache.get(profile.noise_bed or None, self.sample_rate); self._ambience_library.get(profile.ambience or None) # Header parse + map only
+
+    def prewarm_cues(self):
+        """Renders every one-shot cue, so the first play_cue() of each does not pay for synthesis."""
+        if not self._is_disabled: self._cue_cache.render_all(self.sample_rate)
+
+    def play_cue(self, name: str, gain: float = 1.0) -> bool:
+        """Queues a one-shot cue (see voices.CUE_SYNTHS) to start at the next block. False if the cue is unknown."""
+        if self._is_disabled or not self._running: return False
+        buffer = self._cue_cache.get(name, self.sample_rate)
+        if buffer is None: return False
+        self._voices.trigger(name, buffer, gain); return True
+
+    def _activate_layer(self, profile: AudioProfile, base_freq: float) -> DroneLayer:
+        """Starts a profile's drone layer at phase zero, from its cached loop when one is ready (never renders one here)."""
+        loop = self._loop_cache.get(self._loop_name(profile.mood), base_freq, self.sample_rate) if ENABLE_LOOP_CACHE else None
+        return DroneLayer(profile.mood, self._activate_bank(profile), base_freq, loop)
+
+    def _render_layer(self, layer: Optional[DroneLayer], base_freq: float, frames: int, out: np.ndarray, end_base_freq: Optional[float] = None) -> bool:
+        """Renders a layer into `out`: a loop slice copy while static, otherwise through its bank (gliding to `end_base_freq` if given)."""
+        if layer is None: return False
+        if end_base_freq is None: end_base_freq = base_freq
+        if layer.loop is None and layer.reacquire and base_freq == end_base_freq == layer.base_freq: # Glide has landed: one lookup, then stay on the bank if no loop
+            layer.reacquire = False
+            loop = self._loop_cache.get(self._loop_name(layer.mood), base_freq, self.sample_rate)
+            if loop is not None and loop.mixed != ENABLE_LFOS and layer.bank is not None: return self._return_to_loop(layer, loop, base_freq, frames, out)
+        if layer.loop is not None:
+            if base_freq == layer.base_freq == end_base_freq and ENABLE_LOOP_CACHE and layer.loop.mixed != ENABLE_LFOS:
+                if layer.loop.mixed: layer.position = layer.loop.read_into(layer.position, frames, out); return True
+                if layer.bank is not None: # Per-partial loop: the bank only adds its control-rate LFO gains
+                    layer.position = layer.loop.read_into(layer.position, frames, layer.bank.partials_buffer(frames))
+                    layer.bank.mix_partials_buffer_into(frames, out, enable_lfos=True); return True
+            if layer.bank is not None: layer.bank.load_phase_cycles(layer.loop.phase_cycles_at(layer.position)) # Bank continues where the loop was
+            layer.loop = None; layer.reacquire = ENABLE_LOOP_CACHE
+        layer.base_freq = end_base_freq
+        return self._generate_audio_chunk(layer.bank, base_freq, frames, out, end_base_freq)
+
+    def _return_to_loop(self, layer: DroneLayer, loop: LoopBuffer, base_freq: float, frames: int, out: np.ndarray) -> bool:
+        """
+        Hands a layer from its bank back to a cached loop, crossfading across this block.
+
+        The loop starts where its partials best match the bank's phases (see
+        LoopBuffer.position_for_phases); the LFO gains are evaluated once and
+        applied to both.
+        """
+        bank = layer.bank; loop_wave = self._arena.handoff
+        position = loop.position_for_phases(bank.phase_cycles(), bank.amplitudes)
+        if not self._generate_audio_chunk(bank, base_freq, frames, out): return False
+        if loop.mixed: layer.position = loop.read_into(position, frames, loop_wave)
+        else:
+            bank.rewind_lfos(); layer.position = loop.read_into(position, frames, bank.partials_buffer(frames))
+            bank.mix_partials_buffer_into(frames, loop_wave, enable_lfos=True)
+        np.subtract(loop_wave, out, out=loop_wave); np.multiply(loop_wave, self._arena.unit_ramp, out=loop_wave); np.add(out, loop_wave, out=out) # bank + (loop - bank) * ramp
+        layer.loop = loop; return True
+
+    def _prepare_render_state(self, frames: int):
+        """(Re)allocates the scratch arena and every bank's scratch for blocks of `frames` samples."""
+        self._arena = _RenderArena(frames)
+        for mood_key in MOOD_PRESETS:
+            if mood_key not in self._mood_banks:
+                bank = self._build_bank(PROFILES.compile(mood_key))
+                if bank is not None: self._mood_banks[mood_key] = bank
+        for bank in self._mood_banks.values(): bank.prepare(frames)
+        if self._binaural_bank is not None: self._binaural_bank.prepare(frames)
+        self._voices.prepare(frames); self._reverb.prepare(frames); self._beds.prepare(frames); self._ambience.prepare(frames)
+
+    def _build_binaural_bank(self) -> Optional[OscillatorBank]:
+        """Two partials at base_freq 1.0: column 0 is the left carrier, column 1 the right."""
+        try: return OscillatorBank([(BINAURAL_CARRIER_HZ, BINAURAL_AMPLITUDE, 0.0, 0.0), (BINAURAL_CARRIER_HZ + BINAURAL_DIFFERENCE_HZ, BINAURAL_AMPLITUDE, 0.0, 0.0)], self.sample_rate, mode=self.oscillator_mode)
+        except ValueError as e: print(f"[WARN] Binaural bank failed: {e}"); return None
 
     def _reset_binaural_times(self):
-        self._binaural_time_l = 0.0; self._binaural_time_r = 0.0
-
-    def _generate_audio_chunk(self, preset_data_list: List[Tuple[Union[float, int], ...]], base_freq: float, osc_times: List[float], lfo_times: List[float], frames: int ) -> Tuple[Optional[np.ndarray], bool]:
-        # Generator (robust v39) unchanged internally
-        if self._is_disabled or not np: return (np.zeros(frames, dtype=np.float32), False)
-        num_oscillators = len(preset_data_list); buffer_duration_actual = frames / self.sample_rate
-        if len(osc_times) != num_oscillators or len(lfo_times) != num_oscillators: return (np.zeros(frames, dtype=np.float32), False)
-        if not isinstance(base_freq, (int, float)): return (np.zeros(frames, dtype=np.float32), False)
-        total_wave = np.zeros(frames, dtype=np.float32); generation_successful_overall = True; MAX_LFO_DEPTH_SCALE = 0.90
-        for i in range(num_oscillators):
-            osc_start_time, lfo_start_time, osc_end_time, lfo_end_time = 0.0, 0.0, 0.0, 0.0
-            current_osc_generated = False; amp_modulator = None
-            try:
-                if i >= len(osc_times) or i >= len(lfo_times): raise IndexError("Time OOB")
-                osc_start_time = osc_times[i]; lfo_start_time = lfo_times[i]; osc_end_time = osc_start_time + buffer_duration_actual; lfo_end_time = lfo_start_time + buffer_duration_actual
-                osc_params_tuple = preset_data_list[i];
-                if not isinstance(osc_params_tuple, tuple) or len(osc_params_tuple)!=4: raise ValueError("Fmt")
-                freq_mult, base_amp, lfo_rate, lfo_depth = osc_params_tuple
-                if not all(isinstance(v,(int, float)) for v in osc_params_tuple): raise ValueError("Type")
-                osc_frequency = max(0.0, base_freq * freq_mult); current_base_amp = max(0.0, base_amp)
-                if ENABLE_LFOS and generate_lfo is not None:
-                    current_lfo_rate = max(0.0, lfo_rate); current_lfo_depth = max(0.0, min(1.0, lfo_depth * MAX_LFO_DEPTH_SCALE))
-                    effective_lfo_depth = current_base_amp * current_lfo_depth; effective_lfo_offset = current_base_amp * (1.0 - current_lfo_depth)
-                    amp_modulator = generate_lfo(current_lfo_rate, buffer_duration_actual, self.sample_rate, depth=effective_lfo_depth, offset=effective_lfo_offset, start_time=lfo_start_time)
-                    if amp_modulator is None: raise RuntimeError("LFO Fail")
-                wave_chunk = None; amplitude_to_use = amp_modulator if (ENABLE_LFOS and amp_modulator is not None) else current_base_amp
-                if osc_frequency > 0 and generate_sine_wave is not None:
-                    wave_chunk, computed_osc_end_time = generate_sine_wave(osc_frequency, buffer_duration_actual, self.sample_rate, amplitude=amplitude_to_use, start_time=osc_start_time)
-                    if wave_chunk is not None: osc_end_time = computed_osc_end_time; current_osc_generated = True
-                    else: raise RuntimeError("Sine Fail")
-                if current_osc_generated: total_wave[:min(frames, wave_chunk.shape[0])] += wave_chunk[:min(frames, wave_chunk.shape[0])]
-            except (IndexError, ValueError, RuntimeError) as e: generation_successful_overall = False;
-            except Exception as e: generation_successful_overall = False; print(f"[UNEX GEN {i}]: {e}");
-            finally: # Robust Time Update
-                if i < len(osc_times): osc_times[i] = osc_end_time
-                if i < len(lfo_times): lfo_times[i] = lfo_end_time
-        if not generation_successful_overall: return (np.zeros(frames, dtype=np.float32), False)
-        return total_wave, True
-
-
-    def _generate_binaural_beats(self, frames: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
-        """ Generates L/R binaural channels, fixed constant access. """
-        if self._is_disabled or not np or not generate_sine_wave or not ENABLE_BINAURAL: return None
-        buffer_duration_actual = frames / self.sample_rate
-
-        # *** FIX: Access constants correctly within method scope ***
-        freq_l = BINAURAL_CARRIER_HZ
-        freq_r = BINAURAL_CARRIER_HZ + BINAURAL_DIFFERENCE_HZ
-        amp = BINAURAL_AMPLITUDE
-
-        wave_l_chunk, end_time_l = generate_sine_wave(freq_l, buffer_duration_actual, self.sample_rate, amplitude=amp, start_time=self._binaural_time_l); self._binaural_time_l = end_time_l
-        wave_r_chunk, end_time_r = generate_sine_wave(freq_r, buffer_duration_actual, self.sample_rate, amplitude=amp, start_time=self._binaural_time_r); self._binaural_time_r = end_time_r
-
-        if wave_l_chunk is not None and wave_r_chunk is not None:
-             if wave_l_chunk.shape[0] != frames: wave_l_chunk = np.pad(wave_l_chunk, (0, frames - wave_l_chunk.shape[0]), mode='constant') if wave_l_chunk.shape[0] < frames else wave_l_chunk[:frames]
-             if wave_r_chunk.shape[0] != frames: wave_r_chunk = np.pad(wave_r_chunk, (0, frames - wave_r_chunk.shape[0]), mode='constant') if wave_r_chunk.shape[0] < frames else wave_r_chunk[:frames]
-             return wave_l_chunk.astype(np.float32), wave_r_chunk.astype(np.float32)
-        else: print("[WARN] Binaural gen failed."); return None
+        if self._binaural_bank is not None: self._binaural_bank.reset()
+        self._binaural_position = 0
+        bank = self._binaural_bank
+        self._binaural_loop = self._loop_cache.ensure('binaural', 1.0, self.sample_rate, bank.freq_mults, bank.amplitudes, mix=False) if ENABLE_LOOP_CACHE and bank is not None else None
+
+    def _generate_audio_chunk(self, bank: Optional[OscillatorBank], base_freq: float, frames: int, out: np.ndarray, end_base_freq: Optional[float] = None) -> bool:
+        """Renders one mood layer through its oscillator bank into `out` (all partials in one broadcast)."""
+        if self._is_disabled or not np or bank is None: return False
+        try: bank.render_into(base_freq, frames, out, enable_lfos=ENABLE_LFOS, end_base_freq=end_base_freq); return True
+        except Exception as e: self._log.log(EVENT_GENERATE_ERROR, e); return False
+
+
+    def _generate_binaural_beats(self, frames: int) -> Optional[np.ndarray]:
+        """ Renders the L/R binaural pair into the arena's planar (2, frames) buffer (faded over the block when the quality tier switches it). """
+        if self._is_disabled or not np or self._binaural_bank is None or not ENABLE_BINAURAL: return None
+        target_level = 1.0 if self._binaural_on else 0.0
+        if target_level == 0.0 and self._binaural_level == 0.0: return None
+        try:
+            arena = self._arena
+            if self._binaural_loop is not None and ENABLE_LOOP_CACHE: self._binaural_position = self._binaural_loop.read_into(self._binaural_position, frames, arena.binaural)
+            else: self._binaural_bank.render_partials_into(1.0, frames, arena.binaural)
+            if self._binaural_level != target_level:
+                _fill_linear_ramp(arena.binaural_gain, self._binaural_level, target_level, arena.unit_ramp); self._binaural_level = target_level
+                np.multiply(arena.binaural_left, arena.binaural_gain, out=arena.binaural_left); np.multiply(arena.binaural_right, arena.binaural_gain, out=arena.binaural_right)
+            return arena.binaural
+        except Exception as e: self._log.log(EVENT_BINAURAL_ERROR, e); return None
 
 
     def _audio_callback(self, outdata: np.ndarray, frames: int, time_info, status):
         """Callback: Stereo Mix, EqPower CF, Initial ramp. Fixed syntax/scope."""
         if self._is_disabled or not np: outdata.fill(0); return
-        if status and config.DEBUG: print(f"Audio Status: {status}", flush=True)
+        render_start = time.perf_counter(); is_crossfading_this_buffer = False
+        self._stats.record_status(status) # Counted, not printed: see get_stats()
+        if status and config.DEBUG: self._log.log(EVENT_STREAM_STATUS, status)
 
         try:
-            # --- Check Queue & Handle Mood Change Request ---
-            mood_change_request_mood: Optional[str] = None; new_target_params: Dict[str, Any] = {}
-            while not self._parameter_queue.empty():
-                try:
-                    new_params = self._parameter_queue.get_nowait()
-                    self._parameter_queue.task_done()
-                # ** SYNTAX FIX: Correct except blocks **
-                except Empty:
-                    break
-                except Exception as qe:
-                    print(f"Queue Err: {qe}", flush=True)
-                    continue # Skip to next item if error reading one
-
-                if 'mood' in new_params: mood_change_request_mood = new_params.pop('mood')
-                new_target_params.update(new_params)
-            self._target_params.update(new_target_params)
-
-            # Initiate Crossfade
+            arena = self._arena
+            if arena is None or arena.frames != frames: self._prepare_render_state(frames); arena = self._arena # Only if block size changes
+
+
+            # --- Pick Up Newest Parameter Snapshot (one reference read, no locks) ---
+            mood_change_request_mood: Optional[str] = None
+            sequence, snapshot = self._parameters.read()
+            if sequence != self._applied_sequence: # Anything published since the last block, coalesced
+                self._applied_sequence = sequence
+                self._target_params.update(snapshot); profile: AudioProfile = self._target_params['profile'] # Compiled and readied by update_parameters()
+                self._target_params['mood'] = mood_change_request_mood = profile.mood
+                for key in AUTOMATED_PARAMS: self._automation.set(key, self._target_params.get(key)) # Unchanged requests are no-ops
+                self._reverb.set_target(profile.reverb_space, self._automation.value('reverb_wet'))
+                bed = profile.noise_bed or None; self._beds.set_target(bed, self._bed_cache.peek(bed, self.sample_rate))
+                ambience = profile.ambience or None; self._ambience.set_target(ambience, self._ambience_library.peek(ambience))
+            if self.quality_tier != self._applied_quality: self._apply_quality(self.quality_tier) # Set by the governor (_update_quality)
+
+            # Automated parameters move on one block (glides ramp across it; plain updates jump at its start)
+            automation = self._automation; automation.advance(frames)
+            base_freq_start, base_freq_end = automation.span('base_freq'); wet_start, wet_end = automation.span('reverb_wet')
+            if wet_start != wet_end: self._reverb.set_target(self._target_params['profile'].reverb_space, wet_end) # The reverb ramps its level per block
+
+            # Initiate Crossfade (older layers fade out at the base_freq they were playing)
+            mixer = self._mixer
             if mood_change_request_mood and mood_change_request_mood != self._current_params['mood']:
-                 self._previous_mood_key = self._current_params['mood']; self._previous_osc_times = self._current_osc_times[:]; self._previous_lfo_times = self._current_lfo_times[:]
-                 self._target_params['mood'] = mood_change_request_mood
-                 if config.DEBUG: print(f"[DEBUG] CF Trig: '{self._previous_mood_key}'({len(self._previous_osc_times)}o) -> '{self._target_params['mood']}'")
-                 target_preset = MOOD_PRESETS.get(self._target_params['mood'], MOOD_PRESETS['default'])
-                 self._initialize_time_list_pair(len(target_preset), self._current_osc_times, self._current_lfo_times)
-                 if config.DEBUG: print(f"[DEBUG] -> Target:{len(target_preset)}o, Cur times:{len(self._current_osc_times)}")
-                 self._crossfade_state = {'active': True, 'progress_samples': 0, 'total_samples': max(1, int(CROSSFADE_DURATION * self.sample_rate)), 'completion_logged': False} # Add flag
+                 layer = mixer.find(mood_change_request_mood) # Still fading out: bring it back rather than restart it
+                 if layer is None: layer = self._activate_layer(self._target_params['profile'], base_freq_start)
+                 if config.DEBUG: self._log.log(EVENT_CROSSFADE_START, self._current_params['mood'], layer.mood, 'loop' if layer.loop else 'synth', layer.level)
+                 mixer.fade_to(layer)
 
-            # Update Current Params (Instant Update)
-            self._current_params['base_freq'] = self._target_params['base_freq']; self._current_params['master_volume'] = self._target_params['master_volume']; self._current_params['mood'] = self._target_params['mood']
-            callback_base_freq = float(self._current_params.get('base_freq', 65.41))
+            # Update Current Params (mood instantly; the automated ones as of the end of this block)
+            self._current_params['base_freq'] = base_freq_end; self._current_params['master_volume'] = automation.value('master_volume'); self._current_params['mood'] = self._target_params['mood']
 
 
             # --- Generate MONO Drone Layer (Crossfade or Normal) ---
-            mono_drone_wave = np.zeros(frames, dtype=np.float32); drone_generated = False
-            # Store fade status for this specific callback invocation
-            is_crossfading_this_buffer = self._crossfade_state['active']
-
-            if is_crossfading_this_buffer and _calculate_equal_power_ramps is not None:
-                # Crossfade logic remains the same (separate gen + eqpower ramps)
-                prog_start, total_samples = self._crossfade_state['progress_samples'], self._crossfade_state['total_samples']; prog_end = prog_start + frames
-                p_start_norm = max(0.0, min(1.0, prog_start/total_samples)); p_end_norm = max(0.0, min(1.0, prog_end/total_samples))
-                fade_in_ramp, fade_out_ramp = _calculate_equal_power_ramps(p_start_norm, p_end_norm, frames)
-                final_wave_prev = np.zeros(frames, dtype=np.float32); final_wave_curr = np.zeros(frames, dtype=np.float32)
-                if self._previous_mood_key and fade_out_ramp is not None:
-                     prev_preset = MOOD_PRESETS.get(self._previous_mood_key, []);
-                     if len(self._previous_osc_times) == len(prev_preset):
-                         prev_wave, success = self._generate_audio_chunk(prev_preset, callback_base_freq, self._previous_osc_times, self._previous_lfo_times, frames)
-                         if success and prev_wave is not None: final_wave_prev = prev_wave * fade_out_ramp; drone_generated = True
-                target_preset = MOOD_PRESETS.get(self._target_params['mood'], MOOD_PRESETS['default'])
-                if len(self._current_osc_times) == len(target_preset):
-                    if fade_in_ramp is not None:
-                        curr_wave, success = self._generate_audio_chunk(target_preset, callback_base_freq, self._current_osc_times, self._current_lfo_times, frames)
-                        if success and curr_wave is not None: final_wave_curr = curr_wave * fade_in_ramp; drone_generated = True
-                mono_drone_wave = final_wave_prev + final_wave_curr
-                # Update fade state AFTER generating this buffer's audio
-                self._crossfade_state['progress_samples'] = prog_end
-                if self._crossfade_state['progress_samples'] >= total_samples:
-                    self._crossfade_state['active'] = False # Deactivate
-                    self._previous_mood_key = None
-                    if config.DEBUG and not self._crossfade_state.get('completion_logged', True): # Only print once
-                        print("[DEBUG] CF Complete.")
-                        self._crossfade_state['completion_logged'] = True # Mark as printed
+            mono_drone_wave = arena.mono; drone_generated = False
+            if mixer.current is None: mixer.fade_to(self._activate_layer(self._target_params['profile'], base_freq_start), fade=False)
+            is_crossfading_this_buffer = not mixer.steady
+
+            if is_crossfading_this_buffer:
+                # Each layer renders into its own row with its own gain envelope; rows are weighted and summed in one dot
+                current_layer = mixer.current; rows = 0
+                for layer in mixer.layers:
+                    gliding = layer is current_layer # Only the current layer follows a base_freq glide
+                    if self._render_layer(layer, base_freq_start if gliding else layer.base_freq, frames, arena.layers[rows], base_freq_end if gliding else None):
+                        mixer.fill_gain(layer, frames, arena.unit_ramp, arena.layer_gains[rows]); rows += 1
+                mixer.advance(frames) # Levels move on AFTER this buffer's audio; faded-out layers are dropped
+                if rows:
+                    layer_rows = arena.layers[:rows]
+                    np.multiply(layer_rows, arena.layer_gains[:rows], out=layer_rows); np.dot(arena.layer_weights[:rows], layer_rows, out=mono_drone_wave); drone_generated = True
+                if config.DEBUG and mixer.steady: self._log.log(EVENT_CROSSFADE_DONE)
             else: # Normal Playback
-                 # Reset completion flag if we're no longer crossfading
-                 if not self._crossfade_state.get('completion_logged', True): self._crossfade_state['completion_logged'] = False
-
-                 current_preset = MOOD_PRESETS.get(self._target_params['mood'], MOOD_PRESETS['default'])
-                 if len(self._current_osc_times) != len(current_preset): self._initialize_time_list_pair(len(current_preset), self._current_osc_times, self._current_lfo_times)
-                 mono_drone_wave, success = self._generate_audio_chunk(current_preset, callback_base_freq, self._current_osc_times, self._current_lfo_times, frames)
-                 if success: drone_generated = True;
-                 if self._previous_mood_key is not None: self._previous_mood_key = None
+                 drone_generated = self._render_layer(mixer.current, base_freq_start, frames, mono_drone_wave, base_freq_end)
 
 
             # --- Generate STEREO Binaural ---
             binaural_stereo_pair = self._generate_binaural_beats(frames)
 
-            # --- Combine to STEREO Output Buffer ---
-            stereo_output = np.zeros((frames, 2), dtype=np.float32)
-            buffer_contains_sound = False
-            if drone_generated: stereo_output[:, 0] += mono_drone_wave; stereo_output[:, 1] += mono_drone_wave; buffer_contains_sound = True
-            if binaural_stereo_pair is not None: stereo_output[:, 0] += binaural_stereo_pair[0]; stereo_output[:, 1] += binaural_stereo_pair[1]; buffer_contains_sound = True
-
-            # --- Post-processing (Stereo) ---
+            # --- Combine Straight Into outdata (per channel; mono column broadcasts when alone) ---
+            buffer_contains_sound = drone_generated or binaural_stereo_pair is not None
+            out_left = outdata[:, 0]; out_right = outdata[:, 1]
+            if drone_generated and binaural_stereo_pair is not None:
+                np.add(mono_drone_wave, arena.binaural_left, out=out_left); np.add(mono_drone_wave, arena.binaural_right, out=out_right)
+            elif drone_generated: np.copyto(outdata, arena.mono_column)
+            elif binaural_stereo_pair is not None: np.copyto(outdata.T, binaural_stereo_pair)
+
+            # --- Noise Beds (pre-rendered loops; gain ramped per block, no filtering here) ---
+            if self._beds.active:
+                if not buffer_contains_sound: outdata.fill(0)
+                buffer_contains_sound = self._beds.mix_into(outdata, frames, arena.unit_ramp) or buffer_contains_sound
+
+            # --- Recorded Ambience (slices straight out of the memory-mapped file) ---
+            if self._ambience.active:
+                if not buffer_contains_sound: outdata.fill(0)
+                buffer_contains_sound = self._ambience.mix_into(outdata, frames, arena.unit_ramp) or buffer_contains_sound
+
+            # --- One-Shot Cues (added on top; at most MAX_VOICES voices per block) ---
+            if self._voices.busy:
+                if not buffer_contains_sound: outdata.fill(0)
+                buffer_contains_sound = self._voices.mix_into(outdata, frames) or buffer_contains_sound
+
+            # --- Reverb (dry/wet in place; runs on silence too while a tail rings out) ---
+            if self._reverb.active:
+                if not buffer_contains_sound: outdata.fill(0)
+                self._reverb.process(outdata, frames, arena.unit_ramp); buffer_contains_sound = True
+
+            # --- Post-processing (Stereo, in place) ---
             if buffer_contains_sound:
-                master_vol = self._current_params.get('master_volume', 0.6)
-                # Initial Ramp
+                start_gain, end_gain = automation.span('master_volume')
+                # Initial Ramp (folded into the master gain ramp)
                 if self._is_initial_ramp:
                     ramp_start, ramp_end, total_ramp = self._initial_ramp_samples_done, self._initial_ramp_samples_done + frames, self._initial_ramp_total_samples
-                    start_gain = max(0.0, min(1.0, ramp_start / total_ramp)) if total_ramp > 0 else 1.0; end_gain = max(0.0, min(1.0, ramp_end / total_ramp)) if total_ramp > 0 else 1.0
-                    if start_gain < 1.0 or end_gain < 1.0:
-                         initial_gain_ramp = np.linspace(start_gain, end_gain, frames, dtype=np.float32)[:, np.newaxis]
-                         stereo_output *= initial_gain_ramp
+                    start_gain *= max(0.0, min(1.0, ramp_start / total_ramp)) if total_ramp > 0 else 1.0; end_gain *= max(0.0, min(1.0, ramp_end / total_ramp)) if total_ramp > 0 else 1.0
                     self._initial_ramp_samples_done = ramp_end
-                    if self._initial_ramp_samples_done >= total_ramp: self._is_initial_ramp = False;
-                    if config.DEBUG: print("[DEBUG] Initial ramp done.") # Single print
-                # Master Volume
-                stereo_output *= master_vol
+                    if self._initial_ramp_samples_done >= total_ramp:
+                        self._is_initial_ramp = False
+                        if config.DEBUG: self._log.log(EVENT_INITIAL_RAMP_DONE)
+                # Master Volume (ramped across the block while it glides)
+                if start_gain == end_gain: np.multiply(outdata, start_gain, out=outdata)
+                else:
+                    _fill_linear_ramp(arena.gain, start_gain, end_gain, arena.unit_ramp)
+                    np.multiply(out_left, arena.gain, out=out_left); np.multiply(out_right, arena.gain, out=out_right)
                 # No DC Blocker / No Declicking
                 # Clip LAST
-                np.clip(stereo_output, -1.0, 1.0, out=stereo_output)
-                # Frame Clamp Safety
-                if stereo_output.shape[0] != frames: stereo_output = stereo_output[:frames, :] if stereo_output.shape[0] > frames else np.pad(stereo_output, ((0, frames - stereo_output.shape[0]),(0,0)))
-                outdata[:] = stereo_output
+                np.minimum(outdata, 1.0, out=outdata); np.maximum(outdata, -1.0, out=outdata)
             else: outdata.fill(0) # Silence
 
         # Catch all exceptions in callback to prevent crashing audio thread
-        except Exception as e: print(f"---!! Crit CB Err !!---\n{type(e).__name__}: {e}", file=sys.stderr, flush=True); traceback.print_exc(file=sys.stderr); sys.stderr.flush(); outdata.fill(0)
+        except Exception as e: self._log.log(EVENT_CALLBACK_ERROR, e); outdata.fill(0) # Traceback formatted and printed by the log thread
+        self._stats.record(time.perf_counter() - render_start, frames / self.sample_rate, is_crossfading_this_buffer)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of callback instrumentation since playback (re)started.
+
+        Render times are in ms and as a ratio of the block budget (frames / sample_rate),
+        split into 'steady' and 'crossfade' blocks, each with percentiles and a budget-ratio
+        histogram (bin i spans histogram_edges[i-1]..[i]; the last bin is >= 2x budget). Also counts
+        blocks over budget and stream underflows/overflows reported by the backend.
+        """
+        if self._is_disabled: return {}
+        stats = self._stats.snapshot(getattr(self._backend, 'late_blocks', None))
+        if self._ring is not None: stats['render_ahead'] = self._ring.stats(self.sample_rate) # Fill level when the device asked
+        stats['latency_profile'] = self.latency_profile['name']; stats['block_size'] = self.buffer_size; stats['sample_rate'] = self.sample_rate; stats['profile'] = self._target_params['profile'].key
+        stats['voices'] = dict(self._voices.stats(), cached_cues=len(self._cue_cache))
+        stats['reverb'] = self._reverb.stats(); stats['noise_beds'] = dict(self._beds.stats(), cached=len(self._bed_cache))
+        stats['ambience'] = dict(self._ambience.stats(), mapped=len(self._ambience_library), prefetch_passes=self._ambience_library.prefetch_passes)
+        if self._block_sizer is not None: stats['block_switches'] = self._block_sizer.switches
+        stats['log'] = self._log.stats(); stats['glides'] = self._automation.stats()
+        governor = self._governor
+        stats['quality'] = governor.stats() if governor is not None else {'tier': QUALITY_TIERS[self.quality_tier]['name'], 'best': QUALITY_TIERS[self.best_quality]['name'], 'changes': 0, 'history': []}
+        stats['quality']['governor'] = governor is not None
+        recorder = self._recorder
+        if recorder is not None: stats['recording'] = recorder.stats()
+        return stats
+
+    def _update_quality(self):
+        """Lets the governor pick the quality tier from a fresh stats window; the callback applies it at its next block. Off the audio thread."""
+        governor = self._governor
+        if governor is None or not governor.due(): return
+        tier = governor.update(self.get_stats())
+        if tier is not None and tier != self.quality_tier:
+            if config.DEBUG: change = governor.history[-1]; print(f"[DEBUG] Audio quality: {change['from']} -> {change['to']} ({change['reason']})")
+            self.quality_tier = tier
+
+    def _on_idle(self): # Backend calls this between blocks, off the real-time path
+        self._update_quality()
+        if self._block_sizer is not None and self._pending_block_size is None and self._block_sizer.due():
+            new_block_size = self._block_sizer.update(self.get_stats())
+            if new_block_size is not None and new_block_size != self.buffer_size:
+                if config.DEBUG: print(f"[DEBUG] Adaptive latency: block {self.buffer_size} -> {new_block_size} frames")
+                self._pending_block_size = new_block_size # _keep_streaming() winds the stream down; _run() reopens it
+        if not config.DEBUG: return
+        now = time.perf_counter()
+        if now - self._last_stats_dump >= STATS_DUMP_INTERVAL: self._last_stats_dump = now; print(format_stats(self.get_stats()), flush=True)
+
+    # --- Render-ahead mode ---
+    def _device_callback(self, outdata: np.ndarray, frames: int, time_info, status):
+        """What the backend calls: the stream's callback, then the session recorder's tap on exactly what will play."""
+        self._stream_callback(outdata, frames, time_info, status)
+        recorder = self._recorder
+        if recorder is not None: recorder.tap(outdata, frames)
+
+    def start_recording(self, path: str) -> bool:
+        """Starts capturing the played audio to `path` (.wav: 16-bit PCM; .raw / .f32: float32). See recorder.SessionRecorder."""
+        if self._is_disabled or self._recorder is not None: return False
+        recorder = SessionRecorder(path, self.sample_rate)
+        if not recorder.start(): return False
+        self._recorder = recorder; return True
+
+    def stop_recording(self) -> Optional[Dict[str, Any]]:
+        """Stops capturing, flushes the file and returns the recorder's stats (None if not recording)."""
+        recorder = self._recorder; self._recorder = None # A tap already in flight only adds to the FIFO the writer drains last
+        return recorder.stop() if recorder is not None else None
+
+    def _ring_callback(self, outdata: np.ndarray, frames: int, time_info, status):
+        """Device callback in render-ahead mode: copies the oldest rendered block out, or plays silence on underrun."""
+        self._stats.record_status(status)
+        ring = self._ring
+        block = ring.read_slot() if frames == ring.frames else None
+        if block is None: outdata.fill(0); return # Never wait for the producer here
+        np.copyto(outdata, block); ring.release()
+
+    def _produce(self):
+        """Producer thread: keeps the ring full by running the normal synthesis callback into free slots."""
+        ring = self._ring; idle_sleep = ring.frames / self.sample_rate / 4 # Poll a few times per block; no lock shared with the device callback
+        while self._running and self._pending_block_size is None: # Stops ahead of a block-size switch so the ring drains
+            slot = ring.write_slot()
+            if slot is None: time.sleep(idle_sleep); continue
+            self._audio_callback(slot, ring.frames, None, None); ring.commit()
+
+    def _start_render_ahead(self):
+        """Prefills the ring (so the device starts on rendered audio) and starts the producer thread."""
+        self._ring = BlockRing(self.render_ahead_blocks, self.buffer_size, 2) # STEREO
+        for _ in range(self._ring.blocks): self._audio_callback(self._ring.write_slot(), self._ring.frames, None, None); self._ring.commit()
+        self._producer = threading.Thread(target=self._produce, daemon=True, name="AudioRenderAheadThread")
+        self._producer.start()
+
+    def _stop_render_ahead(self):
+        if self._producer is not None: self._producer.join(timeout=1.0); self._producer = None
 
     # --- _run, update_parameters, start ---
-    def _run(self): # Same simplified logic v39
+    def _keep_streaming(self) -> bool:
+        """Backend loop condition: False on stop, or once a pending block-size switch may proceed."""
+        if not self._running: return False
+        if self._pending_block_size is None: return True
+        if self._ring is None: return False
+        return self._ring.fill > 0 or (self._producer is not None and self._producer.is_alive()) # Play out every block rendered ahead (the bank has moved past them) before reopening
+
+    def _apply_block_size(self, frames: int):
+        """Resizes scratch for a new block size between streams. Banks, loops and layers keep their phase."""
+        self.buffer_size = frames; self._pending_block_size = None
+        self._prepare_render_state(frames)
+
+    def _run(self): # Backend owns the stream/clock; it returns once _running is cleared (or to reopen with a new block size)
         if self._is_disabled: return
-        stream_context = None
         try:
-            stream_context = sd.OutputStream( samplerate=self.sample_rate, blocksize=self.buffer_size, channels=2, dtype='float32', callback=self._audio_callback, latency='low') # STEREO
-            with stream_context as stream:
-                if config.DEBUG: print(f"Audio stream active (STEREO, {self.sample_rate} Hz, {self.buffer_size} frames, {stream.latency:.4f}s latency)")
-                else: print("Audio stream active.")
-                while self._running: time.sleep(BUFFER_DURATION)
-        except sd.PortAudioError as pae: print(f"PortAudio Error: {pae}")
-        except ValueError as ve: print(f"Stream Setup ValueError: {ve} (Check Stereo?)")
+            while self._running:
+                self._stream_callback = self._audio_callback
+                if self.render_ahead_blocks > 0: self._start_render_ahead(); self._stream_callback = self._ring_callback
+                self._backend.run(self._device_callback, self.sample_rate, self.buffer_size, 2, keep_running=self._keep_streaming, on_idle=self._on_idle, latency=self.latency_profile['device_latency']) # STEREO
+                self._stop_render_ahead()
+                if self._pending_block_size is None: break
+                self._apply_block_size(self._pending_block_size)
+        except AudioBackendError as be: print(be)
         except Exception as e: print(f"Audio thread error: {e}"); traceback.print_exc()
-        finally: self._running = False; self._stream = None; print("Audio thread _run method finished.")
+        finally:
+            self._running = False
+            self._stop_render_ahead()
+            print("Audio thread _run method finished.")
 
-    def update_parameters(self, params: Dict[str, Any]): # Same v39
+    def reset_playback(self):
+        """Restarts synthesis from silence: initial ramp, phase-zero banks, fresh scratch arena, warm loop cache."""
         if self._is_disabled: return
-        self._parameter_queue.put(params)
-
-    def start(self): # Same v39
+        self._is_initial_ramp = True; self._initial_ramp_samples_done = 0
+        self._stats.reset(); self._last_stats_dump = time.perf_counter()
+        self._pending_block_size = None; self._block_sizer = AdaptiveBlockSizer(self.sample_rate, self.buffer_size / self.sample_rate) if self.adaptive_latency else None
+        self._applied_sequence, snapshot = self._parameters.read(); self._target_params.update(snapshot) # Start from the newest state
+        self._reset_binaural_times()
+        self._governor = QualityGovernor(self.best_quality) if self.quality_governor else None; self.quality_tier = self.best_quality
+        self._apply_quality(self.quality_tier); self._binaural_level = 1.0 if self._binaural_on else 0.0
+        self._prepare_render_state(self.buffer_size) # Scratch arena + prebuilt banks sized from buffer_size
+        self._target_params['profile'] = profile = self._profile_for(self._target_params, self._target_params) # The synthesis process publishes plain params
+        self._current_params['mood'] = self._target_params['mood'] = profile.mood
+        self._automation.reset({key: self._target_params.get(key) for key in AUTOMATED_PARAMS}) # Pending glides land on their targets
+        base_freq = float(self._automation.value('base_freq')); self._prewarm_loop(profile, base_freq)
+        self._voices.clear()
+        self._reverb.ensure(profile.reverb_space); self._reverb.reset(); self._reverb.set_target(profile.reverb_space, self._automation.value('reverb_wet'))
+        bed = profile.noise_bed or None; self._beds.clear(); self._beds.set_target(bed, self._bed_cache.get(bed, self.sample_rate))
+        ambience = profile.ambience or None; self._ambience.clear(); self._ambience.set_target(ambience, self._ambience_library.get(ambience))
+        self._ambience_library.watch(self._ambience)
+        self._mixer.clear(); self._mixer.fade_to(self._activate_layer(profile, base_freq), fade=False)
+
+    def _automation_requests(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """`params` with each automated value as a float (jump) or a (target, seconds) tuple (glide); malformed ones are dropped with a warning."""
+        normalized: Optional[Dict[str, Any]] = None
+        for key in AUTOMATED_PARAMS:
+            if key not in params or (key == 'reverb_wet' and params[key] is None): continue # reverb_wet None: the space's own level
+            request = parse_glide(params[key])
+            if normalized is None: normalized = dict(params) # Never modify the caller's dict (profile params are shared)
+            if request is None: print(f"[WARN] Ignoring {key}={params[key]!r}: expected a number or (target, seconds)."); del normalized[key]
+            else: normalized[key] = request if request[1] > 0.0 else request[0]
+        return params if normalized is None else normalized
+
+    def update_parameters(self, params: Dict[str, Any]): # Publishes a merged snapshot; rapid updates coalesce
+        """
+        Publishes parameter changes for the callback. base_freq, master_volume and reverb_wet take a number
+        (applied at the next block) or (target, seconds): a linear glide from wherever the value is then.
+        """
+        if self._is_disabled: return
+        params = self._automation_requests(params)
+        if 'base_freq' in params or any(key in params for key in PROFILE_PARAMS): # Resolve the profile and render the new drone's loop here, before the audio thread needs them
+            _, current = self._parameters.read()
+            profile = self._profile_for(params, current); params = dict(params, profile=profile) # The callback reads the handle, never the mood tables
+            self._prewarm_loop(profile, float(glide_target(params.get('base_freq', current.get('base_freq', DEFAULT_BASE_FREQ))))); self._reverb.ensure(profile.reverb_space) # Convolver too
+            self._bed_cache.get(profile.noise_bed or None, self.sample_rate) # And the noise bed
+            self._ambience_library.get(profile.ambience or None) # And map the ambience file
+        self._parameters.publish(params) # Never blocks the game loop
+
+    def set_profile(self, profile: AudioProfile): # The game's entry point: everything already validated and resolved at compile time
+        """Switches to a compiled location profile (see profiles.AudioProfileRegistry); its drone loop, convolver, bed and ambience are readied first."""
+        self.update_parameters(dict(profile.params, profile=profile)) # The handle rides in the snapshot; the plain key in profile.params is for other processes
+
+    def start(self, record_path: Optional[str] = None): # Same v39
         if self._is_disabled: print("Cannot start: Disabled."); return
         if self._running: print("Already running."); return
-        try: sd.check_output_settings(samplerate=self.sample_rate, channels=2, dtype='float32') # STEREO
-        except Exception as e: print(f"Audio settings check FAIL (Stereo?): {e}. Check device."); return
-        self._running = True; self._is_initial_ramp = True; self._initial_ramp_samples_done = 0
-        self._reset_binaural_times()
-        preset = MOOD_PRESETS.get(self._target_params['mood'], MOOD_PRESETS['default'])
-        self._initialize_time_list_pair(len(preset), self._current_osc_times, self._current_lfo_times)
+        if self.fixed_sample_rate is None: # Follow the device: its rate may have changed since the engine was built
+            sample_rate = negotiate_sample_rate(self._backend, None, DEFAULT_SAMPLE_RATE)
+            if sample_rate != self.sample_rate: self._use_sample_rate(sample_rate)
+        try: self._backend.check(self.sample_rate, 2) # STEREO
+        except AudioBackendError as e: print(e); return
+        if config.DEBUG: print(f"[DEBUG] Audio sample rate: {self.sample_rate} Hz ({'fixed' if self.fixed_sample_rate else 'device native'}).")
+        if record_path: self.start_recording(record_path) # At the final sample rate, before the first callback
+        self._running = True
+        self.reset_playback(); self._log.start()
         self._thread = threading.Thread(target=self._run, daemon=False, name="AudioEngineThread")
         self._thread.start()
         print("Audio engine thread started.")
@@ -298,7 +629,10 @@ class AudioEngine:
             if thread.is_alive(): print("[WARN] Audio thread join timed out!")
             else: print("Audio thread joined.")
 
-        self._thread = None; self._stream = None; # Clear refs after attempt
+        self._thread = None # Clear refs after attempt
+        for context in self._rates.values(): context.ambience_library.close()
+        self.stop_recording(); self._log.stop() # Whatever the callback logged last
+        if config.DEBUG: print(format_stats(self.get_stats()))
         print("Audio engine stop sequence complete.")
 
 
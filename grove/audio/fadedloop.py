@@ -0,0 +1,113 @@
+# grove/audio/fadedloop.py
+# Shared playback for looping beds: a few reads into a source, each faded in and out with block-rate gain ramps.
+
+from typing import Optional, Dict, Any, List, Tuple
+
+try: import numpy as np
+except ImportError: np = None
+
+
+class LoopRead:
+    """One read head into a source, with its fade. Subclasses add source-specific state in their own __slots__."""
+    __slots__ = ('name', 'source', 'position', 'level', 'target', 'step')
+
+    def __init__(self):
+        self.name: Optional[str] = None; self.source: Any = None
+        self.position = 0; self.level = 0.0; self.target = 0.0; self.step = 0.0 # Power levels (0..1, the gain is their square root); step per block
+
+
+class FadedLoopPlayer:
+    """
+    Mixes up to `max_reads` reads of looping sources into the stereo output: a read, one gain ramp and an add per read and block.
+
+    `set_target()` (audio thread) makes a source current: a read still fading
+    out of that source is brought back, otherwise a free read (or the quietest
+    fading one) starts on it, and every other read fades out over
+    `fade_seconds`. Gains are evaluated once per block and ramped linearly
+    across it. Subclasses supply the source-specific parts: `_read_into()`,
+    and optionally `_start_position()`, `_block_gains()` and `_before_block()`.
+    """
+    read_type = LoopRead
+    fade_seconds = 1.0
+
+    def __init__(self, sample_rate: int, max_reads: int):
+        self.sample_rate = sample_rate; self.frames = 0
+        self.reads: List[LoopRead] = [self.read_type() for _ in range(max(2, max_reads))]
+        self.current: Optional[LoopRead] = None
+        self._scratch: Optional['np.ndarray'] = None; self._ramp: Optional['np.ndarray'] = None
+
+    @property
+    def active(self) -> bool:
+        return any(read.source is not None for read in self.reads)
+
+    def prepare(self, frames: int):
+        """(Re)allocates the per-block scratch. Call while the callback is not running."""
+        self.frames = frames
+        self._scratch = np.zeros((frames, 2), dtype=np.float32); self._ramp = np.zeros(frames, dtype=np.float32)
+
+    def clear(self):
+        for read in self.reads: read.source = None; read.name = None; read.level = read.target = 0.0
+        self.current = None
+
+    def _fade_step(self, seconds: float) -> float:
+        return self.frames / max(1.0, seconds * self.sample_rate)
+
+    def _start_position(self, source: Any) -> int:
+        return 0
+
+    def _start(self, name: str, source: Any, position: int, fade_seconds: float) -> LoopRead:
+        """Starts a read (a free one, else the quietest not current) fading in from silence."""
+        read = None
+        for other in self.reads:
+            if other.source is None: read = other; break
+            if other is not self.current and (read is None or other.level < read.level): read = other
+        read.name = name; read.source = source; read.position = position
+        read.level = 0.0; read.target = 1.0; read.step = self._fade_step(fade_seconds)
+        return read
+
+    def set_target(self, name: Optional[str], source: Any):
+        """Audio thread: fades to `name` (None or no source: to silence)."""
+        if self.current is not None and self.current.name == name and source is not None: return
+        for read in self.reads: read.target = 0.0; read.step = self._fade_step(self.fade_seconds)
+        self.current = None
+        if name is None or source is None: return
+        read = None
+        for other in self.reads:
+            if other.source is source: read = other; break # Still fading out: bring it back
+        if read is None: read = self._start(name, source, self._start_position(source), self.fade_seconds)
+        read.target = 1.0; self.current = read
+
+    def _before_block(self, frames: int):
+        """Audio thread, once per block before mixing: restarts or hops the current read as the source requires."""
+
+    def _block_gains(self, read: LoopRead, level: float, new_level: float, frames: int) -> Tuple[float, float]:
+        """(start, end) gain of `read` across the block."""
+        return level ** 0.5, new_level ** 0.5
+
+    def _read_into(self, read: LoopRead, frames: int, out: 'np.ndarray') -> bool:
+        """Writes the next `frames` of `read` into `out` (frames, 2) and advances it. True once its source has played out."""
+        raise NotImplementedError
+
+    def mix_into(self, out: 'np.ndarray', frames: int, unit_ramp: 'np.ndarray') -> bool:
+        """Audio thread: adds every sounding read into `out` (frames, 2). True if anything played."""
+        if self._scratch is None or frames != self.frames: return False
+        self._before_block(frames)
+        played = False; scratch = self._scratch; ramp = self._ramp
+        for read in self.reads:
+            if read.source is None: continue
+            level = read.level
+            new_level = min(read.target, level + read.step) if read.target > level else max(read.target, level - read.step)
+            start_gain, end_gain = self._block_gains(read, level, new_level, frames)
+            played_out = self._read_into(read, frames, scratch)
+            np.multiply(unit_ramp, end_gain - start_gain, out=ramp); np.add(ramp, start_gain, out=ramp)
+            np.multiply(scratch[:, 0], ramp, out=scratch[:, 0]); np.multiply(scratch[:, 1], ramp, out=scratch[:, 1])
+            np.add(out, scratch, out=out); played = True
+            read.level = new_level
+            if (new_level <= 0.0 and read.target <= 0.0) or played_out: read.source = None; read.name = None # Faded out or played out: slot is free
+        return played
+
+    def stats(self) -> Dict[str, Any]:
+        return {'current': self.current.name if self.current else None, 'sounding': sum(read.source is not None for read in self.reads)}
+
+
+print("[fadedloop.py] Loaded.")
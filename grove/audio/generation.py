@@ -1,12 +1,12 @@
 # grove/audio/generation.py
-# Contains audio buffer generation logic, separated from engine state.
+# Stateless chunk generation for a preset snapshot; a thin adapter over the shared dsp.OscillatorBank kernel.
 
 from typing import Optional, Dict, List, Any, Tuple
 
 try: import numpy as np
 except ImportError: np = None
-try: from .synth import generate_sine_wave, generate_lfo
-except ImportError: generate_sine_wave = None; generate_lfo = None
+try: from .dsp import OscillatorBank
+except ImportError: OscillatorBank = None
 
 # Reference mood presets (read-only) - Needs careful import management
 # Avoid circular dependency - engine should pass the relevant preset data.
@@ -24,6 +24,10 @@ def generate_audio_chunk_for_preset(
     Generates audio buffer for a given preset snapshot and advances time states.
     Handles potential errors and ensures time states are always advanced.
 
+    Synthesis is the engine's own kernel (sine mode, control-rate LFOs, same
+    LFO depth scaling); the time states are converted to oscillator and LFO
+    phases on the way in.
+
     Args:
         preset_data: The specific parameters [(freq_mult, base_amp, lfo_rate, lfo_depth), ...]
         base_freq: Current base frequency.
@@ -36,7 +40,7 @@ def generate_audio_chunk_for_preset(
     Returns:
         Tuple (Generated audio buffer or None on failure, success_flag).
     """
-    if not np or not generate_sine_wave: return (np.zeros(frames, dtype=np.float32) if np else None, False)
+    if not np or not OscillatorBank: return (np.zeros(frames, dtype=np.float32) if np else None, False)
 
     num_oscillators = len(preset_data)
     buffer_duration_actual = frames / sample_rate
@@ -49,59 +53,22 @@ def generate_audio_chunk_for_preset(
         for i in range(len(lfo_times)): lfo_times[i] += buffer_duration_actual
         return (np.zeros(frames, dtype=np.float32), False)
 
-    total_wave = np.zeros(frames, dtype=np.float32)
-    generation_successful = True
-    MAX_LFO_DEPTH_SCALE = 0.95 # Limit LFO depth slightly
-
-    for i in range(num_oscillators):
-        osc_successful = True # Flag for this specific oscillator
-        try:
-            freq_mult, raw_base_amp, lfo_rate, lfo_depth = preset_data[i]
-
-            # Apply overall amplitude scaling factor (for crossfade amplitude interpolation)
-            base_amp = raw_base_amp * amplitude_scale_factor
-
-            osc_frequency = base_freq * freq_mult
-            osc_start_time = osc_times[i]
-            lfo_start_time = lfo_times[i] # Use LFO phase continuity
-
-            # LFO calculation (amplitude modulation for the oscillator)
-            safe_lfo_depth = max(0.0, min(1.0, lfo_depth * MAX_LFO_DEPTH_SCALE)) # Clamp 0-1 & scale
-            effective_lfo_depth = base_amp * safe_lfo_depth # Modulate relative to current scaled base_amp
-            effective_lfo_offset = base_amp * (1.0 - safe_lfo_depth)
-
-            amp_modulator = generate_lfo( max(0.0, lfo_rate), buffer_duration_actual, sample_rate, depth=effective_lfo_depth, offset=effective_lfo_offset, start_time=lfo_start_time)
-
-            # Generate main sine wave
-            if amp_modulator is not None and osc_frequency > 0:
-                wave_chunk, end_time_osc = generate_sine_wave( osc_frequency, buffer_duration_actual, sample_rate, amplitude=amp_modulator, start_time=osc_start_time )
-
-                if wave_chunk is not None:
-                    len_to_add = min(frames, wave_chunk.shape[0])
-                    total_wave[:len_to_add] += wave_chunk[:len_to_add]
-                    osc_times[i] = end_time_osc # Update osc time state
-                else: osc_successful = False; osc_times[i] = osc_start_time + buffer_duration_actual # Still advance time on failure
-            else: # LFO failed or freq=0
-                osc_successful = False
-                osc_times[i] = osc_start_time + buffer_duration_actual # Advance osc time
-
-            # Always advance LFO time state regardless of sine success
-            lfo_times[i] = lfo_start_time + buffer_duration_actual
-
-        except IndexError: osc_successful = False; print(f"[ERROR] Gen Index Err @ osc {i}."); break # Exit loop for this buffer
-        except Exception as e: osc_successful = False; print(f"[ERROR] Gen Err @ osc {i}: {e}")
-        finally: # Ensure generation_successful reflects individual oscillator failure
-             if not osc_successful: generation_successful = False
+    try:
+        scaled_preset = [(freq_mult, base_amp * amplitude_scale_factor, lfo_rate, lfo_depth) for freq_mult, base_amp, lfo_rate, lfo_depth in preset_data]
+        bank = OscillatorBank(scaled_preset, sample_rate, mode='sine')
+        np.remainder(bank.freq_mults * max(0.0, base_freq) * np.asarray(osc_times, dtype=np.float64)[bank.order], 1.0, out=bank.phases) # Seconds -> cycles (bank rows are loudest first)
+        np.remainder(bank.lfo_rates * np.asarray(lfo_times, dtype=np.float64)[bank.order], 1.0, out=bank.lfo_phases)
+        total_wave = bank.render(base_freq, frames, enable_lfos=True)
+        generation_successful = True
+    except (ValueError, TypeError) as e:
+        print(f"[ERROR] Gen Err: {e}"); total_wave = None; generation_successful = False
+    finally: # Always advance time states, even on failure
+        for i in range(num_oscillators): osc_times[i] += buffer_duration_actual; lfo_times[i] += buffer_duration_actual
 
-    # Return accumulated wave (even if partially failed) or silence if completely failed
-    # The calling function handles deciding whether to use partial result
-    # For simplicity now, return silence if any oscillator failed? Or return partial? Return partial.
-    # return total_wave, generation_successful
-    # Let's be stricter: return silence if *any* failure
     if not generation_successful:
          print("[WARN] Generation incomplete, returning silence for chunk.")
          return (np.zeros(frames, dtype=np.float32), False)
 
     return total_wave, True
 
-print("[generation.py] Loaded.")
\ No newline at end of file
+print("[generation.py] Loaded.")
@@ -0,0 +1,77 @@
+# grove/audio/latency.py
+# Named latency profiles for the audio stream, and an adaptive block sizer driven by callback stats.
+
+import time
+from typing import Dict, Any, Optional
+
+from .stats import percentile_ratio, StatsWindow
+
+# block_seconds: audio per callback; device_latency: PortAudio latency hint;
+# render_ahead_blocks: producer-thread margin (0 = render inside the device callback)
+LATENCY_PROFILES: Dict[str, Dict[str, Any]] = {
+    "low": {'block_seconds': 0.02, 'device_latency': 'low', 'render_ahead_blocks': 0}, # Desktop: snappy mood changes
+    "balanced": {'block_seconds': 0.08, 'device_latency': 'low', 'render_ahead_blocks': 0}, # Historical default
+    "safe": {'block_seconds': 0.16, 'device_latency': 'high', 'render_ahead_blocks': 2}, # Weak / kiosk hardware
+}
+DEFAULT_LATENCY_PROFILE = "balanced"
+
+# --- Adaptive Block Sizing ---
+ADAPTIVE_BLOCK_LADDER = (0.02, 0.04, 0.08, 0.16, 0.32) # Block durations the sizer steps between
+ADAPT_INTERVAL = 5.0 # Seconds of stats per decision
+GROW_P95_RATIO = 0.5 # Grow when the window's p95 render time passes half the block budget...
+SHRINK_P99_RATIO = 0.1 # ...shrink only when p99 stays under a tenth of it
+SHRINK_QUIET_SECONDS = 60.0 # ...and nothing went wrong for this long
+
+def resolve_profile(name: Optional[str]) -> Dict[str, Any]:
+    """Returns the named profile (unknown or None: the default one)."""
+    if name not in LATENCY_PROFILES:
+        if name is not None: print(f"[WARN] Unknown latency profile '{name}', using '{DEFAULT_LATENCY_PROFILE}'.")
+        name = DEFAULT_LATENCY_PROFILE
+    return dict(LATENCY_PROFILES[name], name=name)
+
+
+class AdaptiveBlockSizer:
+    """
+    Steps the block duration along ADAPTIVE_BLOCK_LADDER from windows of CallbackStats.
+
+    Any new underflow (device or render-ahead ring), late or over-budget block, or a p95 render time above
+    GROW_P95_RATIO of the budget, moves one step up at once. A step down needs
+    SHRINK_QUIET_SECONDS without trouble and a p99 below SHRINK_P99_RATIO, so
+    the size settles instead of oscillating. Call `update()` off the audio thread.
+    """
+
+    def __init__(self, sample_rate: int, start_seconds: float):
+        self.sample_rate = sample_rate
+        self.index = min(range(len(ADAPTIVE_BLOCK_LADDER)), key=lambda i: abs(ADAPTIVE_BLOCK_LADDER[i] - start_seconds))
+        self._window = StatsWindow(ADAPT_INTERVAL); self._quiet_since = self._window.start
+        self.switches = 0
+
+    @property
+    def block_frames(self) -> int:
+        return int(ADAPTIVE_BLOCK_LADDER[self.index] * self.sample_rate)
+
+    def due(self, now: Optional[float] = None) -> bool:
+        """True once a full stats window has passed; check before taking a (costly) stats snapshot."""
+        return self._window.due(now)
+
+    def _step(self, direction: int) -> int:
+        self.index += direction; self.switches += 1; self._window.rebaseline()
+        return self.block_frames
+
+    def update(self, stats: Dict[str, Any], now: Optional[float] = None) -> Optional[int]:
+        """Feeds a get_stats() snapshot; returns the new block size in frames when a switch is due."""
+        now = time.perf_counter() if now is None else now
+        if not stats or not self.due(now): return None
+        window = self._window.take(stats, now) # None: the window spanned a reopen (new ring, fresh counters), only re-baselines
+        if window is None or window['count'] == 0: return None
+        count = window['count']
+        if window['trouble'] > 0 or percentile_ratio(window['histogram'], count, 95) > GROW_P95_RATIO:
+            self._quiet_since = now
+            if self.index + 1 < len(ADAPTIVE_BLOCK_LADDER): return self._step(+1)
+        elif now - self._quiet_since >= SHRINK_QUIET_SECONDS and percentile_ratio(window['histogram'], count, 99) < SHRINK_P99_RATIO:
+            self._quiet_since = now # Give the smaller block a full quiet period before the next step
+            if self.index > 0: return self._step(-1)
+        return None
+
+
+print("[latency.py] Loaded.")
@@ -0,0 +1,147 @@
+# grove/audio/loopcache.py
+# Pre-rendered seamless loops for static drones, so steady playback is a slice copy instead of synthesis.
+
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple, Hashable
+
+try: import numpy as np
+except ImportError: np = None
+
+# Loop length; partials are retuned to a whole number of cycles per loop (error <= 1 / (2 * LOOP_SECONDS) Hz)
+LOOP_SECONDS = 4.0
+ALIGN_CANDIDATES = 8 # Positions tried when a bank hands playback back to a loop (see LoopBuffer.position_for_phases)
+# Total loop memory kept before the least recently requested loops are evicted
+LOOP_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# (layer name, base_freq rounded to mHz, sample_rate)
+LoopKey = Tuple[Hashable, float, int]
+
+def loop_key(name: Hashable, base_freq: float, sample_rate: int) -> LoopKey:
+    return (name, round(float(base_freq), 3), int(sample_rate))
+
+
+class LoopBuffer:
+    """
+    One exact period of a set of static partials, stored as float32 rows (channels x length).
+
+    Every partial is retuned to the nearest whole number of cycles over the loop,
+    so reading past the end wraps back to the start without a discontinuity.
+    With `mix` the partials are summed into a single row (a mono drone);
+    otherwise each partial keeps its own row (the L/R binaural pair, or unit
+    partials that an LFO-modulated bank weights itself).
+    """
+
+    def __init__(self, frequencies, amplitudes, sample_rate: int, seconds: float = LOOP_SECONDS, mix: bool = True):
+        frequencies = np.maximum(np.asarray(frequencies, dtype=np.float64), 0.0)
+        amplitudes = np.asarray(amplitudes, dtype=np.float64)
+        self.sample_rate = sample_rate; self.mixed = mix
+        self.length = max(1, int(round(seconds * sample_rate)))
+        self.cycles = np.rint(frequencies * self.length / sample_rate) # Whole cycles per loop for each partial
+        self.frequencies = self.cycles * sample_rate / self.length # Retuned frequencies actually played
+        sample_index = np.arange(self.length, dtype=np.int64); row = np.empty(self.length, dtype=np.float64)
+        self.data = np.zeros((1 if mix else len(self.cycles), self.length), dtype=np.float32)
+        for i, (cycles, amplitude) in enumerate(zip(self.cycles.astype(np.int64), amplitudes)):
+            np.multiply(sample_index, cycles, out=row, casting='unsafe'); np.remainder(row, self.length, out=row) # Exact integer phase
+            np.multiply(row, 2 * np.pi / self.length, out=row); np.sin(row, out=row); np.multiply(row, amplitude, out=row)
+            target = self.data[0 if mix else i]; np.add(target, row, out=target, casting='same_kind')
+        self._phase_scratch = np.zeros(len(self.cycles), dtype=np.float64)
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes
+
+    def read_into(self, position: int, frames: int, out) -> int:
+        """
+        Copies `frames` samples starting at `position` into `out`, wrapping at the loop end.
+
+        Args:
+            position: Read position in samples (0 <= position < length).
+            frames: Number of samples to copy.
+            out: 1-D (mixed loop) or (rows x frames) destination.
+
+        Returns:
+            The read position for the next block.
+        """
+        data = self.data[0] if out.ndim == 1 else self.data[:out.shape[0]] # Fewer rows: the first partials (see OscillatorBank.set_quality)
+        written = 0
+        while written < frames: # One copy per wrap; at most two unless frames > length
+            count = min(frames - written, self.length - position)
+            np.copyto(out[..., written:written + count], data[..., position:position + count])
+            written += count; position = (position + count) % self.length
+        return position
+
+    def position_for_phases(self, phase_cycles, weights) -> int:
+        """
+        Read position whose partial phases best match `phase_cycles` (per partial, in cycles); for handing a bank's playback back to the loop.
+
+        Candidates are the first ALIGN_CANDIDATES positions where the first
+        partial matches (nearest sample); the one whose other partials are
+        closest, weighted by `weights`, wins. Partials at ratios with small
+        denominators (1.5, 2.5) line up exactly on one of them.
+        """
+        first = self.cycles[0]
+        if first <= 0: return 0
+        score = self._phase_scratch; best_position = 0; best_match = -float('inf')
+        for candidate in range(min(ALIGN_CANDIDATES, int(first))):
+            position = int(round((phase_cycles[0] + candidate) * self.length / first)) % self.length
+            np.multiply(self.cycles, position / self.length, out=score); np.subtract(score, phase_cycles, out=score)
+            np.multiply(score, 2 * np.pi, out=score); np.cos(score, out=score) # 1: in phase, -1: opposed
+            match = float(np.dot(weights, score))
+            if match > best_match: best_match = match; best_position = position
+        return best_position
+
+    def phase_cycles_at(self, position: int):
+        """Per-partial phase (in cycles, [0, 1)) at `position`; for handing playback back to an oscillator bank."""
+        np.multiply(self.cycles, position / self.length, out=self._phase_scratch); np.remainder(self._phase_scratch, 1.0, out=self._phase_scratch)
+        return self._phase_scratch
+
+
+class LoopCache:
+    """
+    LRU cache of LoopBuffers bounded by total bytes.
+
+    `ensure()` renders missing loops and may evict; call it from the game /
+    control thread. The audio callback only calls `get()`, which never renders,
+    evicts or reorders. A loop still playing after eviction stays valid: the
+    playing layer keeps its own reference.
+    """
+
+    def __init__(self, max_bytes: int = LOOP_CACHE_MAX_BYTES, seconds: float = LOOP_SECONDS):
+        self.max_bytes = max_bytes; self.seconds = seconds
+        self._loops: 'OrderedDict[LoopKey, LoopBuffer]' = OrderedDict()
+        self._nbytes = 0
+        self._write_lock = threading.Lock() # Serializes builders only; get() never touches it
+        self.hits = 0; self.misses = 0; self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._loops)
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    def get(self, name: Hashable, base_freq: float, sample_rate: int) -> Optional[LoopBuffer]:
+        """Returns a cached loop or None. Safe on the audio thread."""
+        return self._loops.get(loop_key(name, base_freq, sample_rate))
+
+    def ensure(self, name: Hashable, base_freq: float, sample_rate: int, frequencies, amplitudes, mix: bool = True) -> Optional[LoopBuffer]:
+        """Returns the loop for this key, rendering it (and evicting old loops) if needed. None if it cannot fit."""
+        key = loop_key(name, base_freq, sample_rate)
+        with self._write_lock:
+            loop = self._loops.get(key)
+            if loop is not None: self._loops.move_to_end(key); self.hits += 1; return loop
+            self.misses += 1
+            try: loop = LoopBuffer(frequencies, amplitudes, sample_rate, self.seconds, mix=mix)
+            except (ValueError, TypeError, MemoryError) as e: print(f"[WARN] Loop render failed for {key}: {e}"); return None
+            if loop.nbytes > self.max_bytes: return None
+            while self._loops and self._nbytes + loop.nbytes > self.max_bytes:
+                _, evicted = self._loops.popitem(last=False); self._nbytes -= evicted.nbytes; self.evictions += 1
+            self._loops[key] = loop; self._nbytes += loop.nbytes
+            return loop
+
+    def clear(self):
+        with self._write_lock: self._loops.clear(); self._nbytes = 0
+
+
+print("[loopcache.py] Loaded.")
@@ -0,0 +1,90 @@
+# grove/audio/mixer.py
+# Drone layers with per-layer equal-power gain envelopes, so mood changes can overlap freely.
+
+from typing import Optional, List
+
+try: import numpy as np
+except ImportError: np = None
+
+from .dsp import OscillatorBank
+from .loopcache import LoopBuffer
+
+# Layers mixed at once; adding one more drops the quietest fading layer
+MAX_DRONE_LAYERS = 4
+
+
+class DroneLayer:
+    """One mood drone: its bank, the cached loop standing in for it while static, and its fade level."""
+    __slots__ = ('mood', 'bank', 'base_freq', 'loop', 'position', 'level', 'fading_in', 'reacquire')
+
+    def __init__(self, mood: str, bank: Optional[OscillatorBank], base_freq: float, loop: Optional[LoopBuffer] = None):
+        self.mood = mood; self.bank = bank; self.base_freq = base_freq
+        self.loop = loop; self.position = 0 # Loop read position; bank phases are only current once loop is None
+        self.reacquire = False # Loop left for a glide: take it back once base_freq is steady again
+        self.level = 0.0; self.fading_in = True # Level is in the power domain: gain = sqrt(level)
+
+
+class LayerMixer:
+    """
+    Holds the drone layers currently audible, oldest first; the last one is the current mood.
+
+    Each layer moves its level toward 1 (current) or 0 (all others) by
+    `frames / fade_samples` per block, and is heard at gain sqrt(level), so a
+    plain A -> B change is the usual equal-power crossfade. A change arriving
+    mid-fade simply turns the current layer around from wherever its level
+    is; returning to a mood that is still fading out revives that layer
+    instead of restarting it. Layers are dropped once fully faded out.
+    """
+
+    def __init__(self, fade_samples: int, max_layers: int = MAX_DRONE_LAYERS):
+        self.fade_samples = max(1, int(fade_samples)); self.max_layers = max(1, int(max_layers))
+        self.layers: List[DroneLayer] = []
+        self.dropped_early = 0 # Layers cut (not faded out) because the layer limit was reached
+
+    @property
+    def current(self) -> Optional[DroneLayer]:
+        return self.layers[-1] if self.layers else None
+
+    @property
+    def steady(self) -> bool:
+        """True when a single layer plays at full level: no envelopes needed."""
+        return len(self.layers) == 1 and self.layers[0].level >= 1.0
+
+    def clear(self):
+        self.layers.clear()
+
+    def find(self, mood: str) -> Optional[DroneLayer]:
+        for layer in self.layers:
+            if layer.mood == mood: return layer
+        return None
+
+    def fade_to(self, layer: DroneLayer, fade: bool = True):
+        """Makes `layer` current (fading in unless `fade` is False) and fades every other layer out."""
+        if layer in self.layers: self.layers.remove(layer) # Revived: keeps its level and phase
+        elif len(self.layers) >= self.max_layers: # At the limit: cut the quietest layer
+            self.layers.remove(min(self.layers, key=lambda other: other.level)); self.dropped_early += 1
+        for other in self.layers: other.fading_in = False
+        layer.fading_in = True
+        if not fade: layer.level = 1.0; self.layers.clear()
+        self.layers.append(layer)
+
+    def block_levels(self, layer: DroneLayer, frames: int):
+        """(start, end) level of `layer` over the next block of `frames` samples."""
+        step = frames / self.fade_samples
+        end = min(1.0, layer.level + step) if layer.fading_in else max(0.0, layer.level - step)
+        return layer.level, end
+
+    def fill_gain(self, layer: DroneLayer, frames: int, unit_ramp: 'np.ndarray', out: 'np.ndarray'):
+        """Writes the layer's equal-power gain envelope for the next block into `out`."""
+        start, end = self.block_levels(layer, frames)
+        np.multiply(unit_ramp, end - start, out=out); np.add(out, start, out=out)
+        np.minimum(out, 1.0, out=out); np.maximum(out, 0.0, out=out); np.sqrt(out, out=out)
+
+    def advance(self, frames: int):
+        """Moves every level on by one block and drops layers that have faded out."""
+        for layer in self.layers: layer.level = self.block_levels(layer, frames)[1]
+        if any(layer.level <= 0.0 and not layer.fading_in for layer in self.layers):
+            self.layers[:] = [layer for layer in self.layers if layer.fading_in or layer.level > 0.0]
+
+
+print("[mixer.py] Loaded.")
@@ -0,0 +1,139 @@
+# grove/audio/noisebed.py
+# Water textures: long, seamlessly looping FFT-shaped noise beds rendered once per profile, played back with random offsets and block-rate gain modulation.
+
+import math
+import random
+import threading
+from typing import Optional, Dict, Any, Tuple
+
+try: import numpy as np
+except ImportError: np = None
+
+from .fadedloop import LoopRead, FadedLoopPlayer
+
+# layers: (color, low_hz, high_hz, weight), colors 'white' / 'pink' (-3 dB/oct) / 'brown' (-6 dB/oct);
+# rms: bed level before master volume; width: 0 = mono .. 1 = independent channels;
+# mod_hz / mod_depth: slow gain swell; seconds: loop length (longer loops repeat less audibly)
+NOISE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "brook": {'layers': [('pink', 250.0, 5000.0, 1.0), ('white', 2500.0, 9000.0, 0.25)], 'rms': 0.035, 'width': 0.7, 'mod_hz': 0.13, 'mod_depth': 0.35, 'seconds': 12.0},
+    "rapids": {'layers': [('pink', 120.0, 7000.0, 1.0), ('brown', 60.0, 600.0, 0.5)], 'rms': 0.06, 'width': 0.8, 'mod_hz': 0.09, 'mod_depth': 0.25, 'seconds': 12.0},
+    "waterfall": {'layers': [('brown', 35.0, 900.0, 1.0), ('pink', 400.0, 9000.0, 0.6)], 'rms': 0.1, 'width': 0.9, 'mod_hz': 0.05, 'mod_depth': 0.15, 'seconds': 14.0},
+}
+MAX_BEDS = 3 # Beds mixed at once: the current one plus those still fading out
+BED_FADE_SECONDS = 1.5 # Equal-power fade when the bed changes, and for offset hops
+BED_HOP_SECONDS = 23.0 # Every so often playback crossfades to a fresh random offset, so the loop never repeats in step
+
+def render_noise_bed(profile: str, sample_rate: int) -> Optional['np.ndarray']:
+    """
+    One profile's loop as float32 (frames, 2) at the profile's rms, or None for an unknown profile.
+
+    Each channel is shaped and inverse-transformed over the whole loop length in
+    one go, so the result is exactly periodic and loops without a seam. The
+    channels share part of their noise (1 - width), for a wide but not hollow
+    image. Deterministic per profile.
+    """
+    params = NOISE_PROFILES.get(profile)
+    if params is None or not np: return None
+    rng = np.random.default_rng(sorted(NOISE_PROFILES).index(profile) + 201)
+    frames = int(params['seconds'] * sample_rate)
+    freqs = np.fft.rfftfreq(frames, 1.0 / sample_rate); safe = np.maximum(freqs, 1.0)
+    shape = np.zeros_like(freqs)
+    for color, low_hz, high_hz, weight in params['layers']:
+        tilt = {'white': 1.0, 'pink': 1.0 / np.sqrt(safe / low_hz), 'brown': low_hz / safe}[color] # Unity at the band's low edge
+        band = 1.0 / np.sqrt(1.0 + (low_hz / safe) ** 4) / np.sqrt(1.0 + (freqs / high_hz) ** 4)
+        shape += weight * tilt * band
+    shape[0] = 0.0 # No DC
+    def shaped_noise() -> 'np.ndarray':
+        spectrum = shape * np.exp(2j * np.pi * rng.random(len(freqs))) # Random phase, shaped magnitude
+        return np.fft.irfft(spectrum, n=frames)
+    shared = shaped_noise(); width = params['width']
+    stereo = np.stack([np.sqrt(1.0 - width) * shared + np.sqrt(width) * shaped_noise() for _ in range(2)], axis=1)
+    stereo *= params['rms'] / max(1e-12, float(np.sqrt(np.mean(stereo ** 2))))
+    return np.ascontiguousarray(stereo, dtype=np.float32)
+
+
+class NoiseBedCache:
+    """Rendered noise beds by (profile, sample_rate). `get` renders on a miss (control threads); `peek` never does (audio thread)."""
+
+    def __init__(self):
+        self._buffers: Dict[Tuple[str, int], 'np.ndarray'] = {}
+        self._write_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buffers)
+
+    def peek(self, profile: Optional[str], sample_rate: int) -> Optional['np.ndarray']:
+        return self._buffers.get((profile, int(sample_rate)))
+
+    def get(self, profile: Optional[str], sample_rate: int) -> Optional['np.ndarray']:
+        if profile not in NOISE_PROFILES: return None
+        key = (profile, int(sample_rate))
+        buffer = self._buffers.get(key)
+        if buffer is not None: return buffer
+        with self._write_lock:
+            buffer = self._buffers.get(key)
+            if buffer is None:
+                try: buffer = render_noise_bed(profile, sample_rate)
+                except (ValueError, MemoryError) as e: print(f"[WARN] Noise bed '{profile}' render failed: {e}"); return None
+                if buffer is not None: self._buffers[key] = buffer
+            return buffer
+
+
+class _Bed(LoopRead):
+    __slots__ = ('mod_phase', 'since_hop')
+
+    def __init__(self):
+        super().__init__(); self.mod_phase = 0.0; self.since_hop = 0
+
+
+class NoiseBedPlayer(FadedLoopPlayer):
+    """
+    Plays noise beds from their loops into the stereo output (see FadedLoopPlayer); `set_target()` takes a buffer from NoiseBedCache.peek.
+
+    A bed starts at a random offset. Its gain (fade level times a slow sine
+    swell) is evaluated once per block and ramped across it, so there is no
+    per-sample filtering or modulation. The current bed also hops to a new
+    random offset every BED_HOP_SECONDS, crossfaded like a bed change.
+    """
+    read_type = _Bed
+    fade_seconds = BED_FADE_SECONDS
+
+    def __init__(self, sample_rate: int, max_beds: int = MAX_BEDS):
+        super().__init__(sample_rate, max_beds)
+        self.hops = 0; self._hop_frames = int(BED_HOP_SECONDS * sample_rate)
+
+    def _start_position(self, buffer: 'np.ndarray') -> int:
+        return random.randrange(buffer.shape[0])
+
+    def _start(self, name: str, buffer: 'np.ndarray', position: int, fade_seconds: float) -> _Bed:
+        bed = super()._start(name, buffer, position, fade_seconds)
+        bed.mod_phase = random.random() * 2 * math.pi; bed.since_hop = 0
+        return bed
+
+    def _before_block(self, frames: int):
+        current = self.current
+        if current is not None and current.since_hop >= self._hop_frames: # Fresh offset: the old read fades out, a new one fades in
+            current.target = 0.0; current.step = self._fade_step(BED_FADE_SECONDS)
+            self.current = self._start(current.name, current.source, self._start_position(current.source), BED_FADE_SECONDS); self.hops += 1
+
+    def _gain(self, bed: _Bed, level: float, phase: float) -> float:
+        params = NOISE_PROFILES[bed.name]
+        return math.sqrt(level) * (1.0 - params['mod_depth'] * (0.5 + 0.5 * math.sin(phase)))
+
+    def _block_gains(self, bed: _Bed, level: float, new_level: float, frames: int) -> Tuple[float, float]:
+        phase = bed.mod_phase; new_phase = phase + 2 * math.pi * NOISE_PROFILES[bed.name]['mod_hz'] * frames / self.sample_rate
+        bed.mod_phase = new_phase % (2 * math.pi) # The swell advances with the block
+        return self._gain(bed, level, phase), self._gain(bed, new_level, new_phase)
+
+    def _read_into(self, bed: _Bed, frames: int, out: 'np.ndarray') -> bool:
+        length = bed.source.shape[0]; first = min(frames, length - bed.position)
+        np.copyto(out[:first], bed.source[bed.position:bed.position + first])
+        if first < frames: np.copyto(out[first:], bed.source[:frames - first]) # Wrap: the loop is seamless
+        bed.position = (bed.position + frames) % length; bed.since_hop += frames
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(super().stats(), hops=self.hops)
+
+
+print("[noisebed.py] Loaded.")
@@ -0,0 +1,89 @@
+# grove/audio/offline.py
+# Faster-than-real-time rendering of the AudioEngine soundtrack to a WAV file.
+
+import time
+import wave
+from typing import Optional, Dict, List, Any, Tuple
+
+try: import numpy as np
+except ImportError: np = None
+
+from .engine import AudioEngine
+from .profiles import PROFILES, AudioProfile
+from .backends import NullBackend
+
+# Blocks converted and written per wave.writeframes() call (~1 s at the default block size)
+WRITE_CHUNK_BLOCKS = 12
+
+# A schedule is a list of (time_in_seconds, parameter_dict) sent via update_parameters()
+Schedule = List[Tuple[float, Dict[str, Any]]]
+
+def build_mood_schedule(moods: List[str], dwell_seconds: float) -> Schedule:
+    """Schedules each mood (its compiled default profile) `dwell_seconds` after the previous one."""
+    return build_profile_schedule([PROFILES.compile(mood) for mood in moods], dwell_seconds)
+
+def build_profile_schedule(profiles: List[AudioProfile], dwell_seconds: float) -> Schedule:
+    """Schedules each compiled profile `dwell_seconds` after the previous one."""
+    return [(i * dwell_seconds, profile.params) for i, profile in enumerate(profiles)]
+
+def render_to_wav(
+    path: str,
+    duration: float,
+    schedule: Optional[Schedule] = None,
+    sample_rate: Optional[int] = None,
+    engine: Optional[AudioEngine] = None
+) -> Optional[Dict[str, float]]:
+    """
+    Drives the engine's audio callback in a tight loop and streams the result to a WAV file.
+
+    Mood changes, crossfades and the binaural layer behave exactly as in live
+    playback; parameter updates are applied at the first block starting at or
+    after their scheduled time.
+
+    Args:
+        path: Output file (16-bit stereo PCM WAV).
+        duration: Seconds of audio to render.
+        schedule: Optional [(time_s, params), ...] passed to update_parameters().
+        sample_rate: Sample rate for a newly created engine (None: config.AUDIO_SAMPLE_RATE, else DEFAULT_SAMPLE_RATE).
+        engine: Render with an existing (not running) engine instead of creating one.
+
+    Returns:
+        Dict with rendered/wall seconds and the realtime multiple, or None if rendering failed.
+    """
+    if not np: print("Offline render unavailable: numpy missing."); return None
+    if engine is None: engine = AudioEngine(sample_rate, backend=NullBackend()) # Callback is driven directly below
+    if engine._is_disabled: print("Offline render unavailable: engine disabled."); return None
+    if engine._running: print("Offline render needs an engine that is not already playing."); return None
+
+    pending = sorted(schedule or [], key=lambda item: item[0])
+    frames = engine.buffer_size; total_frames = int(duration * engine.sample_rate)
+    block = np.zeros((frames, 2), dtype=np.float32)
+    pcm_chunk = np.zeros((frames * WRITE_CHUNK_BLOCKS, 2), dtype=np.int16)
+    scaled = np.zeros((frames, 2), dtype=np.float32)
+
+    engine.reset_playback()
+    rendered = 0; chunk_fill = 0; next_event = 0
+    wall_start = time.perf_counter()
+    try:
+        with wave.open(path, 'wb') as wav_file:
+            wav_file.setnchannels(2); wav_file.setsampwidth(2); wav_file.setframerate(engine.sample_rate)
+            while rendered < total_frames:
+                while next_event < len(pending) and pending[next_event][0] * engine.sample_rate <= rendered:
+                    engine.update_parameters(dict(pending[next_event][1])); next_event += 1
+                engine._audio_callback(block, frames, None, None)
+                count = min(frames, total_frames - rendered)
+                np.multiply(block, 32767.0, out=scaled); np.rint(scaled, out=scaled)
+                np.copyto(pcm_chunk[chunk_fill:chunk_fill + count], scaled[:count], casting='unsafe')
+                chunk_fill += count; rendered += count
+                if chunk_fill + frames > pcm_chunk.shape[0] or rendered >= total_frames:
+                    wav_file.writeframes(pcm_chunk[:chunk_fill].tobytes()); chunk_fill = 0
+                    engine._log.drain() # No log thread here: print what the callback queued
+    except (OSError, wave.Error) as e:
+        print(f"Offline render failed writing '{path}': {e}"); return None
+
+    wall_seconds = max(time.perf_counter() - wall_start, 1e-9)
+    rendered_seconds = rendered / engine.sample_rate
+    return {'rendered_seconds': rendered_seconds, 'wall_seconds': wall_seconds, 'realtime_multiple': rendered_seconds / wall_seconds}
+
+
+print("[offline.py] Loaded.")
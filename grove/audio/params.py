@@ -0,0 +1,38 @@
+# grove/audio/params.py
+# Wait-free parameter handoff from the game thread to the audio callback.
+
+import threading
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Tuple
+
+# (sequence number, read-only parameter mapping)
+ParameterSnapshot = Tuple[int, Mapping[str, Any]]
+
+class ParameterMailbox:
+    """
+    Publishes whole parameter states to the audio thread by swapping one reference.
+
+    Writers merge their updates into a fresh immutable snapshot and bump its
+    sequence number; the audio callback picks up the newest snapshot with a
+    single attribute read and never takes a lock. Updates published between
+    two callbacks coalesce: only the latest state is ever seen.
+    """
+
+    def __init__(self, initial: Dict[str, Any]):
+        self._snapshot: ParameterSnapshot = (0, MappingProxyType(dict(initial)))
+        self._write_lock = threading.Lock() # Serializes writers only; the reader never touches it
+
+    def publish(self, updates: Dict[str, Any]) -> int:
+        """Merges `updates` into the current state and publishes it. Returns the new sequence number."""
+        with self._write_lock:
+            sequence, current = self._snapshot
+            merged = dict(current); merged.update(updates)
+            self._snapshot = (sequence + 1, MappingProxyType(merged)) # Atomic reference swap
+            return sequence + 1
+
+    def read(self) -> ParameterSnapshot:
+        """Returns the newest (sequence, parameters) snapshot. Wait-free; safe on the audio thread."""
+        return self._snapshot
+
+
+print("[params.py] Loaded.")
@@ -0,0 +1,137 @@
+# grove/audio/profiles.py
+# Audio profiles: the mood table, and location audio settings compiled once into validated, shared profile handles.
+
+from typing import Optional, Dict, Any, List, Tuple
+
+try: import numpy as np
+except ImportError: np = None
+
+from .reverb import REVERB_SPACES
+from .noisebed import NOISE_PROFILES
+
+# --- Mood Table ---
+# layers: [(freq_mult, base_amp, lfo_rate, lfo_depth), ...]; base_freq: drone root in Hz (default DEFAULT_BASE_FREQ);
+# reverb: reverb.REVERB_SPACES key (dry if absent); noise_bed: noisebed.NOISE_PROFILES key (none if absent).
+# A new mood is one entry here; locations then use it by name.
+MOODS: Dict[str, Dict[str, Any]] = {
+    "clearing_calm": {'layers': [(1.0, 0.4, 0.1, 0.15), (1.5, 0.2, 0.15, 0.1), (2.0, 0.15, 0.08, 0.1), (3.0, 0.05, 0.3, 0.04)]},
+    "forest_neutral": {'layers': [(1.0, 0.35, 0.12, 0.1), (1.498, 0.18, 0.2, 0.1), (2.5, 0.1, 0.25, 0.08)]},
+    "forest_mysterious": {'layers': [(1.0, 0.3, 0.1, 0.1), (1.333, 0.2, 0.18, 0.1), (1.78, 0.15, 0.22, 0.08), (4.0, 0.04, 0.4, 0.03)], 'base_freq': 61.74},
+    "woods_deep": {'layers': [(1.0, 0.4, 0.08, 0.05), (1.189, 0.2, 0.15, 0.1), (1.682, 0.1, 0.2, 0.08)], 'base_freq': 55.0, 'reverb': "forest"},
+    "stream": {'layers': [(1.0, 0.25, 0.2, 0.15), (2.0, 0.20, 0.25, 0.15), (2.5, 0.15, 0.3, 0.1), (3.5, 0.10, 0.4, 0.08)], 'base_freq': 73.42, 'noise_bed': "brook"},
+    "waterfall_roar": {'layers': [(1.0, 0.3, 0.25, 0.12), (2.0, 0.22, 0.3, 0.15), (3.0, 0.15, 0.35, 0.1), (4.5, 0.08, 0.45, 0.08)], 'base_freq': 69.3, 'reverb': "waterfall", 'noise_bed': "waterfall"},
+    "cave_echoing": {'layers': [(1.0, 0.4, 0.05, 0.06), (1.5, 0.15, 0.09, 0.08), (2.0, 0.1, 0.12, 0.06)], 'base_freq': 49.0, 'reverb': "cave"},
+    "default": {'layers': [(1.0, 0.3, 0.1, 0.1), (1.5, 0.15, 0.15, 0.08)]},
+}
+DEFAULT_BASE_FREQ = 65.41; MIN_BASE_FREQ = 40.0; MAX_BASE_FREQ = 120.0
+MAX_LAYER_FREQ_MULT = 16.0; MAX_LFO_RATE = 5.0 # Sanity bounds: beyond these a preset is a typo, not a sound
+
+# Optional location keys that override the mood's settings
+LOCATION_AUDIO_KEYS = ('base_freq', 'reverb_wet', 'noise_bed', 'ambience')
+
+def compile_layers(mood: str, layers: List[Tuple[float, ...]]) -> 'np.ndarray':
+    """
+    Validates a mood's layers into a read-only, contiguous float64 (n, 4) array.
+
+    Raises:
+        ValueError: Empty, not 4-tuples, non-finite, or outside the sanity bounds.
+    """
+    try: array = np.array(layers, dtype=np.float64)
+    except (TypeError, ValueError) as e: raise ValueError(f"mood '{mood}': layers must be numeric 4-tuples ({e})")
+    if array.ndim != 2 or array.shape[0] == 0 or array.shape[1] != 4: raise ValueError(f"mood '{mood}': layers must be a non-empty list of (freq_mult, base_amp, lfo_rate, lfo_depth)")
+    if not np.all(np.isfinite(array)): raise ValueError(f"mood '{mood}': layers must be finite")
+    freq_mults, amplitudes, lfo_rates, lfo_depths = array.T
+    if np.any(freq_mults <= 0) or np.any(freq_mults > MAX_LAYER_FREQ_MULT): raise ValueError(f"mood '{mood}': freq_mult must be in (0, {MAX_LAYER_FREQ_MULT}]")
+    if np.any(amplitudes < 0) or np.any(lfo_rates < 0) or np.any(lfo_rates > MAX_LFO_RATE): raise ValueError(f"mood '{mood}': base_amp must be >= 0 and lfo_rate in [0, {MAX_LFO_RATE}]")
+    if np.any(lfo_depths < 0) or np.any(lfo_depths > 1): raise ValueError(f"mood '{mood}': lfo_depth must be in [0, 1]")
+    array.flags.writeable = False
+    return array
+
+
+class AudioProfile:
+    """
+    One compiled audio setting: mood, base frequency, reverb, noise bed, ambience and the mood's layers.
+
+    Built only by AudioProfileRegistry, which validates everything once and
+    hands out one shared instance per distinct setting, so identity compares
+    profiles. `params` is the ready-made update_parameters() snapshot
+    (plain values, so it also crosses to the synthesis process).
+    """
+    __slots__ = ('key', 'mood', 'base_freq', 'reverb_space', 'reverb_wet', 'noise_bed', 'ambience', 'layers', 'params')
+
+    def __init__(self, key: str, mood: str, base_freq: float, reverb_space: Optional[str], reverb_wet: float, noise_bed: str, ambience: str, layers: 'np.ndarray'):
+        self.key = key; self.mood = mood; self.base_freq = base_freq
+        self.reverb_space = reverb_space; self.reverb_wet = reverb_wet; self.noise_bed = noise_bed; self.ambience = ambience
+        self.layers = layers
+        self.params: Dict[str, Any] = {'profile': key, 'mood': mood, 'base_freq': base_freq, 'reverb_wet': reverb_wet, 'noise_bed': noise_bed, 'ambience': ambience}
+
+    def __repr__(self) -> str:
+        return f"AudioProfile({self.key!r})"
+
+
+class AudioProfileRegistry:
+    """Compiles mood + location overrides into AudioProfiles, deduplicated by their resolved settings."""
+
+    def __init__(self):
+        self._profiles: Dict[str, AudioProfile] = {}
+        self._layers: Dict[str, 'np.ndarray'] = {}
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+    def get(self, key: str) -> Optional[AudioProfile]:
+        return self._profiles.get(key)
+
+    def layers(self, mood: str) -> 'np.ndarray':
+        """The mood's compiled layers (unknown moods: 'default')."""
+        mood = mood if mood in MOODS else 'default'
+        if mood not in self._layers: self._layers[mood] = compile_layers(mood, MOODS[mood]['layers'])
+        return self._layers[mood]
+
+    def compile(self, mood: str, base_freq: Optional[float] = None, reverb_wet: Optional[float] = None, noise_bed: Optional[str] = None, ambience: Optional[str] = None) -> AudioProfile:
+        """
+        The profile for `mood` with optional overrides (None: the mood's own setting; '' turns a noise bed / ambience off).
+
+        Raises:
+            ValueError: Unknown mood, reverb space or noise bed, or a value out of range.
+        """
+        spec = MOODS.get(mood)
+        if spec is None: raise ValueError(f"unknown audio mood '{mood}'")
+        base_freq = float(spec.get('base_freq', DEFAULT_BASE_FREQ) if base_freq is None else base_freq)
+        if not MIN_BASE_FREQ <= base_freq <= MAX_BASE_FREQ: raise ValueError(f"base_freq {base_freq} outside {MIN_BASE_FREQ}..{MAX_BASE_FREQ} Hz")
+        space = spec.get('reverb')
+        if space is not None and space not in REVERB_SPACES: raise ValueError(f"mood '{mood}': unknown reverb space '{space}'")
+        wet = (REVERB_SPACES[space]['wet'] if space else 0.0) if reverb_wet is None else float(reverb_wet)
+        if not 0.0 <= wet <= 1.0: raise ValueError(f"reverb_wet {wet} outside 0..1")
+        bed = spec.get('noise_bed', '') if noise_bed is None else noise_bed
+        if bed and bed not in NOISE_PROFILES: raise ValueError(f"unknown noise bed '{bed}'")
+        ambience = mood if ambience is None else ambience # '<mood>.wav' when the content folder has one
+        key = f"{mood}@{base_freq:g}/wet{wet:g}/{bed or '-'}/{ambience or '-'}"
+        profile = self._profiles.get(key)
+        if profile is None:
+            profile = AudioProfile(key, mood, base_freq, space, wet, bed, ambience, self.layers(mood))
+            self._profiles = {**self._profiles, key: profile} # Copy-on-write: engines may look profiles up concurrently
+        return profile
+
+    def compile_locations(self, locations: Dict[str, Dict[str, Any]]) -> Dict[str, AudioProfile]:
+        """Location id -> profile, from each location's 'audio_mood' and LOCATION_AUDIO_KEYS. Bad entries warn and fall back to 'default'."""
+        profiles: Dict[str, AudioProfile] = {}
+        for location_id, data in locations.items():
+            try: profiles[location_id] = self.compile(data.get('audio_mood', 'default'), **{key: data.get(key) for key in LOCATION_AUDIO_KEYS})
+            except (ValueError, TypeError) as e: print(f"[WARN] Location '{location_id}' audio: {e}; using 'default'."); profiles[location_id] = self.compile('default')
+        return profiles
+
+
+# Shared registry; every mood's layers are validated at import, so a bad table fails at load rather than mid-game
+PROFILES = AudioProfileRegistry()
+if np:
+    for _mood in MOODS: PROFILES.layers(_mood)
+
+# Per-field views of the mood table
+MOOD_PRESETS: Dict[str, List[Tuple[float, float, float, float]]] = {mood: spec['layers'] for mood, spec in MOODS.items()}
+MOOD_BASE_FREQS: Dict[str, float] = {mood: spec['base_freq'] for mood, spec in MOODS.items() if 'base_freq' in spec}
+MOOD_REVERB_SPACES: Dict[str, str] = {mood: spec['reverb'] for mood, spec in MOODS.items() if 'reverb' in spec}
+MOOD_NOISE_BEDS: Dict[str, str] = {mood: spec['noise_bed'] for mood, spec in MOODS.items() if 'noise_bed' in spec}
+
+
+print("[profiles.py] Loaded.")
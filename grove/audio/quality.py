@@ -0,0 +1,87 @@
+# grove/audio/quality.py
+# Audio quality tiers, and a governor that steps between them from callback stats so slow machines lose detail instead of dropping out.
+
+import time
+from collections import deque
+from typing import Dict, Any, Optional, List
+
+from .stats import percentile_ratio, StatsWindow
+
+# Best first. partial_ratio: drone partials quieter than this fraction of the mood's loudest are not rendered;
+# decimation: drones synthesize every n-th sample and interpolate up; binaural: the binaural pair plays
+QUALITY_TIERS: List[Dict[str, Any]] = [
+    {'name': "full", 'partial_ratio': 0.0, 'decimation': 1, 'binaural': True},
+    {'name': "reduced", 'partial_ratio': 0.2, 'decimation': 1, 'binaural': True}, # Quiet upper partials go first
+    {'name': "low", 'partial_ratio': 0.2, 'decimation': 2, 'binaural': True},
+    {'name': "minimal", 'partial_ratio': 0.5, 'decimation': 4, 'binaural': False},
+]
+DEFAULT_QUALITY = "full"
+
+# --- Governor ---
+GOVERN_INTERVAL = 2.0 # Seconds of stats per decision (shorter than the block sizer's: a tier change is cheap)
+DEGRADE_P95_RATIO = 0.75 # Step down when the window's p95 render time nears the block deadline (half-octave bins: past ~71%)...
+RESTORE_P99_RATIO = 0.3 # ...step back up only when p99 stays under this share of it
+RESTORE_QUIET_SECONDS = 30.0 # ...and nothing went wrong for this long
+QUALITY_HISTORY = 8 # Tier changes kept for stats
+
+def tier_index(name: Optional[str]) -> int:
+    """Index of the named tier in QUALITY_TIERS (unknown or None: the default one)."""
+    names = [tier['name'] for tier in QUALITY_TIERS]
+    if name not in names:
+        if name is not None: print(f"[WARN] Unknown audio quality '{name}', using '{DEFAULT_QUALITY}'.")
+        name = DEFAULT_QUALITY
+    return names.index(name)
+
+
+class QualityGovernor:
+    """
+    Steps the engine's quality tier from windows of CallbackStats, never above `best`.
+
+    Any new underflow (device or render-ahead ring), late or over-budget block,
+    or a p95 render time above DEGRADE_P95_RATIO of the block budget, drops one
+    tier at once. A step back up needs RESTORE_QUIET_SECONDS without trouble and
+    a p99 below RESTORE_P99_RATIO. The window holding a change is only used to
+    re-baseline (it mixes both tiers). Call `update()` off the audio thread.
+    """
+
+    def __init__(self, best: int = 0):
+        self.best = best; self.index = best
+        self._window = StatsWindow(GOVERN_INTERVAL)
+        self._started = self._quiet_since = self._window.start
+        self.changes = 0
+        self.history: deque = deque(maxlen=QUALITY_HISTORY) # {'at', 'from', 'to', 'reason'}, newest last
+
+    @property
+    def tier(self) -> Dict[str, Any]:
+        return QUALITY_TIERS[self.index]
+
+    def due(self, now: Optional[float] = None) -> bool:
+        """True once a full stats window has passed; check before taking a (costly) stats snapshot."""
+        return self._window.due(now)
+
+    def _step(self, direction: int, reason: str, now: float) -> int:
+        self.history.append({'at': now - self._started, 'from': self.tier['name'], 'to': QUALITY_TIERS[self.index + direction]['name'], 'reason': reason})
+        self.index += direction; self.changes += 1; self._window.rebaseline()
+        return self.index
+
+    def update(self, stats: Dict[str, Any], now: Optional[float] = None) -> Optional[int]:
+        """Feeds a get_stats() snapshot; returns the new tier index when a change is due."""
+        now = time.perf_counter() if now is None else now
+        if not stats or not self.due(now): return None
+        window = self._window.take(stats, now) # None: the window holding the last change, only re-baselines
+        if window is None or window['count'] == 0: return None
+        count = window['count']
+        p95 = percentile_ratio(window['histogram'], count, 95)
+        if window['trouble'] > 0 or p95 > DEGRADE_P95_RATIO:
+            self._quiet_since = now
+            if self.index + 1 < len(QUALITY_TIERS): return self._step(+1, f"{window['trouble']} late/underflow" if window['trouble'] else f"p95 {p95:.0%} of budget", now)
+        elif self.index > self.best and now - self._quiet_since >= RESTORE_QUIET_SECONDS and percentile_ratio(window['histogram'], count, 99) < RESTORE_P99_RATIO:
+            self._quiet_since = now # Give the richer tier a full quiet period before the next step
+            return self._step(-1, "headroom", now)
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {'tier': self.tier['name'], 'best': QUALITY_TIERS[self.best]['name'], 'changes': self.changes, 'history': list(self.history)}
+
+
+print("[quality.py] Loaded.")
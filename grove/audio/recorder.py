@@ -0,0 +1,137 @@
+# grove/audio/recorder.py
+# Session capture: the device callback taps each played block into a lock-free FIFO; a writer thread batches it to a WAV or raw file.
+
+import os
+import threading
+import wave
+from typing import Optional, Dict, Any
+
+try: import numpy as np
+except ImportError: np = None
+
+RECORD_BUFFER_SECONDS = 2.0 # FIFO between the tap and the writer; the writer can stall this long before blocks drop
+WRITE_INTERVAL = 0.25 # Seconds between writer wake-ups
+WRITE_BATCH_SECONDS = 0.5 # Audio converted and written per write call
+RAW_EXTENSIONS = ('.raw', '.f32') # Written as interleaved float32 little-endian; anything else is 16-bit PCM WAV
+
+
+class FrameFifo:
+    """
+    Single-producer / single-consumer FIFO of audio frames, (capacity, channels) float32.
+
+    Same lock-free scheme as ring.BlockRing (each side advances only its own
+    counter, after touching the data), but writes and reads may be any length,
+    so blocks of different sizes (adaptive latency) share one buffer.
+    """
+
+    def __init__(self, capacity: int, channels: int):
+        self.capacity = max(1, int(capacity)); self.channels = channels
+        self.buffer = np.zeros((self.capacity, channels), dtype=np.float32)
+        self._counters = np.zeros(2, dtype=np.int64) # [frames written, frames read]: monotonic
+
+    @property
+    def fill(self) -> int:
+        return int(self._counters[0] - self._counters[1])
+
+    def write(self, block: 'np.ndarray') -> bool:
+        """Producer: appends all of `block` (frames, channels), or nothing (False) if it does not fit."""
+        count = block.shape[0]
+        if self.capacity - self.fill < count: return False
+        start = int(self._counters[0] % self.capacity); first = min(count, self.capacity - start)
+        np.copyto(self.buffer[start:start + first], block[:first])
+        if first < count: np.copyto(self.buffer[:count - first], block[first:])
+        self._counters[0] += count
+        return True
+
+    def read_into(self, out: 'np.ndarray') -> int:
+        """Consumer: moves up to len(out) frames into `out`. Returns the frames moved."""
+        count = min(self.fill, out.shape[0])
+        if count <= 0: return 0
+        start = int(self._counters[1] % self.capacity); first = min(count, self.capacity - start)
+        np.copyto(out[:first], self.buffer[start:start + first])
+        if first < count: np.copyto(out[first:count], self.buffer[:count - first])
+        self._counters[1] += count
+        return count
+
+
+class SessionRecorder:
+    """
+    Records what the device played to `path`, without ever blocking the audio thread.
+
+    `tap()` (device callback) copies the block into a FrameFifo holding
+    RECORD_BUFFER_SECONDS of audio; if the writer has fallen that far behind,
+    the block is dropped and counted instead. The writer thread wakes every
+    WRITE_INTERVAL, converts what is queued in batches and writes it; `stop()`
+    drains the rest, closes the file and reports the drops. Memory is bounded
+    by the FIFO and one batch buffer, however long the session runs.
+    """
+
+    def __init__(self, path: str, sample_rate: int, channels: int = 2):
+        self.path = path; self.sample_rate = sample_rate; self.channels = channels
+        self.raw = os.path.splitext(path)[1].lower() in RAW_EXTENSIONS
+        self._fifo = FrameFifo(int(RECORD_BUFFER_SECONDS * sample_rate), channels)
+        batch_frames = int(WRITE_BATCH_SECONDS * sample_rate)
+        self._batch = np.zeros((batch_frames, channels), dtype=np.float32); self._pcm = np.zeros((batch_frames, channels), dtype=np.int16)
+        self._file: Any = None; self._thread: Optional[threading.Thread] = None; self._stop = threading.Event()
+        self.frames_written = 0; self.dropped_blocks = 0; self.dropped_frames = 0; self.max_fill = 0; self.write_errors = 0
+
+    def start(self) -> bool:
+        """Opens the file and starts the writer thread. False (and a message) if the file cannot be opened."""
+        try:
+            if self.raw: self._file = open(self.path, 'wb')
+            else:
+                self._file = wave.open(self.path, 'wb')
+                self._file.setnchannels(self.channels); self._file.setsampwidth(2); self._file.setframerate(self.sample_rate)
+        except (OSError, wave.Error) as e: print(f"Session recording unavailable ('{self.path}'): {e}"); self._file = None; return False
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._write_loop, daemon=True, name="SessionRecorderThread")
+        self._thread.start()
+        return True
+
+    def tap(self, outdata: 'np.ndarray', frames: int):
+        """Audio thread: queues the block just played; drops it (counted) if the FIFO is full. Never waits."""
+        if self._fifo.write(outdata[:frames]):
+            fill = self._fifo.fill
+            if fill > self.max_fill: self.max_fill = fill
+        else: self.dropped_blocks += 1; self.dropped_frames += frames
+
+    def _write_batch(self, count: int):
+        if self.raw: self._file.write(memoryview(self._batch[:count]).cast('B'))
+        else:
+            batch = self._batch[:count]; pcm = self._pcm[:count]
+            np.clip(batch, -1.0, 1.0, out=batch); np.multiply(batch, 32767.0, out=batch); np.rint(batch, out=batch)
+            np.copyto(pcm, batch, casting='unsafe')
+            self._file.writeframes(memoryview(pcm).cast('B'))
+        self.frames_written += count
+
+    def _drain(self):
+        while True:
+            count = self._fifo.read_into(self._batch)
+            if count == 0: return
+            try: self._write_batch(count)
+            except (OSError, wave.Error) as e:
+                self.write_errors += 1
+                if self.write_errors == 1: print(f"[WARN] Session recording write failed: {e}")
+
+    def _write_loop(self):
+        while not self._stop.wait(WRITE_INTERVAL): self._drain()
+        self._drain() # Whatever the tap queued before stop()
+
+    def stop(self) -> Dict[str, Any]:
+        """Drains the FIFO, closes the file and prints a summary. Returns stats(). Call after the device stopped tapping."""
+        thread = self._thread
+        if thread is not None: self._stop.set(); thread.join(timeout=5.0); self._thread = None
+        if self._file is not None:
+            try: self._file.close()
+            except (OSError, wave.Error) as e: print(f"[WARN] Session recording close failed: {e}")
+            self._file = None
+            stats = self.stats()
+            print(f"Session recorded to '{self.path}': {stats['seconds']:.1f}s" + (f", {self.dropped_blocks} blocks dropped ({self.dropped_frames / self.sample_rate:.2f}s)" if self.dropped_blocks else ", no dropped blocks") + ".")
+        return self.stats()
+
+    def stats(self) -> Dict[str, Any]:
+        return {'path': self.path, 'seconds': self.frames_written / self.sample_rate, 'dropped_blocks': self.dropped_blocks,
+                'dropped_frames': self.dropped_frames, 'max_fill_ms': 1000.0 * self.max_fill / self.sample_rate, 'write_errors': self.write_errors}
+
+
+print("[recorder.py] Loaded.")
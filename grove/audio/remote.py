@@ -0,0 +1,334 @@
+# grove/audio/remote.py
+# Out-of-process synthesis: a child process renders into a shared-memory ring, this process only plays blocks out.
+
+import json
+import signal
+import threading
+import time
+import traceback
+import multiprocessing
+from collections import deque
+from typing import Optional, Dict, Any, Tuple, List
+
+try: import numpy as np
+except ImportError: np = None
+try: from multiprocessing import shared_memory
+except ImportError: shared_memory = None
+
+from .engine import AudioEngine, DEFAULT_SAMPLE_RATE, OSCILLATOR_MODE, DEFAULT_BASE_FREQ, STATS_DUMP_INTERVAL
+from .backends import AudioBackend, AudioBackendError, NullBackend, create_backend, negotiate_sample_rate
+from .ring import BlockRing
+from .voices import MAX_VOICES
+from .stats import CallbackStats, format_stats
+from .latency import DEFAULT_LATENCY_PROFILE, resolve_profile
+from .recorder import SessionRecorder
+try: from .. import config
+except ImportError: config = type('config', (), {'DEBUG': False})
+
+# Blocks the child keeps rendered ahead; process scheduling needs more margin than a thread
+PROCESS_RENDER_AHEAD_BLOCKS = 2
+PROCESS_START_TIMEOUT = 20.0 # Seconds to wait for the child to import, build banks and prefill the ring
+PROCESS_JOIN_TIMEOUT = 2.0 # Seconds to wait for a clean child exit before terminating it
+STATS_PUBLISH_INTERVAL = 1.0 # Seconds between the child's stats snapshots
+PARAM_BLOCK_BYTES = 4096 # JSON parameter snapshot (game -> child)
+STATS_BLOCK_BYTES = 16384 # JSON stats snapshot (child -> game)
+# Child stats the game shows; an oversized snapshot sheds the trailing detail keys first (the governor's timing keys stay)
+CHILD_STATS_KEYS = ('callbacks', 'budget_ms', 'max_budget_ratio', 'over_budget', 'steady', 'crossfade', 'voices', 'reverb', 'noise_beds', 'ambience', 'quality', 'log', 'glides')
+STATS_TRIM_ORDER = ('log', 'quality', 'reverb', 'ambience', 'noise_beds', 'glides', 'voices')
+
+# Control words (int64) at the start of the shared segment
+_PARAM_SEQUENCE, _PARAM_LENGTH, _STATS_SEQUENCE, _STATS_LENGTH, _STOP, _STATE, _RING_WRITE, _RING_READ = range(8)
+_CONTROL_WORDS = 8
+STATE_STARTING, STATE_READY, STATE_FAILED = 0, 1, 2
+
+
+class SharedAudioBlock:
+    """
+    One shared-memory segment: control words, a parameter and a stats region, and the ring storage.
+
+    The JSON regions are seqlocks: the single writer makes the sequence odd,
+    writes, then makes it even again; a reader keeps a copy only if the
+    sequence was even and unchanged around it, and otherwise retries on its
+    next poll. The creator zeroes the segment and unlinks it in `release()`.
+    """
+
+    def __init__(self, blocks: int, frames: int, channels: int, name: Optional[str] = None):
+        self.blocks = blocks; self.frames = frames; self.channels = channels
+        self._param_offset = _CONTROL_WORDS * 8
+        self._stats_offset = self._param_offset + PARAM_BLOCK_BYTES
+        self._ring_offset = self._stats_offset + STATS_BLOCK_BYTES
+        size = self._ring_offset + blocks * frames * channels * 4
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(create=True, size=size) if self.owner else shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+        self.control = np.ndarray((_CONTROL_WORDS,), dtype=np.int64, buffer=self.shm.buf)
+        self.ring_storage = np.ndarray((blocks, frames, channels), dtype=np.float32, buffer=self.shm.buf, offset=self._ring_offset)
+        if self.owner: self.control[:] = 0; self.ring_storage.fill(0)
+
+    def ring(self) -> BlockRing:
+        """A BlockRing over the shared storage and counters (each process makes its own)."""
+        return BlockRing(self.blocks, self.frames, self.channels, storage=self.ring_storage, counters=self.control[_RING_WRITE:_RING_READ + 1])
+
+    def _write_json(self, sequence_index: int, offset: int, capacity: int, value: Dict[str, Any]):
+        data = json.dumps(value).encode('utf-8')
+        if len(data) > capacity: raise ValueError(f"Shared snapshot too large ({len(data)} > {capacity} bytes)")
+        self.control[sequence_index] += 1 # Odd: write in progress
+        self.shm.buf[offset:offset + len(data)] = data; self.control[sequence_index + 1] = len(data)
+        self.control[sequence_index] += 1
+
+    def _read_json(self, sequence_index: int, offset: int, last_sequence: int) -> Tuple[int, Optional[Dict[str, Any]]]:
+        sequence = int(self.control[sequence_index])
+        if sequence == last_sequence or sequence & 1: return last_sequence, None
+        data = bytes(self.shm.buf[offset:offset + int(self.control[sequence_index + 1])])
+        if int(self.control[sequence_index]) != sequence: return last_sequence, None # Torn: the writer came back
+        return sequence, json.loads(data)
+
+    def write_parameters(self, params: Dict[str, Any]): self._write_json(_PARAM_SEQUENCE, self._param_offset, PARAM_BLOCK_BYTES, params)
+    def read_parameters(self, last_sequence: int = 0): return self._read_json(_PARAM_SEQUENCE, self._param_offset, last_sequence)
+    def write_stats(self, stats: Dict[str, Any]): self._write_json(_STATS_SEQUENCE, self._stats_offset, STATS_BLOCK_BYTES, stats)
+    def read_stats(self, last_sequence: int = 0): return self._read_json(_STATS_SEQUENCE, self._stats_offset, last_sequence)
+
+    @property
+    def state(self) -> int:
+        return int(self.control[_STATE])
+
+    @state.setter
+    def state(self, value: int):
+        self.control[_STATE] = value
+
+    @property
+    def stop_requested(self) -> bool:
+        return bool(self.control[_STOP])
+
+    def request_stop(self):
+        self.control[_STOP] = 1
+
+    def release(self):
+        """Drops every view onto the segment, closes it, and unlinks it if this side created it."""
+        self.control = None; self.ring_storage = None # Views must go before close()
+        try: self.shm.close()
+        except BufferError as e: print(f"[WARN] Shared audio memory still in use: {e}")
+        if self.owner:
+            try: self.shm.unlink()
+            except FileNotFoundError: pass
+
+
+def _publish_stats(shared: SharedAudioBlock, stats: Dict[str, Any]) -> Optional[List[str]]:
+    """Child: writes the stats snapshot, dropping detail keys until it fits STATS_BLOCK_BYTES. Returns the keys dropped (None: nothing fit, skipped)."""
+    snapshot = {key: value for key, value in stats.items() if key in CHILD_STATS_KEYS}; dropped: List[str] = []
+    for key in (None,) + STATS_TRIM_ORDER:
+        if key is not None and snapshot.pop(key, None) is not None: dropped.append(key)
+        try: shared.write_stats(snapshot); return dropped
+        except ValueError: continue # Too large: nothing was written, the seqlock is untouched
+    return None
+
+def _synthesis_main(name: str, blocks: int, frames: int, settings: Dict[str, Any]):
+    """Child process: runs an AudioEngine's block renderer into the shared ring until told to stop."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN) # Ctrl+C belongs to the game; it stops us through the stop flag
+    config.DEBUG = settings['debug']; config.AMBIENCE_DIR = settings['ambience_dir']; config.AUDIO_QUALITY = settings['quality']; config.AUDIO_QUALITY_GOVERNOR = settings['quality_governor']
+    shared = SharedAudioBlock(blocks, frames, 2, name=name); ring = None; engine = None
+    try:
+        engine = AudioEngine(settings['sample_rate'], settings['oscillator_mode'], backend=NullBackend(), render_ahead_blocks=0, latency_profile=settings['latency_profile'], adaptive_latency=False)
+        if engine._is_disabled: shared.state = STATE_FAILED; return
+        engine.buffer_size = frames
+        parameter_sequence, params = shared.read_parameters()
+        if params: engine._parameters.publish(params) # reset_playback() starts from the newest state
+        engine.reset_playback(); engine._log.start() # The render loop below logs like a callback
+        ring = shared.ring(); idle_sleep = frames / engine.sample_rate / 4
+        while ring.write_slot() is not None: engine._audio_callback(ring.write_slot(), frames, None, None); ring.commit() # Prefill
+        shared.state = STATE_READY
+        parent = multiprocessing.parent_process(); next_check = time.perf_counter(); last_cue = 0; stats_trimmed = False
+        engine._running = True # Accepts play_cue(); the ring loop below stands in for the stream thread
+        threading.Thread(target=lambda: (engine.prewarm_moods(), engine.prewarm_cues()), daemon=True, name="AudioPrewarmThread").start() # Off the render loop
+        while not shared.stop_requested:
+            parameter_sequence, params = shared.read_parameters(parameter_sequence)
+            if params is not None:
+                for serial, name, gain in params.pop('cues', ()):
+                    if serial > last_cue: engine.play_cue(name, gain); last_cue = serial
+                engine.update_parameters(params)
+            slot = ring.write_slot()
+            if slot is not None: engine._audio_callback(slot, frames, None, None); ring.commit(); continue
+            now = time.perf_counter()
+            if now >= next_check: # Ring full: housekeeping, then wait
+                next_check = now + STATS_PUBLISH_INTERVAL
+                if parent is not None and not parent.is_alive(): break # Game died without stopping us
+                engine._update_quality() # The governor judges the child's render times against the block deadline
+                dropped = _publish_stats(shared, engine.get_stats()) # Never fatal: an oversized snapshot is trimmed, not a failed child
+                if (dropped is None or dropped) and not stats_trimmed:
+                    stats_trimmed = True; print(f"[WARN] Audio stats snapshot over {STATS_BLOCK_BYTES} bytes; {'skipped' if dropped is None else 'dropped ' + ', '.join(dropped)}.")
+            time.sleep(idle_sleep)
+    except Exception as e:
+        print(f"Synthesis process error: {e}"); traceback.print_exc()
+        shared.state = STATE_FAILED
+    finally:
+        ring = None; shared.release()
+        if engine is not None and not engine._is_disabled: engine._log.stop()
+
+
+class RemoteAudioEngine:
+    """
+    AudioEngine front end whose synthesis runs in a separate process.
+
+    The game-side API is the same (`update_parameters`, `start`, `stop`,
+    `get_stats`). Parameter snapshots go to the child through shared memory;
+    the child renders PROCESS_RENDER_AHEAD_BLOCKS (or more) blocks ahead into
+    a shared BlockRing, and the device callback here only copies the oldest
+    block out, so GIL stalls in the game process no longer delay synthesis.
+    The block size is fixed by the latency profile (no adaptive sizing).
+    """
+
+    def __init__(self, sample_rate: Optional[int] = None, oscillator_mode: str = OSCILLATOR_MODE, backend: Optional[AudioBackend] = None, render_ahead_blocks: Optional[int] = None, latency_profile: Optional[str] = None):
+        if backend is None: backend = create_backend('sounddevice')
+        self._backend = backend
+        self._is_disabled = not (backend and np and shared_memory)
+        self._running: bool = False; self._thread: Optional[threading.Thread] = None
+        if self._is_disabled: print("RemoteAudioEngine disabled."); return
+        self.latency_profile = resolve_profile(latency_profile or getattr(config, 'AUDIO_LATENCY_PROFILE', DEFAULT_LATENCY_PROFILE))
+        self.fixed_sample_rate: Optional[int] = sample_rate or getattr(config, 'AUDIO_SAMPLE_RATE', None); self.oscillator_mode = oscillator_mode # None: the device's native rate
+        self._use_sample_rate(negotiate_sample_rate(backend, self.fixed_sample_rate, DEFAULT_SAMPLE_RATE))
+        if render_ahead_blocks is None: render_ahead_blocks = self.latency_profile['render_ahead_blocks']
+        self.render_ahead_blocks = max(PROCESS_RENDER_AHEAD_BLOCKS, int(render_ahead_blocks))
+        self._target_params: Dict[str, Any] = {'base_freq': DEFAULT_BASE_FREQ, 'mood': 'default', 'master_volume': 0.6}
+        self._params_lock = threading.Lock() # Serializes writers of the shared parameter region
+        self._shared: Optional[SharedAudioBlock] = None; self._ring: Optional[BlockRing] = None
+        self._process: Optional[multiprocessing.Process] = None
+        self._cue_serial = 0; self._recent_cues: deque = deque(maxlen=MAX_VOICES) # Cues ride along with the parameter snapshot
+        self._stats = CallbackStats(); self._stats_sequence = 0; self._child_stats: Dict[str, Any] = {}
+        self._last_stats_dump = time.perf_counter()
+        self._recorder: Optional[SessionRecorder] = None # Tapped in the device callback, here in the game process
+
+    def _use_sample_rate(self, sample_rate: int): # The child builds its own per-rate state from settings['sample_rate']
+        self.sample_rate = sample_rate; self.buffer_size = int(self.latency_profile['block_seconds'] * sample_rate)
+
+    def update_parameters(self, params: Dict[str, Any]): # Merged here; the child picks up the newest snapshot
+        if self._is_disabled: return
+        with self._params_lock:
+            self._target_params.update(params)
+            self._publish()
+
+    def set_profile(self, profile: Any): # Only the profile's plain params cross; the child's engine readies the rest
+        self.update_parameters(profile.params)
+
+    def play_cue(self, name: str, gain: float = 1.0) -> bool:
+        """Queues a one-shot cue in the child. The last MAX_VOICES cues travel with every snapshot, so none is lost to coalescing."""
+        if self._is_disabled or not self._running: return False
+        with self._params_lock:
+            self._cue_serial += 1; self._recent_cues.append((self._cue_serial, name, gain))
+            self._publish()
+        return True
+
+    def start_recording(self, path: str) -> bool:
+        """Starts capturing the played audio to `path`; same as AudioEngine.start_recording."""
+        if self._is_disabled or self._recorder is not None: return False
+        recorder = SessionRecorder(path, self.sample_rate)
+        if not recorder.start(): return False
+        self._recorder = recorder; return True
+
+    def stop_recording(self) -> Optional[Dict[str, Any]]:
+        recorder = self._recorder; self._recorder = None
+        return recorder.stop() if recorder is not None else None
+
+    def _publish(self): # Caller holds _params_lock
+        if self._shared is not None: self._shared.write_parameters(dict(self._target_params, cues=list(self._recent_cues)))
+
+    def start(self, record_path: Optional[str] = None):
+        """Spawns the synthesis process and opens the stream; `record_path` arms start_recording() first (see AudioEngine.start)."""
+        if self._is_disabled: print("Cannot start: Disabled."); return
+        if self._running: print("Already running."); return
+        if self.fixed_sample_rate is None: self._use_sample_rate(negotiate_sample_rate(self._backend, None, DEFAULT_SAMPLE_RATE)) # Before the ring is sized
+        try: self._backend.check(self.sample_rate, 2) # STEREO
+        except AudioBackendError as e: print(e); return
+        try:
+            self._shared = SharedAudioBlock(self.render_ahead_blocks, self.buffer_size, 2)
+            with self._params_lock: self._publish()
+            settings = {'debug': config.DEBUG, 'sample_rate': self.sample_rate, 'oscillator_mode': self.oscillator_mode, 'latency_profile': self.latency_profile['name'], 'ambience_dir': getattr(config, 'AMBIENCE_DIR', None),
+                        'quality': getattr(config, 'AUDIO_QUALITY', None), 'quality_governor': getattr(config, 'AUDIO_QUALITY_GOVERNOR', True)}
+            context = multiprocessing.get_context('spawn') # Same start method everywhere; no forked copy of game threads
+            self._process = context.Process(target=_synthesis_main, args=(self._shared.name, self.render_ahead_blocks, self.buffer_size, settings), daemon=True, name="AudioSynthesisProcess")
+            self._process.start()
+            if not self._wait_until_ready(): self._teardown(); return
+            self._ring = self._shared.ring(); self._stats.reset()
+            if record_path: self.start_recording(record_path) # Before the stream thread opens the device
+            self._running = True
+            self._thread = threading.Thread(target=self._run, daemon=False, name="AudioEngineThread")
+            self._thread.start()
+            print(f"Audio synthesis process started (pid {self._process.pid}).")
+        except BaseException: # Includes Ctrl+C while waiting for the child: leave nothing behind
+            self._running = False; self.stop_recording(); self._teardown(); raise
+
+    def _wait_until_ready(self) -> bool:
+        deadline = time.perf_counter() + PROCESS_START_TIMEOUT
+        while time.perf_counter() < deadline:
+            state = self._shared.state
+            if state == STATE_READY: return True
+            if state == STATE_FAILED or not self._process.is_alive(): print("Audio synthesis process failed to start."); return False
+            time.sleep(0.01)
+        print("Audio synthesis process start timed out."); return False
+
+    def _ring_callback(self, outdata: np.ndarray, frames: int, time_info, status):
+        """Device callback: copies the oldest block the child rendered, or plays silence on underrun."""
+        self._stats.record_status(status)
+        ring = self._ring
+        block = ring.read_slot() if ring is not None and frames == ring.frames else None
+        if block is None: outdata.fill(0) # Never wait for the child here
+        else: np.copyto(outdata, block); ring.release()
+        recorder = self._recorder
+        if recorder is not None: recorder.tap(outdata, frames) # Underrun silence included: it is what played
+
+    def _on_idle(self):
+        if not config.DEBUG: return
+        now = time.perf_counter()
+        if now - self._last_stats_dump >= STATS_DUMP_INTERVAL: self._last_stats_dump = now; print(format_stats(self.get_stats()), flush=True)
+
+    def _run(self):
+        try: self._backend.run(self._ring_callback, self.sample_rate, self.buffer_size, 2, keep_running=lambda: self._running, on_idle=self._on_idle, latency=self.latency_profile['device_latency']) # STEREO
+        except AudioBackendError as be: print(be)
+        except Exception as e: print(f"Audio thread error: {e}"); traceback.print_exc()
+        finally: print("Audio thread _run method finished.") # stop() still tears the child down
+
+    def get_stats(self) -> Dict[str, Any]:
+        """The child's render stats (see AudioEngine.get_stats), with device-side status counters, ring fill and process state."""
+        if self._is_disabled: return {}
+        if self._shared is not None and self._shared.control is not None:
+            self._stats_sequence, child_stats = self._shared.read_stats(self._stats_sequence)
+            if child_stats is not None: self._child_stats = child_stats
+        device = self._stats.snapshot(getattr(self._backend, 'late_blocks', None))
+        stats = dict(device, **{key: value for key, value in self._child_stats.items() if key in CHILD_STATS_KEYS})
+        if self._ring is not None: stats['render_ahead'] = self._ring.stats(self.sample_rate)
+        stats['latency_profile'] = self.latency_profile['name']; stats['block_size'] = self.buffer_size; stats['sample_rate'] = self.sample_rate
+        process = self._process
+        stats['synthesis_process'] = {'pid': process.pid if process else None, 'alive': bool(process and process.is_alive())}
+        recorder = self._recorder
+        if recorder is not None: stats['recording'] = recorder.stats()
+        return stats
+
+    def _teardown(self, release_memory: bool = True):
+        """Stops and reaps the child, then frees the shared segment. Safe to call repeatedly."""
+        process = self._process; shared = self._shared
+        if shared is not None and shared.control is not None: shared.request_stop()
+        if process is not None:
+            process.join(timeout=PROCESS_JOIN_TIMEOUT)
+            if process.is_alive(): print("[WARN] Audio synthesis process did not exit; terminating."); process.terminate(); process.join(timeout=1.0)
+            self._process = None
+        if shared is not None and release_memory: self._ring = None; shared.release(); self._shared = None
+
+    def stop(self):
+        """Signals the device loop, joins it, then shuts the synthesis process down and frees shared memory."""
+        if self._is_disabled: return
+        thread = self._thread
+        if not self._running and not (thread and thread.is_alive()) and self._shared is None: return
+        print("Stop requested...")
+        self._running = False
+        if thread and thread.is_alive():
+            print(f"Waiting for '{thread.name}' join...")
+            thread.join(timeout=1.5)
+            if thread.is_alive(): print("[WARN] Audio thread join timed out!")
+            else: print("Audio thread joined."); self._thread = None
+        else: self._thread = None
+        if config.DEBUG: print(format_stats(self.get_stats()))
+        self.stop_recording()
+        self._teardown(release_memory=self._thread is None) # A device loop that never returned may still read the ring
+        print("Audio engine stop sequence complete.")
+
+
+print("[remote.py] Loaded.")
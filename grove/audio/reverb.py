@@ -0,0 +1,225 @@
+# grove/audio/reverb.py
+# Convolution reverb: procedural room impulse responses and uniformly partitioned overlap-add FFT convolution.
+
+import threading
+from typing import Optional, Dict, Any
+
+try: import numpy as np
+except ImportError: np = None
+
+# Procedural spaces. seconds: IR length; rt60: decay time of the low band (the highs die faster);
+# predelay: gap before the first reflection; damping_hz: low/high band split; wet: default wet level (0..1)
+REVERB_SPACES: Dict[str, Dict[str, float]] = {
+    "cave": {'seconds': 3.0, 'rt60': 2.6, 'predelay': 0.025, 'damping_hz': 2200.0, 'wet': 0.45},
+    "waterfall": {'seconds': 1.6, 'rt60': 1.3, 'predelay': 0.012, 'damping_hz': 4000.0, 'wet': 0.2},
+    "forest": {'seconds': 1.2, 'rt60': 0.9, 'predelay': 0.008, 'damping_hz': 3500.0, 'wet': 0.12},
+}
+HIGH_BAND_DECAY = 0.4 # High band rt60 as a fraction of the space's rt60 (air and surface absorption)
+EARLY_REFLECTIONS = 6 # Discrete reflections per channel in the first 80 ms after the predelay
+
+def generate_impulse_response(space: str, sample_rate: int) -> 'np.ndarray':
+    """
+    A stereo impulse response for one of REVERB_SPACES, float32 (frames, 2).
+
+    Decaying noise, split at damping_hz so the highs decay faster, plus a few
+    early reflections, different per channel for width. Each channel is
+    scaled to unit energy, so the wet signal is about as loud as the dry one.
+    Deterministic per space.
+    """
+    params = REVERB_SPACES[space]
+    rng = np.random.default_rng(sorted(REVERB_SPACES).index(space) + 101)
+    frames = int(params['seconds'] * sample_rate); predelay = int(params['predelay'] * sample_rate)
+    t = np.arange(frames) / sample_rate
+    freqs = np.fft.rfftfreq(frames, 1.0 / sample_rate); lowpass = 1.0 / (1.0 + (freqs / params['damping_hz']) ** 4)
+    low_envelope = np.exp(-6.91 * t / params['rt60']); high_envelope = np.exp(-6.91 * t / (params['rt60'] * HIGH_BAND_DECAY))
+    ir = np.zeros((frames, 2))
+    for channel in range(2):
+        spectrum = np.fft.rfft(rng.standard_normal(frames))
+        low = np.fft.irfft(spectrum * lowpass, n=frames); high = np.fft.irfft(spectrum * (1.0 - lowpass), n=frames)
+        tail = low * low_envelope + high * high_envelope
+        tail[:predelay] = 0.0; ir[predelay:, channel] = tail[:frames - predelay] # Diffuse tail starts after the predelay
+        for position, gain in zip(rng.integers(predelay, predelay + int(0.08 * sample_rate), EARLY_REFLECTIONS), np.geomspace(0.8, 0.25, EARLY_REFLECTIONS)):
+            ir[min(position, frames - 1), channel] += gain * rng.choice((-1.0, 1.0)) * np.abs(tail).max()
+        ir[:, channel] /= max(1e-12, np.sqrt(np.sum(ir[:, channel] ** 2)))
+    return ir.astype(np.float32)
+
+
+class PartitionedConvolver:
+    """
+    Uniformly partitioned overlap-add convolution of a (frames, channels) signal with a same-width IR.
+
+    The IR is cut into K partitions of one block (P samples) and each is
+    transformed once (FFT size 2P). Every block costs one forward and one
+    inverse FFT plus K spectrum multiply-adds: the input spectra sit in a
+    frequency-domain delay line, and the partition spectra are kept reversed
+    and doubled so the K products for the current block are one contiguous
+    slice, without reordering. Output has no latency beyond the block itself.
+    Work buffers are float64 / complex128, the FFTs' own precision, so every
+    `out=` is written without a cast (a cast would allocate per block).
+    """
+
+    def __init__(self, ir: 'np.ndarray', block_frames: int):
+        self.block_frames = block = int(block_frames); self.channels = ir.shape[1]
+        self.fft_size = 2 * block; bins = block + 1
+        self.partitions = max(1, -(-ir.shape[0] // block))
+        padded = np.zeros((self.partitions * block, self.channels), dtype=np.float64); padded[:ir.shape[0]] = ir
+        parts = padded.reshape(self.partitions, block, self.channels).transpose(0, 2, 1) # (K, channels, P)
+        spectra = np.fft.rfft(parts, n=self.fft_size, axis=2)
+        self._reversed_spectra = np.ascontiguousarray(np.concatenate([spectra[::-1], spectra[::-1]])) # (2K, channels, bins); strided operands make multiply buffer
+        self._delay_line = np.zeros((self.partitions, self.channels, bins), dtype=np.complex128)
+        self._products = np.zeros_like(self._delay_line); self._spectrum = np.zeros((self.channels, bins), dtype=np.complex128)
+        self._input = np.zeros((self.channels, self.fft_size), dtype=np.float64) # Second half stays zero
+        self._output = np.zeros((self.channels, self.fft_size), dtype=np.float64)
+        self._overlap = np.zeros((self.channels, block), dtype=np.float64)
+        self._head = 0
+        self.silent_blocks = self.partitions + 1 # Blocks of silent input fed so far (the tail is gone after K + 1)
+        self.wet_level = 0.0 # Owner's output level for this convolver (ReverbStage ramps it)
+
+    def reset(self):
+        self._delay_line.fill(0); self._overlap.fill(0); self._head = 0; self.silent_blocks = self.partitions + 1; self.wet_level = 0.0
+
+    @property
+    def ringing(self) -> bool:
+        """True while earlier input can still produce output."""
+        return self.silent_blocks <= self.partitions
+
+    def history(self) -> 'np.ndarray':
+        """The last K * P input samples, (channels, K * P) oldest first, recovered from the delay line. Not for the audio thread."""
+        order = [(self._head + 1 + i) % self.partitions for i in range(self.partitions)]
+        blocks = np.fft.irfft(self._delay_line[order], n=self.fft_size, axis=2)[:, :, :self.block_frames] # (K, channels, P)
+        return blocks.transpose(1, 0, 2).reshape(self.channels, -1)
+
+    def load_history(self, history: 'np.ndarray', silent_frames: int = 0):
+        """
+        Puts the convolver in the state it would have after convolving `history` ((channels, n), oldest first):
+        delay line and overlap, so its tail continues exactly. Input older than the IR makes no difference.
+        """
+        self.reset()
+        span = self.partitions * self.block_frames; recent = np.zeros((self.channels, span), dtype=np.float64)
+        count = min(span, history.shape[1]); recent[:, span - count:] = history[:, history.shape[1] - count:]
+        blocks = recent.reshape(self.channels, self.partitions, self.block_frames).transpose(1, 0, 2) # (K, channels, P), oldest first
+        np.fft.rfft(blocks, n=self.fft_size, axis=2, out=self._delay_line); self._head = self.partitions - 1 # Newest block at the head
+        np.multiply(self._delay_line, self._reversed_spectra[:self.partitions], out=self._products) # first = K - 1 - head = 0
+        np.sum(self._products, axis=0, out=self._spectrum)
+        np.fft.irfft(self._spectrum, n=self.fft_size, axis=1, out=self._output)
+        np.copyto(self._overlap, self._output[:, self.block_frames:])
+        self.silent_blocks = min(self.partitions + 1, silent_frames // self.block_frames)
+
+    def process(self, block: Optional['np.ndarray'], out: 'np.ndarray'):
+        """
+        Convolves the next block and writes the wet result.
+
+        Args:
+            block: (P, channels) input, or None for silence (lets the tail ring out).
+            out: (P, channels) destination for the wet signal.
+        """
+        self._head = (self._head + 1) % self.partitions
+        if block is None: self._input[:, :self.block_frames] = 0.0; self.silent_blocks += 1
+        else: np.copyto(self._input[:, :self.block_frames], block.T); self.silent_blocks = 0
+        np.fft.rfft(self._input, axis=1, out=self._delay_line[self._head])
+        first = self.partitions - 1 - self._head # Partition 0 pairs with the newest spectrum
+        np.multiply(self._delay_line, self._reversed_spectra[first:first + self.partitions], out=self._products)
+        np.sum(self._products, axis=0, out=self._spectrum)
+        np.fft.irfft(self._spectrum, n=self.fft_size, axis=1, out=self._output)
+        wet = self._output[:, :self.block_frames]
+        np.add(wet, self._overlap, out=wet); np.copyto(out.T, wet, casting='same_kind')
+        np.copyto(self._overlap, self._output[:, self.block_frames:])
+
+
+class ReverbStage:
+    """
+    The engine's reverb: one convolver per space, a wet level per convolver and a dry level.
+
+    `ensure()` builds IRs and convolvers on the control thread (IRs cached per
+    space and sample rate); the callback only calls `set_target()` and
+    `process()`, and skips spaces not built yet. Only the current space is fed;
+    a space left behind keeps its wet level and rings out on silence, so leaving
+    the cave lets the cave tail decay naturally. Levels move to their targets
+    linearly over one block, and mix equal-power: dry sqrt(1 - wet), wet sqrt(wet).
+    """
+
+    def __init__(self, sample_rate: int):
+        self.sample_rate = sample_rate; self.frames = 0
+        self._irs: Dict[str, 'np.ndarray'] = {}
+        self._convolvers: Dict[str, PartitionedConvolver] = {} # Replaced, never mutated: the callback iterates it
+        self._build_lock = threading.Lock()
+        self.space: Optional[str] = None; self.target_wet = 0.0; self.dry_level = 1.0
+        self._ringing = False # Some convolver still has a tail; kept by process() so `active` costs no scan
+        self._wet: Optional['np.ndarray'] = None; self._mix: Optional['np.ndarray'] = None; self._ramp: Optional['np.ndarray'] = None
+
+    def prepare(self, frames: int):
+        """
+        (Re)builds scratch and convolvers for blocks of `frames`. Call while the callback is not running.
+
+        A convolver re-partitioned for the new block size is loaded with the
+        old one's input history and wet level, so a tail ringing across a
+        block-size switch carries on where it was instead of being cut.
+        """
+        self.frames = frames
+        self._wet = np.zeros((frames, 2), dtype=np.float32); self._mix = np.zeros((frames, 2), dtype=np.float32); self._ramp = np.zeros(frames, dtype=np.float32)
+        with self._build_lock:
+            self._convolvers = {space: self._repartition(space, convolver, frames) for space, convolver in self._convolvers.items()}
+            self._ringing = any(convolver.ringing for convolver in self._convolvers.values())
+
+    def _repartition(self, space: str, old: PartitionedConvolver, frames: int) -> PartitionedConvolver:
+        if old.block_frames == frames: return old
+        convolver = PartitionedConvolver(self._irs[space], frames)
+        if old.ringing:
+            convolver.load_history(old.history(), old.silent_blocks * old.block_frames); convolver.wet_level = old.wet_level
+        return convolver
+
+    def ensure(self, space: Optional[str]):
+        """Builds the IR and convolver for `space` if missing. Control thread only."""
+        if space is None or space not in REVERB_SPACES or not self.frames: return
+        with self._build_lock:
+            if space in self._convolvers: return
+            if space not in self._irs: self._irs[space] = generate_impulse_response(space, self.sample_rate)
+            self._convolvers = {**self._convolvers, space: PartitionedConvolver(self._irs[space], self.frames)}
+
+    def reset(self):
+        for convolver in self._convolvers.values(): convolver.reset()
+        self.dry_level = 1.0; self._ringing = False
+
+    def set_target(self, space: Optional[str], wet: Optional[float]):
+        """Audio thread: the space to feed and its wet level (None: the space's default)."""
+        self.space = space if space in REVERB_SPACES else None
+        if self.space is None: self.target_wet = 0.0
+        else: self.target_wet = max(0.0, min(1.0, REVERB_SPACES[self.space]['wet'] if wet is None else float(wet)))
+
+    @property
+    def active(self) -> bool:
+        return self.dry_level < 1.0 or self.target_wet > 0.0 or self._ringing
+
+    def _fill_ramp(self, start: float, end: float, unit_ramp: 'np.ndarray'):
+        np.multiply(unit_ramp, end - start, out=self._ramp); np.add(self._ramp, start, out=self._ramp); np.sqrt(self._ramp, out=self._ramp)
+
+    def process(self, outdata: 'np.ndarray', frames: int, unit_ramp: 'np.ndarray'):
+        """Audio thread: replaces the (frames, 2) dry mix in `outdata` by dry + wet, in place."""
+        if frames != self.frames or not self.active: return
+        convolvers = self._convolvers # One reference read; ensure() may swap in a new dict meanwhile
+        current = convolvers.get(self.space) if self.space and self.target_wet > 0.0 else None # Not built yet: dry
+        target_dry = 1.0 - self.target_wet if current is not None else 1.0
+        wet = self._wet; mix = self._mix; mixed = False; ringing = False # One convolver at a time: convolve into wet, gain it, add to mix
+        out_left = outdata[:, 0]; out_right = outdata[:, 1]
+        for convolver in convolvers.values():
+            level = convolver.wet_level
+            if convolver is current: new_level = self.target_wet
+            elif convolver.ringing: new_level = level # Rings out at the level it was heard at
+            else: convolver.wet_level = 0.0; continue
+            convolver.process(outdata if convolver is current else None, wet)
+            self._fill_ramp(level, new_level, unit_ramp)
+            np.multiply(wet[:, 0], self._ramp, out=wet[:, 0]); np.multiply(wet[:, 1], self._ramp, out=wet[:, 1])
+            if mixed: np.add(mix, wet, out=mix)
+            else: np.copyto(mix, wet); mixed = True
+            convolver.wet_level = new_level; ringing = ringing or convolver.ringing
+        self._ringing = ringing
+        self._fill_ramp(self.dry_level, target_dry, unit_ramp); self.dry_level = target_dry
+        np.multiply(out_left, self._ramp, out=out_left); np.multiply(out_right, self._ramp, out=out_right)
+        if mixed: np.add(outdata, mix, out=outdata)
+
+    def stats(self) -> Dict[str, Any]:
+        return {'space': self.space, 'wet': self.target_wet, 'spaces_built': sorted(self._convolvers),
+                'partitions': {space: convolver.partitions for space, convolver in self._convolvers.items()}}
+
+
+print("[reverb.py] Loaded.")
@@ -0,0 +1,106 @@
+# grove/audio/ring.py
+# Single-producer / single-consumer ring of fixed-size audio blocks, for rendering ahead of the device.
+
+from typing import Optional, Dict, Any, List
+
+try: import numpy as np
+except ImportError: np = None
+
+
+class BlockRing:
+    """
+    Preallocated ring of `blocks` audio blocks of shape (frames, channels).
+
+    One producer thread fills slots (`write_slot()` + `commit()`) and one
+    consumer (the device callback) drains them (`read_slot()` + `release()`).
+    Each side only ever advances its own counter, and a slot is published by
+    bumping the counter after its data is written, so neither side locks.
+
+    The fill level is sampled at every read into a histogram (index = blocks
+    ready when the device asked), which shows how much of the configured
+    render-ahead margin is actually being used.
+
+    The two counters live in a small int64 array, so with `storage` and
+    `counters` both placed in shared memory the producer can be another
+    process. Metrics are kept by the consumer's own instance.
+    """
+
+    def __init__(self, blocks: int, frames: int, channels: int, storage: Optional['np.ndarray'] = None, counters: Optional['np.ndarray'] = None):
+        """
+        Args:
+            blocks: Ring capacity in blocks (>= 1).
+            frames: Samples per block.
+            channels: Channels per sample.
+            storage: Optional float32 (blocks, frames, channels) array to use instead of allocating
+                     (e.g. a view onto shared memory).
+            counters: Optional int64 array of 2 (write count, read count) to use instead of allocating.
+                      Shared counters are not zeroed here: their creator zeroes them before either side runs.
+
+        Raises:
+            ValueError: If the sizes are invalid or `storage` / `counters` do not match them.
+        """
+        if blocks < 1 or frames < 1 or channels < 1: raise ValueError(f"Invalid ring size {blocks}x{frames}x{channels}")
+        shape = (blocks, frames, channels)
+        if storage is None: storage = np.zeros(shape, dtype=np.float32)
+        elif storage.shape != shape or storage.dtype != np.float32: raise ValueError(f"Ring storage must be float32 {shape}, got {storage.dtype} {storage.shape}")
+        self.blocks = blocks; self.frames = frames; self.channels = channels
+        self.storage = storage
+        self._slots = [storage[i] for i in range(blocks)] # Views made once; no per-block slicing
+        if counters is None: counters = np.zeros(2, dtype=np.int64)
+        elif counters.shape != (2,) or counters.dtype != np.int64: raise ValueError(f"Ring counters must be int64 (2,), got {counters.dtype} {counters.shape}")
+        self._counters = counters # [write count, read count]: monotonic, each advanced by one side only
+        self._reset_metrics()
+
+    def reset(self):
+        """Empties the ring and clears its metrics. Only call while neither side is running."""
+        self._counters[:] = 0
+        self._reset_metrics()
+
+    def _reset_metrics(self):
+        self.underruns = 0; self.min_fill: Optional[int] = None
+        self.fill_histogram: List[int] = [0] * (self.blocks + 1)
+
+    @property
+    def write_count(self) -> int:
+        return int(self._counters[0])
+
+    @property
+    def read_count(self) -> int:
+        return int(self._counters[1])
+
+    @property
+    def fill(self) -> int:
+        """Blocks rendered and not yet consumed."""
+        return self.write_count - self.read_count
+
+    # --- Producer side ---
+    def write_slot(self) -> Optional['np.ndarray']:
+        """The next free block to render into, or None if the ring is full."""
+        if self.write_count - self.read_count >= self.blocks: return None
+        return self._slots[self.write_count % self.blocks]
+
+    def commit(self):
+        """Publishes the block obtained from write_slot()."""
+        self._counters[0] += 1
+
+    # --- Consumer side ---
+    def read_slot(self) -> Optional['np.ndarray']:
+        """The oldest rendered block, or None (counted as an underrun) if the ring is empty."""
+        fill = self.write_count - self.read_count
+        self.fill_histogram[fill] += 1
+        if self.min_fill is None or fill < self.min_fill: self.min_fill = fill
+        if fill <= 0: self.underruns += 1; return None
+        return self._slots[self.read_count % self.blocks]
+
+    def release(self):
+        """Returns the block obtained from read_slot() to the producer."""
+        self._counters[1] += 1
+
+    def stats(self, sample_rate: int) -> Dict[str, Any]:
+        """Fill-level metrics; `latency_ms` is the audio buffered when the ring is full."""
+        return {'blocks': self.blocks, 'latency_ms': 1000.0 * self.blocks * self.frames / sample_rate,
+                'fill': self.fill, 'min_fill': self.min_fill, 'underruns': self.underruns,
+                'fill_histogram': list(self.fill_histogram)}
+
+
+print("[ring.py] Loaded.")
@@ -0,0 +1,115 @@
+# grove/audio/rtlog.py
+# Real-time-safe logging for the audio thread: fixed-size records in a lock-free ring, formatted and printed by a writer thread.
+
+import sys
+import threading
+import time
+import traceback
+from typing import Optional, Dict, Any, List
+
+LOG_RING_RECORDS = 256 # Records the ring holds; the audio thread drops (and counts) beyond this
+LOG_RECORD_ARGS = 4 # Argument slots per record (numbers, or references to existing objects)
+LOG_FLUSH_INTERVAL = 0.1 # Seconds between writer wake-ups
+LOG_RATE_LIMIT = 5 # Messages per event printed per LOG_RATE_WINDOW; the rest are counted and summarised
+LOG_RATE_WINDOW = 1.0
+
+# Events the audio thread may log: (name, level, template). Templates use str.format() on the record's arguments;
+# an exception argument is also printed with its traceback. 'error' goes to stderr, the rest to stdout.
+AUDIO_EVENTS = [
+    ("callback_error", 'error', "---!! Crit CB Err !!---"),
+    ("generate_error", 'error', "[UNEX GEN]: {0}"),
+    ("binaural_error", 'warn', "[WARN] Binaural gen failed: {0}"),
+    ("stream_status", 'debug', "[DEBUG] Stream status: {0}"),
+    ("crossfade_start", 'debug', "[DEBUG] CF Trig: '{0}' -> '{1}' ({2}, level {3:.2f})"),
+    ("crossfade_done", 'debug', "[DEBUG] CF Complete."),
+    ("initial_ramp_done", 'debug', "[DEBUG] Initial ramp done."),
+]
+EVENT_CALLBACK_ERROR, EVENT_GENERATE_ERROR, EVENT_BINAURAL_ERROR, EVENT_STREAM_STATUS, EVENT_CROSSFADE_START, EVENT_CROSSFADE_DONE, EVENT_INITIAL_RAMP_DONE = range(len(AUDIO_EVENTS))
+
+
+class AudioLog:
+    """
+    Log channel from one real-time thread to the terminal.
+
+    `log()` (the audio thread; exactly one producer at a time) writes an event
+    code, a timestamp and up to LOG_RECORD_ARGS argument references into the
+    next preallocated record and advances its counter: no formatting, no I/O,
+    no locks. When the ring is full the record is dropped and counted. The
+    writer thread (`start()`) wakes every LOG_FLUSH_INTERVAL, formats what is
+    queued, and prints at most LOG_RATE_LIMIT messages per event and
+    LOG_RATE_WINDOW, summarising the rest and any drops. Same counter scheme
+    as ring.BlockRing: each side advances only its own.
+    """
+
+    def __init__(self, capacity: int = LOG_RING_RECORDS):
+        self.capacity = max(1, int(capacity))
+        self._records: List[List[Any]] = [[0, 0.0] + [None] * LOG_RECORD_ARGS for _ in range(self.capacity)] # [event, time, args...], reused
+        self._written = 0; self._read = 0 # Monotonic; the producer advances the first, the writer the second
+        self.dropped = 0 # Producer side
+        self.emitted = 0; self.suppressed = 0; self._reported_drops = 0 # Writer side
+        self._window_start = [0.0] * len(AUDIO_EVENTS); self._window_count = [0] * len(AUDIO_EVENTS); self._window_suppressed = [0] * len(AUDIO_EVENTS)
+        self._thread: Optional[threading.Thread] = None; self._stop = threading.Event()
+
+    def log(self, event: int, a: Any = None, b: Any = None, c: Any = None, d: Any = None) -> bool:
+        """Audio thread: queues one event. Arguments are stored by reference and formatted later. False if dropped."""
+        written = self._written
+        if written - self._read >= self.capacity: self.dropped += 1; return False
+        record = self._records[written % self.capacity]
+        record[0] = event; record[1] = time.perf_counter(); record[2] = a; record[3] = b; record[4] = c; record[5] = d
+        self._written = written + 1 # Publish after the record is complete
+        return True
+
+    def _emit(self, line: str, level: str):
+        stream = sys.stderr if level == 'error' else sys.stdout
+        print(line, file=stream, flush=True); self.emitted += 1
+
+    def _flush_suppressed(self, event: int):
+        if self._window_suppressed[event]:
+            self._emit(f"[AUDIO LOG] {self._window_suppressed[event]} more '{AUDIO_EVENTS[event][0]}' messages suppressed.", AUDIO_EVENTS[event][1])
+            self._window_suppressed[event] = 0
+
+    def _format(self, record: List[Any]) -> str:
+        name, _, template = AUDIO_EVENTS[record[0]]; args = record[2:]
+        try: line = template.format(*args)
+        except (IndexError, KeyError, ValueError, TypeError) as e: line = f"[AUDIO LOG] {name}: {args} (unformattable: {e})"
+        exception = next((arg for arg in args if isinstance(arg, BaseException)), None)
+        if exception is not None: line += "\n" + "".join(traceback.format_exception(type(exception), exception, exception.__traceback__)).rstrip()
+        return line
+
+    def drain(self) -> int:
+        """Formats and prints everything queued, rate-limited. Returns the records consumed. Never call on the audio thread."""
+        consumed = 0
+        while self._read < self._written:
+            record = self._records[self._read % self.capacity]; event = record[0]; stamp = record[1]
+            if stamp - self._window_start[event] >= LOG_RATE_WINDOW:
+                self._flush_suppressed(event); self._window_start[event] = stamp; self._window_count[event] = 0
+            if self._window_count[event] < LOG_RATE_LIMIT: self._window_count[event] += 1; self._emit(self._format(record), AUDIO_EVENTS[event][1])
+            else: self._window_suppressed[event] += 1; self.suppressed += 1
+            record[2] = record[3] = record[4] = record[5] = None # Let go of exceptions (and their frames) now
+            self._read += 1; consumed += 1
+        dropped = self.dropped
+        if dropped != self._reported_drops: print(f"[WARN] Audio log full: {dropped - self._reported_drops} messages dropped.", flush=True); self._reported_drops = dropped
+        return consumed
+
+    def _write_loop(self):
+        while not self._stop.wait(LOG_FLUSH_INTERVAL): self.drain()
+
+    def start(self):
+        """Starts the writer thread (no-op if running)."""
+        if self._thread is not None: return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._write_loop, daemon=True, name="AudioLogThread")
+        self._thread.start()
+
+    def stop(self):
+        """Stops the writer thread, then prints what is left, including pending suppression summaries."""
+        thread = self._thread
+        if thread is not None: self._stop.set(); thread.join(timeout=1.0); self._thread = None
+        self.drain()
+        for event in range(len(AUDIO_EVENTS)): self._flush_suppressed(event)
+
+    def stats(self) -> Dict[str, Any]:
+        return {'logged': self._written, 'pending': self._written - self._read, 'dropped': self.dropped, 'emitted': self.emitted, 'suppressed': self.suppressed}
+
+
+print("[rtlog.py] Loaded.")
@@ -0,0 +1,149 @@
+# grove/audio/stats.py
+# Fixed-size timing and xrun counters for the audio callback (cheap enough to run on the audio thread).
+
+import time
+from bisect import bisect_right
+from typing import Dict, Any, List, Optional
+
+# Render time is binned as a ratio of the block's real-time budget (block frames / sample rate),
+# in half-octave bins from 1/1024 of the budget up to 2x; the first and last bins catch the rest.
+HISTOGRAM_EDGES = tuple(2.0 ** (k / 2.0) / 1024.0 for k in range(23))
+HISTOGRAM_BINS = len(HISTOGRAM_EDGES) + 1
+PERCENTILES = (50, 95, 99)
+
+
+def percentile_ratio(histogram: List[int], count: int, percent: float) -> float:
+    """Upper bin edge (budget ratio) below which `percent` of the callbacks fall (inf: overflow bin)."""
+    if count == 0: return 0.0
+    threshold = count * percent / 100.0; cumulative = 0
+    for index, bin_count in enumerate(histogram):
+        cumulative += bin_count
+        if cumulative >= threshold: break
+    return HISTOGRAM_EDGES[index] if index < len(HISTOGRAM_EDGES) else float('inf')
+
+
+
+class StatsWindow:
+    """
+    Fixed-interval windows over get_stats() snapshots: the callbacks' budget-ratio histogram and trouble count per window.
+
+    Trouble is any underflow (device or render-ahead ring), late or over-budget
+    block. The snapshot counters are cumulative; `take()` turns them into
+    deltas since the previous window. Counters restart with the stream
+    (reset_playback, a new ring), so deltas are clamped at zero. After
+    `rebaseline()` (e.g. a tier or block-size change) the next window is only
+    used as the new baseline, since it mixes both settings.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval; self.start = time.perf_counter()
+        self._previous: Optional[Dict[str, Any]] = None # Cumulative counters at the last window
+        self._rebaseline = False
+
+    def due(self, now: Optional[float] = None) -> bool:
+        """True once a full window has passed; check before taking a (costly) stats snapshot."""
+        return (time.perf_counter() if now is None else now) - self.start >= self.interval
+
+    def rebaseline(self):
+        self._rebaseline = True
+
+    def take(self, stats: Dict[str, Any], now: float) -> Optional[Dict[str, Any]]:
+        """Closes the window at `now`: {'histogram', 'count', 'trouble'} since the last one, or None while re-baselining."""
+        self.start = now
+        histogram = [a + b for a, b in zip(stats['steady']['histogram'], stats['crossfade']['histogram'])]
+        trouble = stats['underflows'] + stats['over_budget'] + stats.get('late_blocks', 0) + stats.get('render_ahead', {}).get('underruns', 0)
+        previous = self._previous or {'histogram': [0] * len(histogram), 'trouble': 0}
+        self._previous = {'histogram': histogram, 'trouble': trouble}
+        if self._rebaseline: self._rebaseline = False; return None
+        window = [max(0, current - before) for current, before in zip(histogram, previous['histogram'])]
+        return {'histogram': window, 'count': sum(window), 'trouble': max(0, trouble - previous['trouble'])}
+
+
+class _TimingTrack:
+    """Count / sum / max and a budget-ratio histogram for one kind of callback."""
+    __slots__ = ('count', 'total_seconds', 'max_seconds', 'max_ratio', 'over_budget', 'histogram')
+
+    def __init__(self):
+        self.count = 0; self.total_seconds = 0.0; self.max_seconds = 0.0; self.max_ratio = 0.0; self.over_budget = 0
+        self.histogram: List[int] = [0] * HISTOGRAM_BINS # Preallocated; record() only increments
+
+    def record(self, seconds: float, ratio: float):
+        self.count += 1; self.total_seconds += seconds
+        if seconds > self.max_seconds: self.max_seconds = seconds
+        if ratio > self.max_ratio: self.max_ratio = ratio
+        if ratio >= 1.0: self.over_budget += 1
+        self.histogram[bisect_right(HISTOGRAM_EDGES, ratio)] += 1
+
+    def snapshot(self, budget_seconds: float) -> Dict[str, Any]:
+        histogram = list(self.histogram); count = self.count # Copy first: the audio thread keeps writing
+        mean_seconds = self.total_seconds / count if count else 0.0
+        stats = {'count': count, 'mean_ms': mean_seconds * 1000.0, 'max_ms': self.max_seconds * 1000.0,
+                 'mean_budget_ratio': mean_seconds / budget_seconds if budget_seconds > 0 else 0.0,
+                 'max_budget_ratio': self.max_ratio, 'over_budget': self.over_budget}
+        for percent in PERCENTILES: stats[f'p{percent}_budget_ratio'] = percentile_ratio(histogram, sum(histogram), percent)
+        stats['histogram'] = histogram
+        return stats
+
+
+class CallbackStats:
+    """
+    Per-callback render timing, split into steady-state and crossfading blocks,
+    plus counters for the stream status flags the backend reports.
+
+    `record()` and `record_status()` run on the audio thread: they only update
+    preallocated counters and never print. `snapshot()` may be called from any
+    thread; values written concurrently can be one callback apart.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.steady = _TimingTrack(); self.crossfade = _TimingTrack()
+        self.budget_seconds = 0.0
+        self.underflows = 0; self.overflows = 0; self.status_flags = 0 # Callbacks with any status flag set
+
+    def record(self, seconds: float, budget_seconds: float, crossfading: bool):
+        self.budget_seconds = budget_seconds
+        (self.crossfade if crossfading else self.steady).record(seconds, seconds / budget_seconds if budget_seconds > 0 else 0.0)
+
+    def record_status(self, status: Any):
+        """Counts a non-empty callback status (sounddevice CallbackFlags or any truthy value)."""
+        if not status: return
+        self.status_flags += 1
+        if getattr(status, 'output_underflow', False): self.underflows += 1
+        if getattr(status, 'output_overflow', False): self.overflows += 1
+
+    def snapshot(self, late_blocks: Optional[int] = None) -> Dict[str, Any]:
+        steady = self.steady.snapshot(self.budget_seconds); crossfade = self.crossfade.snapshot(self.budget_seconds)
+        callbacks = steady['count'] + crossfade['count']
+        stats = {'callbacks': callbacks, 'budget_ms': self.budget_seconds * 1000.0,
+                 'max_budget_ratio': max(steady['max_budget_ratio'], crossfade['max_budget_ratio']),
+                 'over_budget': steady['over_budget'] + crossfade['over_budget'],
+                 'underflows': self.underflows, 'overflows': self.overflows, 'status_flags': self.status_flags,
+                 'histogram_edges': HISTOGRAM_EDGES, 'steady': steady, 'crossfade': crossfade}
+        if late_blocks is not None: stats['late_blocks'] = late_blocks # Clocked fake devices report missed deadlines
+        return stats
+
+
+def format_stats(stats: Dict[str, Any]) -> str:
+    """One-line summary of a CallbackStats snapshot for debug output."""
+    steady, crossfade = stats['steady'], stats['crossfade']
+    line = (f"[AUDIO STATS] {stats['callbacks']} cb, budget {stats['budget_ms']:.1f} ms | "
+            f"steady mean {steady['mean_ms']:.2f} ms p99 <{steady['p99_budget_ratio']:.1%} max {steady['max_ms']:.2f} ms | "
+            f"xfade mean {crossfade['mean_ms']:.2f} ms max {crossfade['max_ms']:.2f} ms | "
+            f"over budget {stats['over_budget']}, underflows {stats['underflows']}")
+    if 'late_blocks' in stats: line += f", late {stats['late_blocks']}"
+    if 'render_ahead' in stats:
+        ahead = stats['render_ahead']
+        line += f" | ahead {ahead['fill']}/{ahead['blocks']} (min {ahead['min_fill']}), ring underruns {ahead['underruns']}"
+    if 'voices' in stats: line += f" | voices {stats['voices']['active']}/{stats['voices']['voices']}, stolen {stats['voices']['stolen']}"
+    if stats.get('noise_beds', {}).get('current'): line += f" | bed {stats['noise_beds']['current']}"
+    if stats.get('ambience', {}).get('current'): line += f" | ambience {stats['ambience']['current']}"
+    if 'quality' in stats: line += f" | quality {stats['quality']['tier']}" + (f" ({stats['quality']['changes']} changes)" if stats['quality']['changes'] else "")
+    if stats.get('glides'): line += " | gliding " + ", ".join(f"{name} {glide['value']:.3g}->{glide['target']:.3g}" for name, glide in stats['glides'].items())
+    if 'recording' in stats: line += f" | rec {stats['recording']['seconds']:.0f}s, dropped {stats['recording']['dropped_blocks']}"
+    return line
+
+
+print("[stats.py] Loaded.")
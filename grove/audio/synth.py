@@ -71,7 +71,7 @@ def generate_sine_wave(
 
     # Generate time vector starting from start_time
     try:
-        t = np.linspace(start_time, end_time, num_samples, endpoint=False, dtype=np.float32)
+        t = np.linspace(start_time, end_time, num_samples, endpoint=False, dtype=np.float64) # float64: float32 loses precision as start_time grows
         # Generate base sine wave (amplitude 1)
         base_wave = np.sin(2 * np.pi * frequency * t)
         # Multiply by the amplitude (scalar or array)
@@ -128,4 +128,8 @@ def generate_lfo(
         # Fallback if sine generation fails, return constant offset
         return np.full(num_samples, offset, dtype=np.float32)
 
+# --- Oscillator Bank ---
+# The phase-continuous oscillator kernel lives in dsp.py; re-exported here for existing imports.
+from .dsp import OscillatorBank, OSCILLATOR_MODES, MAX_LFO_DEPTH_SCALE, LFO_CONTROL_RATE, phase_increment, wavetable_sine
+
 print("[synth.py] Modified for time continuity.")
\ No newline at end of file
@@ -0,0 +1,200 @@
+# grove/audio/voices.py
+# One-shot sound cues: procedural cue synthesis, a per-sample-rate cue cache, and a fixed voice pool mixed by the callback.
+
+import threading
+from collections import deque
+from typing import Optional, Dict, Tuple, Callable, List
+
+try: import numpy as np
+except ImportError: np = None
+
+# Voices mixed at once; a cue arriving with all of them busy steals the oldest
+MAX_VOICES = 8
+# Voices one cue may hold; a further trigger of the same cue steals its own oldest voice
+MAX_VOICES_PER_CUE = 2
+CUE_PEAK = 0.3 # Peak level each cue is normalized to, before master volume
+CUE_EDGE_SECONDS = 0.002 # Short fade at both ends of every cue, so starts and ends never click
+
+def _band_noise(rng, frames: int, sample_rate: int, low_hz: float, high_hz: float) -> 'np.ndarray':
+    """White noise band-limited to low_hz..high_hz (FFT-shaped, soft edges), scaled to peak 1."""
+    spectrum = np.fft.rfft(rng.standard_normal(frames))
+    freqs = np.fft.rfftfreq(frames, 1.0 / sample_rate)
+    shape = 1.0 / (1.0 + (low_hz / np.maximum(freqs, 1e-3)) ** 4) / (1.0 + (freqs / high_hz) ** 4)
+    noise = np.fft.irfft(spectrum * shape, n=frames)
+    return noise / max(1e-9, np.abs(noise).max())
+
+def _swell(frames: int, attack: float) -> 'np.ndarray':
+    """Smooth rise over the first `attack` fraction of the cue, then a smooth fall to zero."""
+    position = np.linspace(0.0, 1.0, frames, endpoint=False)
+    rising = np.sin(0.5 * np.pi * np.clip(position / attack, 0.0, 1.0)) ** 2
+    falling = np.cos(0.5 * np.pi * np.clip((position - attack) / (1.0 - attack), 0.0, 1.0)) ** 2
+    return np.where(position < attack, rising, falling)
+
+def _pan(mono: 'np.ndarray', pan) -> 'np.ndarray':
+    """Equal-power pan (-1 left .. 1 right; scalar or per-sample) to a (frames, 2) buffer."""
+    angle = (np.asarray(pan, dtype=np.float64) + 1.0) * 0.25 * np.pi
+    return np.stack([mono * np.cos(angle), mono * np.sin(angle)], axis=1)
+
+def _gust(sample_rate: int, rng) -> 'np.ndarray':
+    frames = int(2.4 * sample_rate)
+    wind = 0.7 * _band_noise(rng, frames, sample_rate, 150.0, 700.0) + 0.3 * _band_noise(rng, frames, sample_rate, 900.0, 2500.0)
+    return _pan(wind * _swell(frames, 0.4), np.linspace(-0.6, 0.6, frames)) # Sweeps across as it passes
+
+def _bird_call(sample_rate: int, rng) -> 'np.ndarray':
+    chirp_frames = int(0.11 * sample_rate); gap_frames = int(0.07 * sample_rate)
+    chirps = []
+    for start_hz, end_hz in ((2900.0, 4100.0), (3100.0, 4300.0), (2500.0, 3300.0)):
+        glide = np.linspace(start_hz, end_hz, chirp_frames) * (1.0 + 0.01 * rng.standard_normal())
+        phase = 2 * np.pi * np.cumsum(glide) / sample_rate
+        envelope = np.sin(np.pi * np.linspace(0.0, 1.0, chirp_frames)) ** 2
+        chirps += [envelope * (np.sin(phase) + 0.2 * np.sin(2 * phase)), np.zeros(gap_frames)]
+    return _pan(np.concatenate(chirps), 0.5) # From a branch to the right
+
+def _stone_skitter(sample_rate: int, rng) -> 'np.ndarray':
+    frames = int(1.0 * sample_rate); mono = np.zeros(frames)
+    hit_frames = int(0.04 * sample_rate); decay = np.exp(-np.arange(hit_frames) / (0.006 * sample_rate))
+    time_s = 0.0; level = 1.0
+    for interval in np.linspace(0.16, 0.05, 7) * rng.uniform(0.8, 1.2, 7): # Bounces speed up and fade as it settles
+        start = int(time_s * sample_rate)
+        if start + hit_frames > frames: break
+        tone = np.sin(2 * np.pi * rng.uniform(1200.0, 2600.0) * np.arange(hit_frames) / sample_rate)
+        mono[start:start + hit_frames] += level * decay * (0.6 * tone + 0.4 * rng.standard_normal(hit_frames))
+        time_s += interval; level *= 0.75
+    return _pan(mono, -0.4)
+
+def _breath_swell(sample_rate: int, rng) -> 'np.ndarray':
+    frames = int(3.6 * sample_rate)
+    air = _band_noise(rng, frames, sample_rate, 80.0, 450.0)
+    hum = 0.25 * np.sin(2 * np.pi * 110.0 * np.arange(frames) / sample_rate)
+    return _pan((air + hum) * _swell(frames, 0.42), 0.0) # In for ~1.5 s, out for ~2 s
+
+# Cue name -> synthesis function(sample_rate, rng) returning (frames, 2)
+CUE_SYNTHS: Dict[str, Callable] = {'gust': _gust, 'bird_call': _bird_call, 'stone_skitter': _stone_skitter, 'breath_swell': _breath_swell}
+
+def render_cue(name: str, sample_rate: int) -> Optional['np.ndarray']:
+    """Synthesizes one cue as a float32 (frames, 2) buffer at CUE_PEAK, or None for an unknown cue. Deterministic per name."""
+    synth = CUE_SYNTHS.get(name)
+    if synth is None or not np: return None
+    rng = np.random.default_rng(sorted(CUE_SYNTHS).index(name) + 1)
+    stereo = synth(sample_rate, rng)
+    stereo *= CUE_PEAK / max(1e-9, np.abs(stereo).max())
+    edge = min(len(stereo) // 2, max(1, int(CUE_EDGE_SECONDS * sample_rate))); ramp = np.linspace(0.0, 1.0, edge)[:, np.newaxis]
+    stereo[:edge] *= ramp; stereo[-edge:] *= ramp[::-1]
+    return np.ascontiguousarray(stereo, dtype=np.float32)
+
+
+class CueCache:
+    """Rendered cue buffers by (name, sample_rate); rendered on first request from a non-audio thread."""
+
+    def __init__(self):
+        self._buffers: Dict[Tuple[str, int], 'np.ndarray'] = {}
+        self._write_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buffers)
+
+    def get(self, name: str, sample_rate: int) -> Optional['np.ndarray']:
+        key = (name, int(sample_rate))
+        buffer = self._buffers.get(key)
+        if buffer is not None: return buffer
+        with self._write_lock:
+            buffer = self._buffers.get(key)
+            if buffer is None:
+                try: buffer = render_cue(name, sample_rate)
+                except (ValueError, MemoryError) as e: print(f"[WARN] Cue '{name}' render failed: {e}"); return None
+                if buffer is not None: self._buffers[key] = buffer
+            return buffer
+
+    def render_all(self, sample_rate: int):
+        for name in CUE_SYNTHS: self.get(name, sample_rate)
+
+
+class _Voice:
+    __slots__ = ('cue', 'buffer', 'position', 'gain', 'serial')
+
+    def __init__(self):
+        self.cue: Optional[str] = None; self.buffer: Optional['np.ndarray'] = None
+        self.position = 0; self.gain = 0.0; self.serial = 0 # Start order, for picking the oldest voice
+
+
+class VoicePool:
+    """
+    A fixed set of MAX_VOICES one-shot voices mixed straight into the stereo output.
+
+    `trigger()` (game thread) only queues a request. The callback starts
+    queued cues at the next block, stealing a voice when the cue already holds
+    MAX_VOICES_PER_CUE voices or the pool is full (the oldest one; it is faded
+    out over that block rather than cut), and adds every playing voice into the
+    output. Work per block is bounded by the pool size, not by how many cues
+    the game fires.
+    """
+
+    def __init__(self, max_voices: int = MAX_VOICES, max_per_cue: int = MAX_VOICES_PER_CUE):
+        self.voices: List[_Voice] = [_Voice() for _ in range(max(1, max_voices))]
+        self.max_per_cue = max(1, max_per_cue)
+        self._requests: deque = deque() # (cue, buffer, gain); append / popleft are atomic
+        self._serial = 0; self.active = 0
+        self.started = 0; self.stolen = 0; self.dropped = 0
+        self._scratch: Optional['np.ndarray'] = None; self._fade_out: Optional['np.ndarray'] = None
+
+    @property
+    def busy(self) -> bool:
+        return self.active > 0 or bool(self._requests)
+
+    def prepare(self, frames: int):
+        """(Re)allocates the per-block scratch. Call while the callback is not running."""
+        self._scratch = np.zeros((frames, 2), dtype=np.float32)
+        self._fade_out = np.repeat((1.0 - np.arange(frames, dtype=np.float32) / frames)[:, np.newaxis], 2, axis=1) # Tiled: no broadcasting in the callback
+
+    def trigger(self, cue: str, buffer: 'np.ndarray', gain: float = 1.0):
+        self._requests.append((cue, buffer, gain))
+
+    def clear(self):
+        self._requests.clear()
+        for voice in self.voices: voice.buffer = None; voice.cue = None
+        self.active = 0
+
+    def _mix_voice(self, voice: _Voice, frames: int, out: 'np.ndarray', fade_out: bool = False) -> int:
+        count = min(frames, voice.buffer.shape[0] - voice.position); scratch = self._scratch[:count]
+        np.multiply(voice.buffer[voice.position:voice.position + count], voice.gain, out=scratch)
+        if fade_out: np.multiply(scratch, self._fade_out[:count], out=scratch)
+        np.add(out[:count], scratch, out=out[:count])
+        return count
+
+    def _start(self, cue: str, buffer: 'np.ndarray', gain: float, frames: int, out: 'np.ndarray'):
+        voices = self.voices; same_count = 0; oldest_same = free = oldest = -1 # One index scan: no lists or key lambdas on the audio thread
+        for index in range(len(voices)):
+            other = voices[index]
+            if other.buffer is None:
+                if free < 0: free = index
+                continue
+            if oldest < 0 or other.serial < voices[oldest].serial: oldest = index
+            if other.cue == cue:
+                same_count += 1
+                if oldest_same < 0 or other.serial < voices[oldest_same].serial: oldest_same = index
+        voice = voices[oldest_same if same_count >= self.max_per_cue else free if free >= 0 else oldest]
+        if voice.buffer is not None: self._mix_voice(voice, frames, out, fade_out=True); self.stolen += 1 # Declick the stolen voice
+        self._serial += 1; self.started += 1
+        voice.cue = cue; voice.buffer = buffer; voice.position = 0; voice.gain = gain; voice.serial = self._serial
+
+    def mix_into(self, out: 'np.ndarray', frames: int) -> bool:
+        """Audio thread: starts queued cues and adds every playing voice into `out` (frames, 2). True if anything played."""
+        if self._scratch is None or self._scratch.shape[0] != frames: return False
+        while len(self._requests) > len(self.voices): self._requests.popleft(); self.dropped += 1 # Burst beyond the pool: the oldest would be stolen at once anyway
+        for _ in range(len(self.voices)): # At most one pool's worth of starts per block
+            if not self._requests: break
+            self._start(*self._requests.popleft(), frames, out)
+        played = False; active = 0
+        for voice in self.voices:
+            if voice.buffer is None: continue
+            voice.position += self._mix_voice(voice, frames, out); played = True
+            if voice.position >= voice.buffer.shape[0]: voice.buffer = None; voice.cue = None
+            else: active += 1
+        self.active = active
+        return played
+
+    def stats(self) -> Dict[str, int]:
+        return {'active': self.active, 'voices': len(self.voices), 'started': self.started, 'stolen': self.stolen, 'dropped': self.dropped}
+
+
+print("[voices.py] Loaded.")
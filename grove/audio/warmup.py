@@ -0,0 +1,64 @@
+# grove/audio/warmup.py
+# Starts the audio stack on a background thread, so the introduction text never waits for it.
+# Keep this module light: numpy, sounddevice/PortAudio and the engine are imported on the warm-up thread.
+
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Optional, Any
+
+try: from .. import config
+except ImportError: config = type('config', (), {'DEBUG': False})
+
+# Mirrors backends.BACKENDS; listed here so argument parsing does not import numpy / sounddevice
+AUDIO_BACKEND_NAMES = ('capture', 'null', 'sounddevice')
+AUDIO_READY_TIMEOUT = 10.0 # Seconds the game waits for audio after the intro before going on without it
+
+def _start_engine(backend_name: str, render_ahead_blocks: Optional[int], synthesis_process: bool, record_path: Optional[str]) -> Optional[Any]:
+    from .backends import create_backend # Deferred imports: this is where numpy and PortAudio load
+    backend = create_backend(backend_name)
+    if backend is None: print("Audio is disabled (check dependencies or engine code)."); return None
+    if synthesis_process:
+        from .remote import RemoteAudioEngine
+        if config.AUDIO_ADAPTIVE_LATENCY: print("Adaptive latency is not available with --audio-process; using a fixed block size.")
+        engine = RemoteAudioEngine(backend=backend, render_ahead_blocks=render_ahead_blocks)
+    else:
+        from .engine import AudioEngine
+        engine = AudioEngine(backend=backend, render_ahead_blocks=render_ahead_blocks)
+    if engine._is_disabled: return None
+    engine.start(record_path=record_path) # Device check, banks, first loop, recorder, stream open: the recording has the session from its first block
+    if not engine._running: return None
+    if hasattr(engine, 'prewarm_moods'): engine.prewarm_moods(); engine.prewarm_cues() # Remaining loops and cues, while the first mood already plays
+    return engine
+
+def warm_up_audio(backend_name: str = 'sounddevice', render_ahead_blocks: Optional[int] = None, synthesis_process: bool = False, record_path: Optional[str] = None) -> 'Future':
+    """
+    Builds and starts the audio engine on a background thread.
+
+    Returns:
+        A Future resolving to the running engine, or to None if audio is
+        unavailable or failed to start (failures are printed, never raised).
+    """
+    ready: Future = Future(); ready.set_running_or_notify_cancel()
+    def warm_up():
+        try: engine = _start_engine(backend_name, render_ahead_blocks, synthesis_process, record_path)
+        except BaseException as e: print(f"Audio warm-up failed: {type(e).__name__}: {e}"); engine = None
+        ready.set_result(engine)
+        if config.DEBUG: print(f"[DEBUG] Audio warm-up done ({'running' if engine else 'no audio'}).")
+    threading.Thread(target=warm_up, daemon=True, name="AudioWarmupThread").start()
+    return ready
+
+def wait_for_audio(ready: 'Future', timeout: Optional[float] = AUDIO_READY_TIMEOUT) -> Optional[Any]:
+    """
+    The engine from `warm_up_audio()`, waiting up to `timeout` seconds for it.
+
+    On timeout the game goes on silently, and an engine that finishes
+    starting later is stopped straight away instead of being leaked.
+    """
+    try: return ready.result(timeout)
+    except FutureTimeoutError:
+        print("Audio is taking too long to start; continuing without it.")
+        ready.add_done_callback(lambda late: late.result() and late.result().stop())
+        return None
+
+
+print("[warmup.py] Loaded.")
@@ -4,4 +4,21 @@
 # Set to True via command-line argument (--debug) for detailed output
 DEBUG = False
 
+# Audio latency profile: 'low', 'balanced' or 'safe' (see grove/audio/latency.py); set via --latency-profile
+AUDIO_LATENCY_PROFILE = 'balanced'
+# Audio output sample rate in Hz (None: the output device's native rate, so the host need not resample); set via --sample-rate
+AUDIO_SAMPLE_RATE = None
+# Let the audio engine grow/shrink its block size from measured callback cost; set via --adaptive-latency
+AUDIO_ADAPTIVE_LATENCY = False
+# Run audio synthesis in a separate process (shared-memory ring; see grove/audio/remote.py); set via --audio-process
+AUDIO_SYNTHESIS_PROCESS = False
+# Best audio quality tier: 'full', 'reduced', 'low' or 'minimal' (see grove/audio/quality.py); set via --audio-quality
+AUDIO_QUALITY = 'full'
+# Step the quality tier down under load and back up with headroom; --fixed-quality turns this off
+AUDIO_QUALITY_GOVERNOR = True
+# Folder of recorded ambience beds named '<audio_mood>.wav' (None: the 'ambience' folder beside grove/); set via --ambience-dir
+AMBIENCE_DIR = None
+# Capture what the player hears to this file (.wav, or .raw/.f32 for float32); set via --record-session
+AUDIO_RECORD_PATH = None
+
 print(f"[config.py] Loaded (DEBUG={DEBUG})")
\ No newline at end of file
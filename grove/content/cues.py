@@ -0,0 +1,22 @@
+# grove/content/cues.py
+# Which one-shot sound cue (see grove/audio/voices.py) goes with a flavor event or an action.
+
+from typing import Dict, Any, Optional, List, Tuple
+
+# Flavor event text fragment -> cue; the first fragment found in the event text wins
+EVENT_CUES: List[Tuple[str, str]] = [
+    ("gust of wind", "gust"), ("bird call", "bird_call"), ("stone skitters", "stone_skitter"), ("leaf spirals", "gust"),
+]
+# Action command -> cue, unless the action's own data sets 'cue' (None there: silent)
+ACTION_CUES: Dict[str, str] = {
+    'b': 'breath_swell', 'check breath': 'breath_swell', 'meditate': 'breath_swell',
+    'skip stone': 'stone_skitter',
+}
+
+def cue_for_event(event_text: Optional[str]) -> Optional[str]:
+    if not event_text: return None
+    lowered = event_text.lower()
+    return next((cue for fragment, cue in EVENT_CUES if fragment in lowered), None)
+
+def cue_for_action(command: str, action_data: Dict[str, Any]) -> Optional[str]:
+    return action_data['cue'] if 'cue' in action_data else ACTION_CUES.get(command)
@@ -73,7 +73,7 @@ locations = {
         'description_template': "Path nears sound source. A {adj} waterfall cascades down rocks [E]. Air thick with {scent} and mist. Roaring {sound_level}. Back [W].",
         # FIX: Use string keys from pools.py
         'description_pools': {'adj':'adj_water_feature', 'scent':['ozone','damp earth','clean water'], 'sound_level': ['fills the air','is quite loud','resonates deep']},
-        'audio_mood': 'stream', 'event_chance': 0.3,
+        'audio_mood': 'stream', 'noise_bed': 'rapids', 'event_chance': 0.3,
         'exits': {'w':'stream_bend', 'e':'waterfall_base'},
         'actions': {
             'feel mist': {'text': "Fine cool mist dampens face/clothes. Notice sensation, smell ozone. Invigorating.", 'possible_messages':['Awakening sensation.','Cool clarity.']},
@@ -84,7 +84,7 @@ locations = {
          'description_template': "Base of {adj} waterfall! Water crashes, mist swirls. Deafening {sound_adj}. Ground is {ground_type}. Path behind falls [N]? Retreat [W].",
          # FIX: Use string keys from pools.py
          'description_pools': {'adj': ['thundering', 'powerful', 'magnificent'], 'sound_adj':['sound','roar','energy'], 'ground_type':['slippery rock','muddy','strewn pebbles', 'ground']},
-         'audio_mood': 'stream', # Needs specific waterfall mood?
+         'audio_mood': 'waterfall_roar', 'reverb_wet': 0.25, # Spray and rock face: a short, bright space
          'event_chance': 0.5,
          'exits': {'w':'waterfall_approach'},
          'actions': {
@@ -97,7 +97,7 @@ locations = {
          'description_template': "Behind the roar! A {adj} cave, {temp}. Water drips down walls ({cave_detail}). Sound muffled. Damp {scent}. Exit back [S].",
          # FIX: Use string keys from pools.py
          'description_pools': {'adj': 'adj_cave', 'temp':['cool','cold','damp'], 'cave_detail': 'cave_features', 'scent':'scent_cave' },
-         'audio_mood': 'woods_deep', # Cave mood?
+         'audio_mood': 'cave_echoing', 'reverb_wet': 0.45,
          'event_chance': 0.2,
          'exits': {'s':'waterfall_base'},
          'actions': {
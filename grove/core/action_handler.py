@@ -9,6 +9,8 @@ from typing import Dict, Optional, Any
 from .game_state import GameState
 from ..content.locations import locations
 from ..content.dynamics import generate_dynamic_text, select_random_outcome, _get_random_from_pool
+from ..content.cues import cue_for_action
+from .cue_hooks import play_cue
 # Updated presentation layer imports for direct calls if needed (display_message IS used)
 from ..presentation.display import display_action_text, display_message
 from ..utils.text_utils import wrap_text, conditional_sleep # Import conditional_sleep
@@ -33,6 +35,7 @@ def handle_action(command: str, game_state: GameState) -> bool:
         action_text_template = action_data.get('text', "You do that.")
         action_pools = action_data.get('description_pools', {})
         final_action_text = generate_dynamic_text(action_text_template, action_pools)
+        play_cue(cue_for_action(command, action_data)) # Starts with the text, plays under it
         display_action_text(final_action_text)
 
         # Determine Outcome (Message/Reveal - logic same as before)
@@ -0,0 +1,23 @@
+# grove/core/cue_hooks.py
+# Lets display and action code ask for a one-shot sound cue without holding the audio engine.
+
+from typing import Optional, Callable, Any
+
+try: from .. import config
+except ImportError: config = type('config', (), {'DEBUG': False})
+
+# Set by the game loop to the engine's play_cue (None: no audio, cues are ignored)
+_cue_player: Optional[Callable[[str], Any]] = None
+
+def set_cue_player(player: Optional[Callable[[str], Any]]):
+    global _cue_player
+    _cue_player = player
+
+def play_cue(name: Optional[str]):
+    """Plays the named cue if audio is running; a no-op for None or without audio."""
+    if not name or _cue_player is None: return
+    if config.DEBUG: print(f"[DEBUG] Cue: '{name}'")
+    try: _cue_player(name)
+    except Exception as e: print(f"[WARN] Cue '{name}' failed: {e}") # Sound is decoration: never break a turn
+
+print("[cue_hooks.py] Loaded.")
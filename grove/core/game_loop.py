@@ -3,7 +3,7 @@
 
 import random
 import time
-from typing import Optional, Dict, Any # Added Dict, Any
+from typing import Optional, Dict, Any, TYPE_CHECKING # Added Dict, Any
 
 # Project imports
 try: from .. import config
@@ -12,22 +12,23 @@ from .game_state import GameState
 from .input_handler import get_player_input, validate_input
 from .movement_handler import handle_movement
 from .action_handler import handle_action
+from .cue_hooks import set_cue_player
 from ..presentation.display import display_location, display_prompt
 from ..utils.text_utils import wrap_text
 from ..content.locations import locations
-try: from ..audio.engine import AudioEngine
-except ImportError: AudioEngine = None
+if TYPE_CHECKING: from ..audio.engine import AudioEngine # Imported for real on the audio warm-up thread, not here
 
 
-def run_game(game_state: GameState, audio_engine: Optional[AudioEngine] = None):
+def run_game(game_state: GameState, audio_engine: Optional['AudioEngine'] = None):
     """Runs the main game loop until game_state.game_active is False."""
-    last_known_mood = 'default'
+    location_profiles: Dict[str, Any] = {}; last_profile: Optional[Any] = None
     if audio_engine:
-        initial_location_data = locations.get(game_state.current_location_id, {})
-        initial_mood = initial_location_data.get('audio_mood', 'default')
-        if config.DEBUG: print(f"[DEBUG] GameLoop: Initial audio mood set to '{initial_mood}'")
-        audio_engine.update_parameters({'mood': initial_mood})
-        last_known_mood = initial_mood
+        from ..audio.profiles import PROFILES # Already loaded by the warm-up thread
+        location_profiles = PROFILES.compile_locations(locations) # Once: every location's audio validated up front
+        last_profile = location_profiles.get(game_state.current_location_id) or PROFILES.compile('default')
+        if config.DEBUG: print(f"[DEBUG] GameLoop: Initial audio profile {last_profile} ({len(PROFILES)} profiles)")
+        audio_engine.set_profile(last_profile)
+        set_cue_player(getattr(audio_engine, 'play_cue', None)) # Events and actions trigger one-shot cues
 
     turn_counter = 0 # Optional: For debugging specific turns
 
@@ -43,16 +44,11 @@ def run_game(game_state: GameState, audio_engine: Optional[AudioEngine] = None):
             game_state.set_location('clearing') # Attempt to recover
             continue
 
-        current_mood = current_location_data.get('audio_mood', 'default')
-        if current_mood != last_known_mood and audio_engine:
-            if config.DEBUG: print(f"[DEBUG] GameLoop: Mood Change -> '{current_mood}'")
-            base_freq = 65.41
-            if current_mood == 'woods_deep': base_freq = 55.0
-            elif current_mood == 'forest_mysterious': base_freq = 61.74
-            elif current_mood == 'stream': base_freq = 73.42
-            audio_params = {'mood': current_mood, 'base_freq': base_freq}
-            audio_engine.update_parameters(audio_params)
-            last_known_mood = current_mood
+        current_profile = location_profiles.get(game_state.current_location_id, last_profile)
+        if current_profile is not last_profile and audio_engine: # Shared handles: same settings, same object
+            if config.DEBUG: print(f"[DEBUG] GameLoop: Audio profile -> {current_profile}")
+            audio_engine.set_profile(current_profile)
+            last_profile = current_profile
 
         # 2. Display Location & Prompt
         display_location(game_state)
@@ -80,6 +76,7 @@ def run_game(game_state: GameState, audio_engine: Optional[AudioEngine] = None):
         if config.DEBUG: print(f"--- End Turn {turn_counter} ---")
 
     # End of loop
+    set_cue_player(None)
 
 
 print("[game_loop.py] v3 Loaded with more debug prints.")
\ No newline at end of file
@@ -11,6 +11,8 @@ from ..content.locations import locations # Core location data
 try: from ..content.visuals import location_visuals # Separated visuals
 except ImportError: location_visuals = {} # Safety
 from ..content.dynamics import generate_dynamic_text, generate_event_text
+from ..content.cues import cue_for_event
+from ..core.cue_hooks import play_cue
 from ..utils.text_utils import wrap_text, slow_print, conditional_sleep
 from .. import config
 
@@ -39,7 +41,7 @@ def display_location(game_state: GameState):
 
     # Event
     event_text = generate_event_text(location_data);
-    if event_text: conditional_sleep(0.8, 1.5); print(wrap_text(f"\nSuddenly: {event_text}")); conditional_sleep(1.0, 1.8)
+    if event_text: conditional_sleep(0.8, 1.5); play_cue(cue_for_event(event_text)); print(wrap_text(f"\nSuddenly: {event_text}")); conditional_sleep(1.0, 1.8)
 
 
 def display_prompt(game_state: GameState) -> Set[str]:
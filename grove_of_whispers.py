@@ -7,13 +7,17 @@ import sys
 import traceback
 import time # Keep time import for shutdown safety if needed
 import argparse # <<< Added for command-line arguments
+from typing import Optional, List, Any
+from concurrent.futures import Future
 
 # Local package imports
 try:
     from grove.core.game_loop import run_game
     from grove.core.game_state import GameState, load_initial_state
     from grove.presentation.intro import introduction
-    from grove.audio.engine import AudioEngine
+    from grove.audio.warmup import warm_up_audio, wait_for_audio, AUDIO_BACKEND_NAMES # Engine, numpy & PortAudio load on the warm-up thread
+    from grove.audio.latency import LATENCY_PROFILES
+    from grove.audio.quality import QUALITY_TIERS
     from grove import config # <<< Added config import
 except ImportError as e:
     print("Critical Error: Failed to import required game components.")
@@ -21,34 +25,65 @@ except ImportError as e:
     print(f"Import error details: {e}")
     sys.exit(1)
 
+def render_soundtrack(path: str, seconds: float, dwell: float):
+    """Renders a tour through the location moods to a WAV file, faster than real time."""
+    try:
+        from grove.audio.offline import render_to_wav, build_profile_schedule
+        from grove.audio.profiles import PROFILES
+    except ImportError as e: print(f"Offline render unavailable: {e}"); return
+    from grove.content.locations import locations
+    tour: List[Any] = []
+    for profile in PROFILES.compile_locations(locations).values(): # Walk locations in definition order, skipping repeats
+        if not tour or tour[-1] is not profile: tour.append(profile)
+    print(f"Rendering {seconds:.0f}s soundtrack to '{path}'...")
+    stats = render_to_wav(path, seconds, build_profile_schedule(tour, dwell))
+    if stats: print(f"Rendered {stats['rendered_seconds']:.1f}s in {stats['wall_seconds']:.2f}s ({stats['realtime_multiple']:.1f}x realtime).")
+
 def main():
     """Parses arguments, initializes, and runs the game."""
     # --- Argument Parsing ---
     parser = argparse.ArgumentParser(description="The Grove of Whispers - A Text-Based Mindfulness Adventure")
     parser.add_argument("-d", "--debug", action="store_true", help="Enable debug output messages.")
+    parser.add_argument("--audio-backend", choices=AUDIO_BACKEND_NAMES, default="sounddevice", help="Audio output: sounddevice (speakers), null or capture (no sound card needed).")
+    parser.add_argument("--latency-profile", choices=sorted(LATENCY_PROFILES), default=config.AUDIO_LATENCY_PROFILE, help=f"Audio block size / device latency trade-off (default: {config.AUDIO_LATENCY_PROFILE}).")
+    parser.add_argument("--sample-rate", type=int, default=config.AUDIO_SAMPLE_RATE, metavar="HZ", help="Audio sample rate (default: the output device's native rate).")
+    parser.add_argument("--adaptive-latency", action="store_true", default=config.AUDIO_ADAPTIVE_LATENCY, help="Grow or shrink the audio block size from measured callback cost and underflows.")
+    parser.add_argument("--audio-quality", choices=[tier['name'] for tier in QUALITY_TIERS], default=config.AUDIO_QUALITY, help=f"Best audio quality tier; slow machines step down from it instead of dropping out (default: {config.AUDIO_QUALITY}).")
+    parser.add_argument("--fixed-quality", action="store_true", default=not config.AUDIO_QUALITY_GOVERNOR, help="Keep the audio quality tier fixed, even when audio rendering falls behind.")
+    parser.add_argument("--audio-process", action="store_true", default=config.AUDIO_SYNTHESIS_PROCESS, help="Synthesize audio in a separate process, isolated from game-loop stalls (fixed block size).")
+    parser.add_argument("--render-ahead", type=int, default=None, metavar="BLOCKS", help="Render audio this many blocks ahead on a producer thread (adds latency, resists dropouts; default: from the latency profile).")
+    parser.add_argument("--ambience-dir", metavar="DIR", default=config.AMBIENCE_DIR, help="Folder of recorded ambience beds named <audio_mood>.wav (default: ./ambience in the game folder).")
+    parser.add_argument("--record-session", metavar="PATH", default=config.AUDIO_RECORD_PATH, help="Record the soundtrack as played to a WAV file (.raw/.f32: float32), for QA and bug reports.")
+    parser.add_argument("--render-wav", metavar="PATH", help="Render the soundtrack offline to a WAV file and exit.")
+    parser.add_argument("--render-seconds", type=float, default=120.0, help="Length of the offline render in seconds (default: 120).")
+    parser.add_argument("--render-dwell", type=float, default=20.0, help="Seconds spent in each location mood during the offline render (default: 20).")
     args = parser.parse_args()
 
     # --- Set Global Debug Config ---
     config.DEBUG = args.debug
+    config.AUDIO_LATENCY_PROFILE = args.latency_profile; config.AUDIO_ADAPTIVE_LATENCY = args.adaptive_latency; config.AUDIO_SAMPLE_RATE = args.sample_rate
+    config.AUDIO_QUALITY = args.audio_quality; config.AUDIO_QUALITY_GOVERNOR = not args.fixed_quality
+    config.AUDIO_SYNTHESIS_PROCESS = args.audio_process; config.AMBIENCE_DIR = args.ambience_dir; config.AUDIO_RECORD_PATH = args.record_session
     if config.DEBUG:
         print("--- DEBUG MODE ENABLED ---")
 
+    # --- Offline Soundtrack Render (no game, no audio device) ---
+    if args.render_wav:
+        render_soundtrack(args.render_wav, args.render_seconds, args.render_dwell)
+        return
+
     # --- Initialization ---
     game_state: Optional[GameState] = None
-    audio_engine: Optional[AudioEngine] = None
+    audio_engine: Optional[Any] = None # AudioEngine or RemoteAudioEngine, once warm-up finishes
+    audio_ready: Optional[Future] = None
 
     try:
-        # Initialize Audio Engine (Only create if not disabled internally)
-        if hasattr(AudioEngine, '__init__') and not getattr(AudioEngine(0), '_is_disabled', True): # Check if not disabled
-            print("Initializing audio engine...")
-            audio_engine = AudioEngine()
-            audio_engine.start()
-            # time.sleep(0.5) # Less necessary now shutdown is better? Keep for safety.
-        else:
-            print("Audio is disabled (check dependencies or engine code).")
+        # Start Audio in the Background (disabled inside if numpy or the chosen backend is unavailable)
+        audio_ready = warm_up_audio(args.audio_backend, args.render_ahead, config.AUDIO_SYNTHESIS_PROCESS, config.AUDIO_RECORD_PATH)
 
-        # Display Introduction
+        # Display Introduction (while audio imports, probes the device and precomputes)
         introduction()
+        audio_engine = wait_for_audio(audio_ready); audio_ready = None # Waited once: an engine that starts later is stopped by wait_for_audio's done-callback
 
         # Load Game State
         game_state = load_initial_state()
@@ -75,6 +110,7 @@ def main():
 
     finally:
         # --- Clean Shutdown ---
+        if audio_ready is not None: audio_engine = wait_for_audio(audio_ready) # Interrupted during the intro, before the wait above
         if audio_engine and getattr(audio_engine, '_running', False): # Check if running
             print("Shutting down audio engine...")
             audio_engine.stop() # Call the corrected stop method
@@ -0,0 +1,56 @@
+# tests/test_callback_allocations.py
+# The audio callback must not allocate per block: drives AudioEngine on a NullBackend under tracemalloc.
+
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from grove.audio.engine import AudioEngine
+from grove.audio.backends import NullBackend
+from grove.audio.quality import tier_index
+
+# Bytes a single callback may peak at (small bookkeeping only); one (frames, 2) float32 block is ~28 KB
+MAX_CALLBACK_PEAK_BYTES = 8 * 1024
+WARMUP_BLOCKS = 4
+MEASURED_BLOCKS = 40
+
+def _engine(mood: str) -> AudioEngine:
+    engine = AudioEngine(backend=NullBackend(), adaptive_latency=False, quality_governor=False)
+    engine.update_parameters({'mood': mood}); engine.reset_playback()
+    return engine
+
+def _worst_callback_peak(engine: AudioEngine) -> int:
+    frames = engine.buffer_size; block = np.zeros((frames, 2), dtype=np.float32)
+    tracemalloc.start()
+    try:
+        worst = 0
+        for _ in range(MEASURED_BLOCKS):
+            before = tracemalloc.get_traced_memory()[0]; tracemalloc.reset_peak()
+            engine._audio_callback(block, frames, None, None)
+            worst = max(worst, tracemalloc.get_traced_memory()[1] - before)
+        return worst
+    finally: tracemalloc.stop()
+
+@pytest.mark.parametrize('mood, update', [
+    ('forest_neutral', None), # Steady mood
+    ('forest_neutral', {'mood': 'stream'}), # Crossfade
+    ('forest_neutral', {'base_freq': (90.0, 0.5), 'master_volume': (0.3, 0.5)}), # Glides
+    ('cave_echoing', None), # Reverb mood
+    ('forest_neutral', {'mood': 'cave_echoing'}), # Crossfade into reverb
+], ids=['steady', 'crossfade', 'glide', 'reverb', 'crossfade_reverb'])
+def test_callback_peak_allocation_is_bounded(mood, update):
+    engine = _engine(mood); frames = engine.buffer_size; block = np.zeros((frames, 2), dtype=np.float32)
+    for _ in range(WARMUP_BLOCKS): engine._audio_callback(block, frames, None, None)
+    if update: engine.update_parameters(update) # Control thread: builds loops and convolvers outside the measured callbacks
+    peak = _worst_callback_peak(engine)
+    assert peak < MAX_CALLBACK_PEAK_BYTES, f"callback peaked at {peak} bytes"
+
+@pytest.mark.parametrize('tier', ['low', 'minimal']) # The decimated tiers
+def test_callback_peak_after_tier_drop_is_bounded(tier):
+    engine = _engine('forest_neutral'); frames = engine.buffer_size; block = np.zeros((frames, 2), dtype=np.float32)
+    for _ in range(WARMUP_BLOCKS): engine._audio_callback(block, frames, None, None)
+    engine.quality_tier = tier_index(tier) # As the governor does: the next (measured) callback applies it
+    engine.update_parameters({'base_freq': (90.0, 0.5)}) # And a glide, so the banks render live at the reduced rate
+    peak = _worst_callback_peak(engine)
+    assert peak < MAX_CALLBACK_PEAK_BYTES, f"callback peaked at {peak} bytes"
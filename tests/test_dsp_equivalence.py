@@ -0,0 +1,122 @@
+# tests/test_dsp_equivalence.py
+# Golden-output equivalence of the dsp.py kernel paths and the reverb convolver against direct full-rate references.
+
+import functools
+from typing import List, Tuple, Any
+
+import numpy as np
+import pytest
+
+from grove.audio.synth import generate_sine_wave, generate_lfo
+from grove.audio.dsp import OscillatorBank, OSCILLATOR_MODES, MAX_LFO_DEPTH_SCALE
+from grove.audio.generation import generate_audio_chunk_for_preset
+from grove.audio.reverb import REVERB_SPACES, PartitionedConvolver, generate_impulse_response
+from grove.audio.engine import MOOD_PRESETS, MOOD_BASE_FREQS, DEFAULT_BASE_FREQ, DEFAULT_SAMPLE_RATE
+
+# Max abs difference allowed against the full-rate reference (mixes peak around 1.0)
+TOLERANCES = {'sine': 1e-4, 'wavetable': 2e-4}
+BLOCK_SIZES = (256, 1024, 3528)
+CHECK_SECONDS = 2.0 # Long enough to span many blocks and a good part of an LFO cycle
+QUALITY_TOLERANCE = 2e-3 # Decimated drones (set_quality): linear interpolation error grows with partial frequency
+QUALITY_DECIMATIONS = (2, 4)
+UNEVEN_BLOCK_SIZE = 882 # 20 ms at 44.1 kHz: 4 does not divide it, 3 does
+REVERB_TOLERANCE = 1e-5 # Relative to the reference's peak
+REVERB_BLOCK_SIZES = (1024, 3528)
+REPARTITION_BLOCK_SIZES = ((3528, 882), (1024, 1764)) # (before, after) a block-size switch mid-tail
+
+def golden_reference(preset: List[Tuple[float, ...]], base_freq: float, total_frames: int, sample_rate: int, enable_lfos: bool) -> np.ndarray:
+    """The mix computed directly at full rate with the simple generators, in one piece (no chunking)."""
+    duration = total_frames / sample_rate; mix = np.zeros(total_frames, dtype=np.float64)
+    for freq_mult, base_amp, lfo_rate, lfo_depth in preset:
+        amplitude: Any = max(0.0, base_amp)
+        if enable_lfos:
+            depth = max(0.0, min(1.0, lfo_depth * MAX_LFO_DEPTH_SCALE))
+            amplitude = generate_lfo(max(0.0, lfo_rate), duration, sample_rate, depth=amplitude * depth, offset=amplitude * (1.0 - depth))
+        wave, _ = generate_sine_wave(max(0.0, base_freq * freq_mult), duration, sample_rate, amplitude)
+        mix += wave
+    return mix
+
+@functools.lru_cache(maxsize=None)
+def _golden(mood: str, enable_lfos: bool) -> np.ndarray:
+    return golden_reference(MOOD_PRESETS[mood], MOOD_BASE_FREQS.get(mood, DEFAULT_BASE_FREQ), int(CHECK_SECONDS * DEFAULT_SAMPLE_RATE), DEFAULT_SAMPLE_RATE, enable_lfos)
+
+def _render_bank(preset, base_freq, total_frames, block_size, sample_rate, mode, enable_lfos, decimation: int = 1) -> np.ndarray:
+    bank = OscillatorBank(preset, sample_rate, mode=mode); bank.set_quality(0.0, decimation); out = np.zeros(total_frames, dtype=np.float32)
+    for start in range(0, total_frames, block_size):
+        frames = min(block_size, total_frames - start)
+        bank.render_into(base_freq, frames, out[start:start + frames], enable_lfos=enable_lfos)
+    return out
+
+def _render_generation(preset, base_freq, total_frames, block_size, sample_rate) -> np.ndarray:
+    osc_times = [0.0] * len(preset); lfo_times = [0.0] * len(preset); chunks = []
+    for start in range(0, total_frames, block_size):
+        chunk, _ = generate_audio_chunk_for_preset(preset, base_freq, osc_times, lfo_times, min(block_size, total_frames - start), sample_rate)
+        chunks.append(chunk)
+    return np.concatenate(chunks)
+
+def _max_error(rendered: np.ndarray, mood: str, enable_lfos: bool) -> float:
+    return float(np.abs(rendered - _golden(mood, enable_lfos)[:len(rendered)]).max())
+
+MOODS = sorted(MOOD_PRESETS)
+
+@pytest.mark.parametrize('enable_lfos', [False, True], ids=['static', 'lfo'])
+@pytest.mark.parametrize('block_size', BLOCK_SIZES)
+@pytest.mark.parametrize('mode', OSCILLATOR_MODES)
+@pytest.mark.parametrize('mood', MOODS)
+def test_bank_matches_reference(mood, mode, block_size, enable_lfos):
+    preset = MOOD_PRESETS[mood]; total_frames = int(CHECK_SECONDS * DEFAULT_SAMPLE_RATE)
+    rendered = _render_bank(preset, MOOD_BASE_FREQS.get(mood, DEFAULT_BASE_FREQ), total_frames, block_size, DEFAULT_SAMPLE_RATE, mode, enable_lfos)
+    assert _max_error(rendered, mood, enable_lfos) <= TOLERANCES[mode]
+
+@pytest.mark.parametrize('enable_lfos', [False, True], ids=['static', 'lfo'])
+@pytest.mark.parametrize('decimation', QUALITY_DECIMATIONS)
+@pytest.mark.parametrize('mode', OSCILLATOR_MODES)
+@pytest.mark.parametrize('mood', MOODS)
+def test_decimated_bank_matches_reference(mood, mode, decimation, enable_lfos):
+    preset = MOOD_PRESETS[mood]; total_frames = int(CHECK_SECONDS * DEFAULT_SAMPLE_RATE)
+    rendered = _render_bank(preset, MOOD_BASE_FREQS.get(mood, DEFAULT_BASE_FREQ), total_frames, BLOCK_SIZES[2], DEFAULT_SAMPLE_RATE, mode, enable_lfos, decimation)
+    assert _max_error(rendered, mood, enable_lfos) <= QUALITY_TOLERANCE
+
+@pytest.mark.parametrize('mode', OSCILLATOR_MODES)
+@pytest.mark.parametrize('mood', MOODS)
+def test_decimation_falls_back_to_a_dividing_step(mood, mode):
+    preset = MOOD_PRESETS[mood]; total_frames = int(CHECK_SECONDS * DEFAULT_SAMPLE_RATE) // UNEVEN_BLOCK_SIZE * UNEVEN_BLOCK_SIZE
+    bank = OscillatorBank(preset, DEFAULT_SAMPLE_RATE, mode=mode); bank.prepare(UNEVEN_BLOCK_SIZE)
+    assert bank._grid(UNEVEN_BLOCK_SIZE, 4)[-1] == 3
+    rendered = _render_bank(preset, MOOD_BASE_FREQS.get(mood, DEFAULT_BASE_FREQ), total_frames, UNEVEN_BLOCK_SIZE, DEFAULT_SAMPLE_RATE, mode, True, 4)
+    assert _max_error(rendered, mood, True) <= QUALITY_TOLERANCE
+
+@pytest.mark.parametrize('mood', MOODS)
+def test_generation_matches_reference(mood):
+    preset = MOOD_PRESETS[mood]; total_frames = int(CHECK_SECONDS * DEFAULT_SAMPLE_RATE)
+    rendered = _render_generation(preset, MOOD_BASE_FREQS.get(mood, DEFAULT_BASE_FREQ), total_frames, BLOCK_SIZES[2], DEFAULT_SAMPLE_RATE)
+    assert _max_error(rendered, mood, True) <= TOLERANCES['sine']
+
+def _convolution_reference(signal: np.ndarray, ir: np.ndarray) -> np.ndarray:
+    return np.stack([np.convolve(signal[:, c].astype(np.float64), ir[:, c].astype(np.float64))[:len(signal)] for c in range(signal.shape[1])], axis=1)
+
+def _relative_error(out: np.ndarray, reference: np.ndarray) -> float:
+    return float(np.abs(out - reference).max() / max(1e-12, np.abs(reference).max()))
+
+@pytest.mark.parametrize('block_size', REVERB_BLOCK_SIZES)
+@pytest.mark.parametrize('space', sorted(REVERB_SPACES))
+def test_convolver_matches_direct_convolution(space, block_size):
+    ir = generate_impulse_response(space, DEFAULT_SAMPLE_RATE); rng = np.random.default_rng(7)
+    signal = rng.standard_normal((int(CHECK_SECONDS * DEFAULT_SAMPLE_RATE) // block_size * block_size, 2)).astype(np.float32)
+    signal[len(signal) // 2:] = 0.0 # Second half: the tail rings out on silence
+    convolver = PartitionedConvolver(ir, block_size); out = np.zeros_like(signal)
+    for start in range(0, len(signal), block_size):
+        convolver.process(signal[start:start + block_size] if start < len(signal) // 2 else None, out[start:start + block_size])
+    assert _relative_error(out, _convolution_reference(signal, ir)) <= REVERB_TOLERANCE
+
+@pytest.mark.parametrize('before, after', REPARTITION_BLOCK_SIZES)
+@pytest.mark.parametrize('space', sorted(REVERB_SPACES))
+def test_repartitioned_tail_continues(space, before, after):
+    ir = generate_impulse_response(space, DEFAULT_SAMPLE_RATE); rng = np.random.default_rng(11)
+    signal = np.zeros((8 * before + 40 * after, 2), dtype=np.float32); signal[:6 * before] = rng.standard_normal((6 * before, 2))
+    old = PartitionedConvolver(ir, before); out = np.zeros_like(signal)
+    for start in range(0, 8 * before, before): # Six blocks of input, two ringing out
+        old.process(signal[start:start + before] if start < 6 * before else None, out[start:start + before])
+    new = PartitionedConvolver(ir, after); new.load_history(old.history(), old.silent_blocks * before)
+    for start in range(8 * before, len(signal), after): new.process(None, out[start:start + after])
+    assert _relative_error(out, _convolution_reference(signal, ir)) <= REVERB_TOLERANCE